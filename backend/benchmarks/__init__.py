@@ -0,0 +1 @@
+"""效能基準測試（獨立執行，不納入 pytest 測試集）"""
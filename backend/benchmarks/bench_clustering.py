@@ -0,0 +1,264 @@
+"""
+熱點聚類引擎基準測試：在 10k–5M 筆合成事故上比較耗時、記憶體峰值與聚類一致性（ARI）
+
+比較的引擎：
+- haversine_ball_tree：目前的聚類引擎 `hotspot_engine.cluster_coordinates`（haversine ball tree，eps 以地球半徑換算為弧度）
+- projected_kd_tree：投影為公尺座標（以中央經線為準的正弦投影）後使用 KD-tree 的歐氏距離 DBSCAN
+- dedup_weighted：投影並以 `--dedup-meters` 網格合併重複座標，以 sample_weight 執行 DBSCAN 後展開回每筆事故
+  （地理編碼會把同一路口的事故放在相同座標，重複比例越高越有利）
+- grid：邊長 eps/√2 的網格，事故數達 min_samples 的網格為核心並與相鄰核心網格連通，
+  其餘網格併入相鄰的核心網格（近似 DBSCAN，完全向量化）
+
+ARI 以 haversine_ball_tree 為參考；資料量超過 `--max-exact-size` 時精確引擎會略過，
+改以 dedup_weighted（與 DBSCAN 僅差 dedup 網格的捨入）為參考，結果中的 reference 欄位會註明。
+
+使用範例：
+  cd backend
+  python -m benchmarks.bench_clustering
+  python -m benchmarks.bench_clustering --sizes 10000 100000 1000000 5000000 --region taiwan \\
+      --output bench-results/clustering.json
+"""
+import argparse
+import gc
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from sklearn.cluster import DBSCAN
+from sklearn.metrics import adjusted_rand_score
+
+from benchmarks.reporting import build_report, compare_to_baseline, write_report
+from src.core.stage_profiler import StageProfiler
+from src.services.hotspot_engine import EARTH_RADIUS_METERS, cluster_coordinates
+
+# 合成資料的區域：(緯度, 經度, 標準差（度）)
+REGIONS: Dict[str, list] = {
+    "taipei": [(25.0418, 121.5437, 0.04), (25.0120, 121.4650, 0.03), (25.0800, 121.5200, 0.03)],
+    "taiwan": [
+        (25.0418, 121.5437, 0.05),
+        (25.0120, 121.4650, 0.05),
+        (24.9936, 121.3010, 0.06),
+        (24.1477, 120.6736, 0.08),
+        (22.9997, 120.2270, 0.07),
+        (22.6273, 120.3014, 0.07),
+        (24.8138, 120.9675, 0.05),
+        (23.4801, 120.4491, 0.05),
+    ],
+}
+
+Engine = Callable[[np.ndarray, np.ndarray, float, int, argparse.Namespace], np.ndarray]
+
+
+def synthetic_accidents(
+    size: int, region: str, rng: np.random.Generator, exact_ratio: float = 0.3
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    產生合成事故座標
+
+    路口數約為事故數的 1/200，路口沿城市中心呈高斯分佈；
+    70% 事故落在路口附近，其中 exact_ratio 的事故與路口座標完全相同（模擬地理編碼結果），
+    其餘為城市範圍內的背景事故。
+    """
+    cities = np.array(REGIONS[region])
+    intersections = max(size // 200, 10)
+    city_index = rng.integers(0, len(cities), intersections)
+    centers_lat = cities[city_index, 0] + rng.normal(0, 1, intersections) * cities[city_index, 2]
+    centers_lng = cities[city_index, 1] + rng.normal(0, 1, intersections) * cities[city_index, 2]
+
+    # 路口熱門程度呈長尾分佈
+    weights = rng.pareto(1.5, intersections) + 1
+    owner = rng.choice(intersections, size, p=weights / weights.sum())
+    lat = centers_lat[owner].copy()
+    lng = centers_lng[owner].copy()
+
+    roll = rng.random(size)
+    near = (roll >= exact_ratio) & (roll < 0.70)
+    lat[near] += rng.normal(0, 80 / 111_000, near.sum())
+    lng[near] += rng.normal(0, 80 / 101_000, near.sum())
+
+    background = roll >= 0.70
+    background_city = rng.integers(0, len(cities), background.sum())
+    lat[background] = cities[background_city, 0] + rng.normal(0, 1, background.sum()) * cities[background_city, 2]
+    lng[background] = cities[background_city, 1] + rng.normal(0, 1, background.sum()) * cities[background_city, 2]
+    return lat, lng
+
+
+def project_meters(lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+    """以資料中央經線為準的正弦投影（公尺），台灣範圍內局部距離誤差遠小於 1%"""
+    lat_rad = np.radians(lat)
+    lng_rad = np.radians(lng - (lng.min() + lng.max()) / 2)
+    return np.column_stack([EARTH_RADIUS_METERS * lng_rad * np.cos(lat_rad), EARTH_RADIUS_METERS * lat_rad])
+
+
+def haversine_ball_tree(lat, lng, eps_meters, min_samples, args) -> np.ndarray:
+    return cluster_coordinates(lat, lng, eps_meters, min_samples)
+
+
+def projected_kd_tree(lat, lng, eps_meters, min_samples, args) -> np.ndarray:
+    return DBSCAN(eps=eps_meters, min_samples=min_samples, algorithm="kd_tree").fit_predict(
+        project_meters(lat, lng)
+    )
+
+
+def dedup_weighted(lat, lng, eps_meters, min_samples, args) -> np.ndarray:
+    projected = project_meters(lat, lng)
+    cells = np.floor(projected / args.dedup_meters).astype(np.int64)
+    keys = (cells[:, 0] - cells[:, 0].min()) * (cells[:, 1].max() - cells[:, 1].min() + 1) + (
+        cells[:, 1] - cells[:, 1].min()
+    )
+    unique_keys, first_index, inverse, counts = np.unique(
+        keys, return_index=True, return_inverse=True, return_counts=True
+    )
+    labels = DBSCAN(eps=eps_meters, min_samples=min_samples, algorithm="kd_tree").fit_predict(
+        projected[first_index], sample_weight=counts
+    )
+    return labels[inverse]
+
+
+def grid(lat, lng, eps_meters, min_samples, args) -> np.ndarray:
+    projected = project_meters(lat, lng)
+    cell_size = eps_meters / np.sqrt(2)
+    cells = np.floor(projected / cell_size).astype(np.int64)
+    cells -= cells.min(axis=0) - 1
+    width = cells[:, 1].max() + 2
+    keys = cells[:, 0] * width + cells[:, 1]
+    unique_keys, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+
+    dense = counts >= min_samples
+    dense_keys = unique_keys[dense]
+    dense_count = len(dense_keys)
+    offsets = [dx * width + dy for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+    def lookup_dense(query: np.ndarray) -> np.ndarray:
+        """回傳 query 對應的核心網格索引（不存在為 -1）"""
+        if dense_count == 0:
+            return np.full(len(query), -1, dtype=np.int64)
+        position = np.minimum(np.searchsorted(dense_keys, query), dense_count - 1)
+        return np.where(dense_keys[position] == query, position, -1)
+
+    # 相鄰核心網格連通
+    rows, cols = [], []
+    for offset in offsets:
+        neighbor = lookup_dense(dense_keys + offset)
+        connected = neighbor >= 0
+        rows.append(np.nonzero(connected)[0])
+        cols.append(neighbor[connected])
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    graph = coo_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(dense_count, dense_count))
+    _, dense_labels = connected_components(graph, directed=False)
+
+    cell_labels = np.full(len(unique_keys), -1, dtype=np.int64)
+    cell_labels[dense] = dense_labels
+    # 非核心網格併入第一個相鄰的核心網格
+    sparse_cells = np.nonzero(~dense)[0]
+    for offset in offsets:
+        pending = sparse_cells[cell_labels[sparse_cells] < 0]
+        if len(pending) == 0:
+            break
+        neighbor = lookup_dense(unique_keys[pending] + offset)
+        matched = neighbor >= 0
+        cell_labels[pending[matched]] = dense_labels[neighbor[matched]]
+    return cell_labels[inverse]
+
+
+ENGINES: Dict[str, Engine] = {
+    "haversine_ball_tree": haversine_ball_tree,
+    "projected_kd_tree": projected_kd_tree,
+    "dedup_weighted": dedup_weighted,
+    "grid": grid,
+}
+
+EXACT_ENGINES = ("haversine_ball_tree", "projected_kd_tree")
+
+
+def run_size(size: int, args) -> Dict[str, dict]:
+    """在單一資料量下執行各引擎"""
+    rng = np.random.default_rng(args.seed)
+    lat, lng = synthetic_accidents(size, args.region, rng, args.exact_ratio)
+    results: Dict[str, dict] = {}
+    labels_by_engine: Dict[str, np.ndarray] = {}
+
+    for name in args.engines:
+        if name in EXACT_ENGINES and size > args.max_exact_size:
+            print(f"  {name:<22} 略過（> --max-exact-size）")
+            continue
+        gc.collect()
+        profiler = StageProfiler(trace_memory=not args.no_trace_memory)
+        with profiler.stage(name, rows=size):
+            labels = ENGINES[name](lat, lng, args.eps, args.min_samples, args)
+        profiler.finish()
+        stage = profiler.stages[0]
+        labels_by_engine[name] = labels
+        clusters = len(np.unique(labels[labels >= 0]))
+        results[name] = {
+            "size": size,
+            "wall_ms": round(stage.wall_ms, 1),
+            "cpu_ms": round(stage.cpu_ms, 1),
+            "peak_memory_bytes": stage.peak_memory_bytes,
+            "max_rss_bytes": stage.max_rss_bytes,
+            "clusters": clusters,
+            "noise_ratio": round(float((labels < 0).mean()), 4),
+        }
+
+    reference: Optional[str] = next(
+        (name for name in ("haversine_ball_tree", "dedup_weighted") if name in labels_by_engine), None
+    )
+    for name, result in results.items():
+        result["reference"] = reference
+        result["ari"] = (
+            round(float(adjusted_rand_score(labels_by_engine[reference], labels_by_engine[name])), 4)
+            if reference
+            else None
+        )
+        peak = result["peak_memory_bytes"]
+        print(
+            f"  {name:<22}{result['wall_ms']:>12,.0f} ms"
+            f"{(peak / 1024 / 1024 if peak else 0):>10,.0f} MB"
+            f"{result['clusters']:>9,} clusters  ARI={result['ari']}"
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="熱點聚類引擎基準測試")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="事故筆數")
+    parser.add_argument("--region", choices=sorted(REGIONS), default="taiwan", help="合成資料區域")
+    parser.add_argument("--eps", type=float, default=500, help="epsilon（公尺）")
+    parser.add_argument("--min-samples", type=int, default=5, help="min_samples")
+    parser.add_argument(
+        "--exact-ratio", type=float, default=0.3, help="與路口座標完全相同的事故比例（< 0.7）"
+    )
+    parser.add_argument("--dedup-meters", type=float, default=1.0, help="dedup_weighted 合併座標的網格（公尺）")
+    parser.add_argument(
+        "--max-exact-size",
+        type=int,
+        default=1_000_000,
+        help="超過此筆數時略過 haversine_ball_tree 與 projected_kd_tree（鄰居數隨密度暴增）",
+    )
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES), help="要比較的引擎")
+    parser.add_argument("--no-trace-memory", action="store_true", help="不以 tracemalloc 量測記憶體峰值（較快）")
+    parser.add_argument("--seed", type=int, default=7, help="亂數種子")
+    parser.add_argument("--output", help="結果 JSON 輸出路徑")
+    parser.add_argument("--baseline", help="要比較的基準結果 JSON")
+    args = parser.parse_args()
+
+    results: Dict[str, dict] = {}
+    for size in args.sizes:
+        print(f"size={size:,} region={args.region} eps={args.eps}m min_samples={args.min_samples}")
+        for name, result in run_size(size, args).items():
+            results[f"{name}@{size}"] = result
+
+    parameters = {
+        key: value for key, value in vars(args).items() if key not in ("output", "baseline")
+    }
+    if args.output:
+        write_report(build_report("clustering", parameters, results), args.output)
+        print(f"\n結果已寫入 {args.output}")
+    if args.baseline:
+        print()
+        print("\n".join(compare_to_baseline(results, args.baseline, metrics=("wall_ms", "peak_memory_bytes", "ari"))))
+
+
+if __name__ == "__main__":
+    main()
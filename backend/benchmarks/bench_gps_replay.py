@@ -0,0 +1,303 @@
+"""
+GPS 軌跡重播負載測試：模擬沿台北主要幹道行駛的車輛，量測尖峰時段的吞吐量與延遲
+
+每輛模擬車輛的行為與前端一致：
+- 開啟 App 時載入全部熱點（`GET /hotspots/all?limit=10000`），之後每 `--refresh-seconds` 重新載入
+- 依 `--poll-seconds` 更新 GPS 位置，在本機比對熱點（前端即在本機計算附近熱點與警示）
+- 進入熱點警示範圍時，依 `--detail-probability` 點開熱點詳情（`GET /hotspots/{id}?include_accidents=true`）
+- 行駛 `--session-minutes` 後關閉 App，再以新的行程重新開啟
+
+輸出各端點的吞吐量、p50/p95/p99 延遲、錯誤率與被限流（429）/ 卸載（503）比例，
+可用 `--output` 存成 JSON，以 `--baseline` 與先前結果比較。
+
+所有請求來自同一個 IP，本機測試時需放寬速率限制，否則量測到的是限流而非容量：
+
+  RATE_LIMIT_REQUESTS_PER_MINUTE=1000000 RATE_LIMIT_BURST_SIZE=100000 \\
+  RATE_LIMIT_EXPENSIVE_PER_MINUTE=1000000 RATE_LIMIT_EXPENSIVE_BURST_SIZE=100000 \\
+      docker compose up -d postgres backend
+
+使用範例：
+  cd backend
+  python -m benchmarks.bench_gps_replay --vehicles 500 --duration 300
+  python -m benchmarks.bench_gps_replay --vehicles 2000 --poll-seconds 1 --ramp-up 60 \\
+      --duration 600 --output bench-results/gps-2000.json
+"""
+import argparse
+import asyncio
+import math
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.reporting import (
+    build_report,
+    compare_to_baseline,
+    format_summary_table,
+    summarize,
+    write_report,
+)
+
+Point = Tuple[float, float]
+
+# 台北主要幹道（緯度, 經度）折線，車輛沿線往返行駛
+ARTERIALS: Dict[str, List[Point]] = {
+    "忠孝東西路": [(25.0478, 121.5170), (25.0416, 121.5438), (25.0410, 121.5775)],
+    "信義路": [(25.0330, 121.5200), (25.0335, 121.5440), (25.0330, 121.5650)],
+    "仁愛路": [(25.0395, 121.5235), (25.0375, 121.5495), (25.0405, 121.5605)],
+    "市民大道": [(25.0480, 121.5110), (25.0450, 121.5400), (25.0450, 121.5700)],
+    "敦化南北路": [(25.0610, 121.5490), (25.0410, 121.5490), (25.0260, 121.5485)],
+    "復興南北路": [(25.0620, 121.5440), (25.0420, 121.5440), (25.0230, 121.5430)],
+    "中山北路": [(25.0480, 121.5225), (25.0700, 121.5220), (25.0870, 121.5245)],
+    "承德路": [(25.0500, 121.5180), (25.0700, 121.5195), (25.0880, 121.5200)],
+    "基隆路": [(25.0550, 121.5660), (25.0330, 121.5600), (25.0140, 121.5420)],
+    "羅斯福路": [(25.0330, 121.5190), (25.0200, 121.5290), (25.0050, 121.5390)],
+}
+
+EARTH_RADIUS_METERS = 6_371_000
+
+# 本機熱點索引的網格大小（度，約 1.1km）
+GRID_DEGREES = 0.01
+
+ENDPOINT_ALL = "hotspots_all"
+ENDPOINT_DETAIL = "hotspot_detail"
+
+
+def haversine_meters(a: Point, b: Point) -> float:
+    lat1, lng1, lat2, lng2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(h))
+
+
+class Route:
+    """沿折線行駛的路線（以累積距離內插位置）"""
+
+    def __init__(self, points: List[Point]):
+        self.points = points
+        self.cumulative = [0.0]
+        for start, end in zip(points, points[1:]):
+            self.cumulative.append(self.cumulative[-1] + haversine_meters(start, end))
+
+    @property
+    def length(self) -> float:
+        return self.cumulative[-1]
+
+    def position(self, distance: float) -> Point:
+        distance = min(max(distance, 0.0), self.length)
+        for index in range(1, len(self.points)):
+            if distance <= self.cumulative[index]:
+                segment = self.cumulative[index] - self.cumulative[index - 1]
+                ratio = (distance - self.cumulative[index - 1]) / segment if segment else 0.0
+                (lat1, lng1), (lat2, lng2) = self.points[index - 1], self.points[index]
+                return lat1 + (lat2 - lat1) * ratio, lng1 + (lng2 - lng1) * ratio
+        return self.points[-1]
+
+
+class HotspotIndex:
+    """以網格索引 /hotspots/all 的結果，模擬前端在本機計算附近熱點"""
+
+    def __init__(self, hotspots: List[dict]):
+        self.cells: Dict[Tuple[int, int], List[Tuple[str, Point, float]]] = defaultdict(list)
+        for hotspot in hotspots:
+            center = (hotspot["center_latitude"], hotspot["center_longitude"])
+            self.cells[self._cell(center)].append((hotspot["id"], center, hotspot["radius_meters"]))
+
+    @staticmethod
+    def _cell(point: Point) -> Tuple[int, int]:
+        return int(point[0] // GRID_DEGREES), int(point[1] // GRID_DEGREES)
+
+    def within(self, point: Point, alert_distance: float) -> List[str]:
+        """回傳警示範圍內的熱點 ID（警示距離加上熱點半徑）"""
+        row, col = self._cell(point)
+        span = 1 + int(alert_distance / 1000 / (GRID_DEGREES * 111))
+        found = []
+        for d_row in range(-span, span + 1):
+            for d_col in range(-span, span + 1):
+                for hotspot_id, center, radius in self.cells.get((row + d_row, col + d_col), ()):
+                    if haversine_meters(point, center) <= alert_distance + radius:
+                        found.append(hotspot_id)
+        return found
+
+
+@dataclass
+class LoadStats:
+    """負載測試統計"""
+
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    statuses: Dict[str, Counter] = field(default_factory=lambda: defaultdict(Counter))
+    errors: Counter = field(default_factory=Counter)
+    alerts: int = 0
+    measuring: bool = False
+
+    def record(self, endpoint: str, latency_ms: float, status: Optional[int], error: Optional[str]) -> None:
+        if not self.measuring:
+            return
+        self.latencies[endpoint].append(latency_ms)
+        if error is not None:
+            self.errors[f"{endpoint}:{error}"] += 1
+            self.statuses[endpoint]["error"] += 1
+        else:
+            self.statuses[endpoint][str(status)] += 1
+
+
+async def timed_get(
+    client: httpx.AsyncClient, stats: LoadStats, endpoint: str, path: str, params: dict
+) -> Optional[httpx.Response]:
+    start = time.perf_counter()
+    try:
+        response = await client.get(path, params=params)
+    except httpx.HTTPError as exc:
+        stats.record(endpoint, (time.perf_counter() - start) * 1000, None, type(exc).__name__)
+        return None
+    stats.record(endpoint, (time.perf_counter() - start) * 1000, response.status_code, None)
+    return response
+
+
+async def load_hotspots(client: httpx.AsyncClient, stats: LoadStats, limit: int) -> Optional[HotspotIndex]:
+    response = await timed_get(client, stats, ENDPOINT_ALL, "/hotspots/all", {"limit": limit})
+    if response is None or response.status_code != 200:
+        return None
+    return HotspotIndex(response.json()["data"])
+
+
+async def drive(
+    client: httpx.AsyncClient, stats: LoadStats, args, rng: random.Random, stop_at: float
+) -> None:
+    """單一車輛：開啟 App、沿幹道行駛並依序觸發請求，直到測試結束"""
+    routes = [Route(points) for points in ARTERIALS.values()]
+    while time.monotonic() < stop_at:
+        route = rng.choice(routes)
+        forward = rng.random() < 0.5
+        travelled = rng.uniform(0, route.length)
+        speed = rng.uniform(args.min_speed_kmh, args.max_speed_kmh) / 3.6
+        session_end = min(stop_at, time.monotonic() + args.session_minutes * 60 * rng.uniform(0.5, 1.5))
+
+        index = await load_hotspots(client, stats, args.all_limit)
+        refreshed_at = time.monotonic()
+        alerted: set = set()
+
+        while time.monotonic() < session_end:
+            await asyncio.sleep(args.poll_seconds * rng.uniform(0.9, 1.1))
+            travelled += speed * args.poll_seconds * (1 if forward else -1)
+            if travelled >= route.length or travelled <= 0:
+                forward = not forward
+                travelled = min(max(travelled, 0.0), route.length)
+
+            if index is None or time.monotonic() - refreshed_at >= args.refresh_seconds:
+                index = await load_hotspots(client, stats, args.all_limit) or index
+                refreshed_at = time.monotonic()
+            if index is None:
+                continue
+
+            nearby = index.within(route.position(travelled), args.alert_distance)
+            for hotspot_id in nearby:
+                if hotspot_id in alerted:
+                    continue
+                alerted.add(hotspot_id)
+                if stats.measuring:
+                    stats.alerts += 1
+                if rng.random() < args.detail_probability:
+                    await timed_get(
+                        client,
+                        stats,
+                        ENDPOINT_DETAIL,
+                        f"/hotspots/{hotspot_id}",
+                        {"include_accidents": "true"},
+                    )
+            # 離開警示範圍後，再次進入時重新警示
+            alerted.intersection_update(nearby)
+
+
+def build_results(stats: LoadStats, elapsed: float) -> Dict[str, dict]:
+    results = {}
+    for endpoint, samples in stats.latencies.items():
+        statuses = stats.statuses[endpoint]
+        total = sum(statuses.values())
+        failed = sum(count for status, count in statuses.items() if status == "error" or int(status) >= 500)
+        results[endpoint] = {
+            **summarize(samples),
+            "throughput_rps": round(total / elapsed, 2),
+            "error_rate": round(failed / total, 4) if total else 0.0,
+            "rate_limited_rate": round(statuses.get("429", 0) / total, 4) if total else 0.0,
+            "shed_rate": round(statuses.get("503", 0) / total, 4) if total else 0.0,
+            "statuses": dict(statuses),
+        }
+    return results
+
+
+async def main_async(args) -> None:
+    stats = LoadStats()
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    timeout = httpx.Timeout(args.timeout)
+    base_url = args.base_url.rstrip("/") + args.api_prefix
+    rng = random.Random(args.seed)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        stop_at = time.monotonic() + args.ramp_up + args.duration
+        tasks = []
+        for vehicle in range(args.vehicles):
+            tasks.append(asyncio.create_task(drive(client, stats, args, random.Random(rng.random()), stop_at)))
+            # 車輛在 ramp-up 期間陸續上路
+            if args.ramp_up:
+                await asyncio.sleep(args.ramp_up / args.vehicles)
+        print(f"{args.vehicles} 輛車已上路，開始量測 {args.duration}s")
+        stats.measuring = True
+        measure_start = time.monotonic()
+        await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - measure_start
+
+    results = build_results(stats, elapsed)
+    total_requests = sum(sum(statuses.values()) for statuses in stats.statuses.values())
+    print()
+    print(format_summary_table(results))
+    print()
+    print(f"{'endpoint':<20}{'req/s':>10}{'error %':>10}{'429 %':>10}{'503 %':>10}")
+    for endpoint, result in results.items():
+        print(
+            f"{endpoint:<20}{result['throughput_rps']:>10.1f}{result['error_rate'] * 100:>10.2f}"
+            f"{result['rate_limited_rate'] * 100:>10.2f}{result['shed_rate'] * 100:>10.2f}"
+        )
+    print(f"\n總計 {total_requests / elapsed:.1f} req/s，警示 {stats.alerts} 次")
+    for error, count in stats.errors.most_common(5):
+        print(f"  {error}: {count}")
+
+    parameters = {
+        key: value for key, value in vars(args).items() if key not in ("output", "baseline")
+    }
+    parameters["total_rps"] = round(total_requests / elapsed, 2)
+    if args.output:
+        write_report(build_report("gps_replay", parameters, results), args.output)
+        print(f"\n結果已寫入 {args.output}")
+    if args.baseline:
+        print()
+        print("\n".join(compare_to_baseline(results, args.baseline)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GPS 軌跡重播負載測試")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="API 位址")
+    parser.add_argument("--api-prefix", default="/api/v1", help="API 路徑前綴")
+    parser.add_argument("--vehicles", type=int, default=200, help="同時行駛的車輛數")
+    parser.add_argument("--poll-seconds", type=float, default=1.0, help="GPS 更新間隔（秒）")
+    parser.add_argument("--duration", type=float, default=120, help="量測時間（秒，不含 ramp-up）")
+    parser.add_argument("--ramp-up", type=float, default=10, help="車輛陸續上路的時間（秒）")
+    parser.add_argument("--session-minutes", type=float, default=20, help="平均行程長度（分鐘），結束後重新開啟 App")
+    parser.add_argument("--refresh-seconds", type=float, default=300, help="重新載入全部熱點的間隔（秒）")
+    parser.add_argument("--alert-distance", type=float, default=500, help="警示距離（公尺）")
+    parser.add_argument("--detail-probability", type=float, default=0.1, help="收到警示後點開詳情的機率")
+    parser.add_argument("--all-limit", type=int, default=10000, help="/hotspots/all 的 limit")
+    parser.add_argument("--min-speed-kmh", type=float, default=15, help="最低車速")
+    parser.add_argument("--max-speed-kmh", type=float, default=50, help="最高車速")
+    parser.add_argument("--max-connections", type=int, default=200, help="HTTP 連線數上限")
+    parser.add_argument("--timeout", type=float, default=10, help="請求逾時（秒）")
+    parser.add_argument("--seed", type=int, default=7, help="亂數種子")
+    parser.add_argument("--output", help="結果 JSON 輸出路徑")
+    parser.add_argument("--baseline", help="要比較的基準結果 JSON")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+中介層吞吐量基準測試：BaseHTTPMiddleware 與純 ASGI 實作比較
+
+以相同的速率限制器與耗時紀錄邏輯，分別包成 BaseHTTPMiddleware（舊版）與
+純 ASGI 中介層（目前版本），量測以下端點的 requests/sec：
+- `/ping`：無任何處理的路由，反映中介層本身的開銷
+- `/api/v1/hotspots/all`：以記憶體中的合成熱點取代資料庫查詢，包含序列化成本
+
+使用範例：
+  cd backend
+  python -m benchmarks.bench_middleware
+  python -m benchmarks.bench_middleware --requests 5000 --concurrency 50 --hotspots 2000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable
+
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from src.api import api_router
+from src.core.logging import RequestTimingMiddleware
+from src.core.middleware import (
+    RateLimitMiddleware,
+    TokenBucketLimiter,
+    rate_limit_exceeded_response,
+)
+from src.db.session import get_db
+from src.models.hotspot import Hotspot
+from src.services.hotspot_service import HotspotService
+
+
+class LegacyTimingMiddleware(BaseHTTPMiddleware):
+    """舊版耗時中介層（BaseHTTPMiddleware）"""
+
+    def __init__(self, app) -> None:
+        super().__init__(app)
+        self.logger = logging.getLogger("api.request")
+
+    async def dispatch(self, request: Request, call_next: Callable):
+        start = time.perf_counter()
+        response = await call_next(request)
+        duration_ms = (time.perf_counter() - start) * 1000
+        self.logger.info(
+            "API 請求 %s %s 完成，狀態碼=%s，耗時=%.2fms",
+            request.method,
+            request.url.path,
+            response.status_code,
+            duration_ms,
+        )
+        response.headers["X-Response-Time-ms"] = f"{duration_ms:.2f}"
+        return response
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """舊版速率限制中介層（BaseHTTPMiddleware，限制邏輯與目前版本相同）"""
+
+    def __init__(self, app, requests_per_minute: int, burst_size: int) -> None:
+        super().__init__(app)
+        self.requests_per_minute = requests_per_minute
+        self.limiter = TokenBucketLimiter(requests_per_minute, burst_size)
+
+    async def dispatch(self, request: Request, call_next: Callable):
+        client_id = request.client.host if request.client else "unknown"
+        retry_after = self.limiter.acquire(client_id)
+        if retry_after > 0:
+            return rate_limit_exceeded_response(retry_after, self.requests_per_minute)
+        return await call_next(request)
+
+
+def _synthetic_hotspots(count: int) -> list[Hotspot]:
+    """產生合成熱點（不寫入資料庫）"""
+    rng = random.Random(7)
+    today = date.today()
+    now = datetime.now(timezone.utc)
+    hotspots = []
+    for _ in range(count):
+        lat = 25.03 + rng.uniform(-0.1, 0.1)
+        lng = 121.56 + rng.uniform(-0.1, 0.1)
+        a1, a2, a3 = rng.randint(0, 3), rng.randint(0, 20), rng.randint(5, 60)
+        hotspots.append(
+            Hotspot(
+                id=uuid.uuid4(),
+                center_latitude=Decimal(f"{lat:.7f}"),
+                center_longitude=Decimal(f"{lng:.7f}"),
+                radius_meters=rng.randint(50, 2000),
+                total_accidents=a1 + a2 + a3,
+                a1_count=a1,
+                a2_count=a2,
+                a3_count=a3,
+                earliest_accident_at=now - timedelta(days=300),
+                latest_accident_at=now - timedelta(days=1),
+                analysis_date=today,
+                analysis_period_days=365,
+                analysis_period_start=today - timedelta(days=365),
+                analysis_period_end=today - timedelta(days=1),
+                accident_ids=json.dumps([]),
+            )
+        )
+    return hotspots
+
+
+def build_app(stack: str) -> FastAPI:
+    """建立指定中介層組合的應用程式"""
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api/v1")
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    def override_db():
+        yield None
+
+    app.dependency_overrides[get_db] = override_db
+
+    limit = 10**9  # 基準測試不觸發限制，只量測中介層開銷
+    if stack == "base-http":
+        app.add_middleware(LegacyRateLimitMiddleware, requests_per_minute=limit, burst_size=limit)
+        app.add_middleware(LegacyTimingMiddleware)
+    else:
+        app.add_middleware(RateLimitMiddleware, requests_per_minute=limit, burst_size=limit)
+        app.add_middleware(RequestTimingMiddleware)
+    return app
+
+
+async def measure(app: FastAPI, path: str, requests: int, concurrency: int) -> float:
+    """以固定併發數送出請求，回傳 requests/sec"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # 暖身
+        for _ in range(20):
+            (await client.get(path)).raise_for_status()
+
+        remaining = requests
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                response = await client.get(path)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - start)
+
+
+async def main_async(args) -> None:
+    hotspots = _synthetic_hotspots(args.hotspots)
+    HotspotService.get_all = staticmethod(lambda db, **kwargs: hotspots[: kwargs.get("limit")])
+    logging.getLogger("api.request").setLevel(logging.WARNING)
+    logging.getLogger("src.api.hotspots").setLevel(logging.WARNING)
+
+    paths = ["/ping", f"/api/v1/hotspots/all?limit={args.hotspots}"]
+    print(f"requests={args.requests} concurrency={args.concurrency} hotspots={args.hotspots}")
+    print(f"{'path':<40}{'base-http req/s':>18}{'pure-asgi req/s':>18}{'speedup':>10}")
+    for path in paths:
+        requests = args.requests if path == "/ping" else max(100, args.requests // 10)
+        results = {}
+        for stack in ("base-http", "pure-asgi"):
+            results[stack] = await measure(build_app(stack), path, requests, args.concurrency)
+        print(
+            f"{path:<40}{results['base-http']:>18,.0f}{results['pure-asgi']:>18,.0f}"
+            f"{results['pure-asgi'] / results['base-http']:>9.2f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="中介層吞吐量基準測試")
+    parser.add_argument("--requests", type=int, default=5000, help="/ping 的請求數")
+    parser.add_argument("--concurrency", type=int, default=20, help="併發數")
+    parser.add_argument("--hotspots", type=int, default=1000, help="/hotspots/all 回傳熱點數")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+速率限制器微基準測試：100k 個不同客戶端
+
+比較舊版（每個客戶端保存 datetime 列表）與 GCRA 實作的吞吐量與記憶體用量。
+
+使用範例：
+  cd backend
+  python -m benchmarks.bench_rate_limiter
+  python -m benchmarks.bench_rate_limiter --clients 100000 --requests 1000000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from src.core.middleware import TokenBucketLimiter
+
+
+class LegacyListLimiter:
+    """舊版實作：每個客戶端保存一分鐘內的請求時間列表，且永不淘汰"""
+
+    def __init__(self, requests_per_minute: int = 60):
+        self.requests_per_minute = requests_per_minute
+        self._rate_limits: dict[str, list[datetime]] = defaultdict(list)
+
+    def acquire(self, client_id: str) -> bool:
+        now = datetime.now()
+        minute_ago = now - timedelta(minutes=1)
+        self._rate_limits[client_id] = [
+            req_time for req_time in self._rate_limits[client_id] if req_time > minute_ago
+        ]
+        if len(self._rate_limits[client_id]) >= self.requests_per_minute:
+            return False
+        self._rate_limits[client_id].append(now)
+        return True
+
+
+def _client_ids(count: int) -> list[str]:
+    return [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(count)]
+
+
+def run(name: str, limiter, client_ids: list[str], requests: int, seed: int) -> dict:
+    """執行單一實作的基準測試"""
+    rng = random.Random(seed)
+    # 熱門客戶端佔多數請求（Zipf-like），其餘均勻分布
+    sequence = [client_ids[min(int(rng.paretovariate(1.2)) - 1, len(client_ids) - 1)]
+                if rng.random() < 0.5 else rng.choice(client_ids)
+                for _ in range(requests)]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for client_id in sequence:
+        limiter.acquire(client_id)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "name": name,
+        "requests": requests,
+        "seconds": elapsed,
+        "ops_per_sec": requests / elapsed,
+        "ns_per_op": elapsed / requests * 1e9,
+        "peak_memory_mb": peak / 1024 / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="速率限制器微基準測試")
+    parser.add_argument("--clients", type=int, default=100_000, help="不同客戶端數量")
+    parser.add_argument("--requests", type=int, default=500_000, help="總請求數")
+    parser.add_argument("--max-clients", type=int, default=50_000, help="GCRA LRU 容量上限")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    client_ids = _client_ids(args.clients)
+    results = [
+        run("legacy-list", LegacyListLimiter(60), client_ids, args.requests, args.seed),
+        run(
+            "gcra-lru",
+            TokenBucketLimiter(60, burst_size=10, max_clients=args.max_clients),
+            client_ids,
+            args.requests,
+            args.seed,
+        ),
+    ]
+
+    print(f"clients={args.clients} requests={args.requests}")
+    print(f"{'limiter':<14}{'ops/sec':>14}{'ns/op':>10}{'peak MB':>10}")
+    for result in results:
+        print(
+            f"{result['name']:<14}{result['ops_per_sec']:>14,.0f}"
+            f"{result['ns_per_op']:>10.0f}{result['peak_memory_mb']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""基準測試結果的統計、輸出與基準比較（各 benchmark 共用）"""
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import json
+import platform
+import statistics
+import subprocess
+
+
+def summarize(samples_ms: Sequence[float]) -> Dict[str, float]:
+    """計算延遲分佈（毫秒）：p50/p95/p99 與平均、最小、最大值"""
+    ordered = sorted(samples_ms)
+    if len(ordered) == 1:
+        p50 = p95 = p99 = ordered[0]
+    else:
+        # method="inclusive" 讓百分位數落在觀測值範圍內，樣本少時也不會外插
+        cuts = statistics.quantiles(ordered, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    return {
+        "count": len(ordered),
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "min_ms": round(ordered[0], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def git_revision() -> Optional[str]:
+    """目前的 git commit（不在 git 工作目錄時回傳 None）"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(benchmark: str, parameters: dict, results: Dict[str, dict]) -> dict:
+    """組合可存檔比較的結果 JSON"""
+    return {
+        "benchmark": benchmark,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "parameters": parameters,
+        "results": results,
+    }
+
+
+def write_report(report: dict, path: str) -> None:
+    Path(path).write_text(json.dumps(report, ensure_ascii=False, indent=2, default=str))
+
+
+def compare_to_baseline(
+    results: Dict[str, dict], baseline_path: str, metrics: Sequence[str] = ("p50_ms", "p95_ms", "p99_ms")
+) -> List[str]:
+    """與基準結果比較，回傳各案例的變化（正值代表變慢）"""
+    baseline = json.loads(Path(baseline_path).read_text())["results"]
+    lines = [f"{'case':<32}" + "".join(f"{metric:>32}" for metric in metrics)]
+    for case, summary in results.items():
+        previous = baseline.get(case)
+        if previous is None:
+            continue
+        cells = []
+        for metric in metrics:
+            before, after = previous.get(metric), summary.get(metric)
+            if not before or after is None:
+                cells.append(f"{'-':>32}")
+                continue
+            change = (after - before) / before * 100
+            cells.append(f"{f'{before:.6g} → {after:.6g} ({change:+.0f}%)':>32}")
+        lines.append(f"{case:<32}" + "".join(cells))
+    return lines
+
+
+def format_summary_table(results: Dict[str, dict]) -> str:
+    """輸出易讀的延遲表格"""
+    lines = [f"{'case':<32}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+    for case, summary in results.items():
+        lines.append(
+            f"{case:<32}{summary['count']:>7}{summary['p50_ms']:>10.2f}"
+            f"{summary['p95_ms']:>10.2f}{summary['p99_ms']:>10.2f}{summary['max_ms']:>10.2f}"
+        )
+    return "\n".join(lines)
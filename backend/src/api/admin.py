@@ -1,18 +1,20 @@
 """管理端點 API"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, PositiveInt, conlist, field_validator, model_validator
 import uuid
 
 from src.db.session import get_db
-from src.core.auth import decode_hs256_jwt
+from src.core.auth import verify_admin_token
 from src.core.config import get_settings
-from src.core.errors import UnauthorizedError
+from src.core.errors import NotFoundError, UnauthorizedError
 from src.core.logging import get_logger
+from src.core.profiling import profile_store
 from src.services.data_ingestion import DataIngestionService
-from src.services.hotspot_analysis import HotspotAnalysisService
+from src.models.analysis_run import AnalysisRun
 
 logger = get_logger(__name__)
 settings = get_settings()
@@ -26,17 +28,7 @@ def require_admin(
     if credentials is None or credentials.scheme.lower() != "bearer":
         raise UnauthorizedError("此端點需要 Bearer Token")
 
-    payload = decode_hs256_jwt(credentials.credentials, settings.admin_jwt_secret)
-    role = payload.get("role")
-    scope = payload.get("scope")
-
-    # 允許 role=admin 或 scope 內含 admin 字樣
-    if role != "admin":
-        scope_values = str(scope).split() if scope else []
-        if "admin" not in scope_values:
-            raise UnauthorizedError("此端點需要管理員權限")
-
-    return payload
+    return verify_admin_token(credentials.credentials, settings.admin_jwt_secret)
 
 
 router = APIRouter(dependencies=[Depends(require_admin)])
@@ -49,10 +41,28 @@ class DataIngestionRequest(BaseModel):
 
 
 class HotspotAnalysisRequest(BaseModel):
-    """熱點分析請求"""
+    """
+    熱點分析請求（指定 analysis_periods 時一次分析多個期間，忽略 analysis_period_days）
+
+    incremental 只重新聚類上一版本之後異動的區域（僅適用單一期間，與 analysis_periods 同時指定時回傳 422）
+    """
     analysis_period_days: int = 365
+    analysis_periods: Optional[conlist(PositiveInt, min_length=1)] = None
     epsilon_meters: int = 500
     min_samples: int = 5
+    incremental: bool = False
+
+    @field_validator("analysis_periods")
+    @classmethod
+    def _dedupe_periods(cls, value: Optional[List[int]]) -> Optional[List[int]]:
+        """移除重複的期間（保留原順序），避免重複分析與發佈同一個期間"""
+        return list(dict.fromkeys(value)) if value is not None else None
+
+    @model_validator(mode="after")
+    def _check_incremental(self) -> "HotspotAnalysisRequest":
+        if self.incremental and self.analysis_periods is not None:
+            raise ValueError("incremental 僅適用單一分析期間，不可與 analysis_periods 同時指定")
+        return self
 
 
 @router.post("/ingest")
@@ -76,7 +86,7 @@ async def trigger_data_ingestion(
         )
 
         job_id = str(uuid.uuid4())
-        logger.info(f"資料擷取完成: job_id={job_id}, result={result}")
+        logger.info("資料擷取完成: job_id=%s, result=%s", job_id, result)
 
         return {
             "message": "資料擷取工作已排程",
@@ -84,7 +94,7 @@ async def trigger_data_ingestion(
             "result": result,
         }
     except Exception as e:
-        logger.error(f"資料擷取失敗: {e}", exc_info=True)
+        logger.error("資料擷取失敗: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="資料擷取失敗")
 
 
@@ -100,23 +110,108 @@ async def trigger_hotspot_analysis(
     """
     try:
         logger.info("觸發熱點分析")
-        service = HotspotAnalysisService(db)
+        # 分析依賴 scikit-learn / NumPy，延後到實際觸發時才載入，API worker 啟動不需付出匯入成本
+        from src.services.hotspot_analysis import HotspotAnalysisService
+
+        service = HotspotAnalysisService(db, trace_memory=settings.analysis_trace_memory)
         request_data = request or HotspotAnalysisRequest()
 
-        hotspot_count = service.analyze(
-            analysis_period_days=request_data.analysis_period_days,
-            epsilon_meters=request_data.epsilon_meters,
-            min_samples=request_data.min_samples,
-        )
+        hotspot_counts = None
+        if request_data.analysis_periods is not None:
+            hotspot_counts = service.analyze_periods(
+                analysis_periods=request_data.analysis_periods,
+                epsilon_meters=request_data.epsilon_meters,
+                min_samples=request_data.min_samples,
+                workers=settings.analysis_workers,
+            )
+            hotspot_count = sum(hotspot_counts.values())
+        else:
+            hotspot_count = service.analyze(
+                analysis_period_days=request_data.analysis_period_days,
+                epsilon_meters=request_data.epsilon_meters,
+                min_samples=request_data.min_samples,
+                incremental=request_data.incremental,
+            )
 
         job_id = str(uuid.uuid4())
-        logger.info(f"熱點分析完成: job_id={job_id}, hotspot_count={hotspot_count}")
+        logger.info("熱點分析完成: job_id=%s, hotspot_count=%s", job_id, hotspot_count)
 
-        return {
+        response = {
             "message": "熱點分析工作已排程",
             "job_id": job_id,
             "hotspot_count": hotspot_count,
         }
+        if hotspot_counts is not None:
+            response["hotspot_counts"] = {
+                str(period_days): count for period_days, count in hotspot_counts.items()
+            }
+        return response
     except Exception as e:
-        logger.error(f"熱點分析失敗: {e}", exc_info=True)
+        logger.error("熱點分析失敗: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="熱點分析失敗")
+
+
+def _serialize_analysis_run(run: AnalysisRun) -> Dict[str, Any]:
+    """序列化分析執行紀錄為 API 回應格式"""
+    return {
+        "id": str(run.id),
+        "source": run.source,
+        "status": run.status,
+        "analysis_period_days": run.analysis_period_days,
+        "epsilon_meters": run.epsilon_meters,
+        "min_samples": run.min_samples,
+        "started_at": run.started_at.isoformat(),
+        "finished_at": run.finished_at.isoformat(),
+        "wall_ms": run.wall_ms,
+        "cpu_ms": run.cpu_ms,
+        "peak_memory_bytes": run.peak_memory_bytes,
+        "max_rss_bytes": run.max_rss_bytes,
+        "accident_count": run.accident_count,
+        "hotspot_count": run.hotspot_count,
+        "stages": run.stages,
+        "error_message": run.error_message,
+    }
+
+
+@router.get("/analysis-runs")
+async def list_analysis_runs(
+    limit: int = Query(20, description="最多回傳數量", ge=1, le=200),
+    analysis_period_days: Optional[int] = Query(None, description="只列出指定分析期間"),
+    db: Session = Depends(get_db),
+):
+    """
+    列出最近的熱點分析執行紀錄
+
+    包含各階段（讀取事故、建立陣列、DBSCAN、統計、半徑、寫入）的耗時、
+    CPU 時間、記憶體峰值與資料筆數，用於追蹤分析成本隨資料量成長的變化。
+    """
+    query = db.query(AnalysisRun)
+    if analysis_period_days is not None:
+        query = query.filter(AnalysisRun.analysis_period_days == analysis_period_days)
+    runs = query.order_by(AnalysisRun.started_at.desc()).limit(limit).all()
+    return {"data": [_serialize_analysis_run(run) for run in runs]}
+
+
+@router.get("/profiles")
+async def list_profiles():
+    """
+    列出最近的請求剖析結果
+
+    以 `X-Profile: 1` 標頭（需管理員 Token）或抽樣觸發，僅保留於目前執行個體的記憶體中。
+    """
+    return {"data": profile_store.list()}
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """下載請求剖析結果（speedscope JSON，可於 https://www.speedscope.app 開啟）"""
+    record = profile_store.get(profile_id)
+    if record is None:
+        raise NotFoundError("剖析結果", profile_id)
+
+    return JSONResponse(
+        content=record.speedscope,
+        headers={
+            "Content-Disposition": f'attachment; filename="profile-{profile_id}.speedscope.json"'
+        },
+    )
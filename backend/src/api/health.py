@@ -1,28 +1,33 @@
-"""健康檢查端點：GET /health, 資料庫連線檢查"""
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import text
-from datetime import datetime
+"""健康檢查端點：GET /health, /health/live, /health/ready"""
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
 
-from src.db.session import get_db
-from src.core.errors import AppError
+from src.services.health_service import HealthService, get_health_service
 
 router = APIRouter()
 
 
 @router.get("/health")
-async def health_check(db: Session = Depends(get_db)) -> dict:
-    """健康檢查端點"""
-    try:
-        # 檢查資料庫連線
-        db.execute(text("SELECT 1"))
-        db_status = "connected"
-    except Exception:
-        db_status = "disconnected"
-
-    return {
-        "status": "healthy" if db_status == "connected" else "unhealthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "database": db_status,
-    }
+async def health_check(service: HealthService = Depends(get_health_service)) -> dict:
+    """
+    健康檢查端點
 
+    回報資料庫連線、連線池、快取命中率、分析版本、最近擷取與分析時間及 event loop 延遲；
+    資料庫檢查結果會短暫快取，頻繁呼叫不會每次都連線資料庫。
+    """
+    return await service.report()
+
+
+@router.get("/health/live")
+async def liveness_probe(service: HealthService = Depends(get_health_service)) -> dict:
+    """存活探測（不接觸資料庫）"""
+    return service.liveness()
+
+
+@router.get("/health/ready")
+async def readiness_probe(service: HealthService = Depends(get_health_service)):
+    """就緒探測（資料庫無法連線時回傳 503）"""
+    result = await service.readiness()
+    if result["status"] != "ready":
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=result)
+    return result
@@ -9,6 +9,7 @@ import re
 from src.db.session import get_db
 from src.core.errors import NotFoundError
 from src.core.logging import get_logger
+from src.core.request_context import PHASE_ORM_HYDRATE, PHASE_SERIALIZE, timed_phase
 from src.services.hotspot_service import HotspotService, calculate_severity_score
 from src.models.accident import Accident
 
@@ -65,6 +66,27 @@ def _serialize_hotspot(hotspot):
     }
 
 
+def _serialize_hotspot_detail(hotspot):
+    """序列化熱點詳細資訊為 API 回應格式"""
+    return {
+        "id": str(hotspot.id),
+        "center_latitude": float(hotspot.center_latitude),
+        "center_longitude": float(hotspot.center_longitude),
+        "radius_meters": hotspot.radius_meters,
+        "total_accidents": hotspot.total_accidents,
+        "a1_count": hotspot.a1_count,
+        "a2_count": hotspot.a2_count,
+        "a3_count": hotspot.a3_count,
+        "earliest_accident_at": hotspot.earliest_accident_at.isoformat(),
+        "latest_accident_at": hotspot.latest_accident_at.isoformat(),
+        "analysis_date": hotspot.analysis_date.isoformat(),
+        "analysis_period_days": hotspot.analysis_period_days,
+        "analysis_period_start": hotspot.analysis_period_start.isoformat(),
+        "analysis_period_end": hotspot.analysis_period_end.isoformat(),
+        "severity_score": calculate_severity_score(hotspot),
+    }
+
+
 def _serialize_accident(accident: Accident):
     """序列化事故為 API 回應格式"""
     return {
@@ -104,18 +126,22 @@ async def get_all_hotspots(
         sanitized_severity = _normalize_severity_levels(severity_levels)
 
         logger.info(
-            f"查詢所有熱點: period_days={validated_days}, "
-            f"severity_levels={sanitized_severity}, limit={limit}"
+            "查詢所有熱點: period_days=%s, severity_levels=%s, limit=%s",
+            validated_days,
+            sanitized_severity,
+            limit,
         )
 
-        hotspots = HotspotService.get_all(
-            db=db,
-            period_days=validated_days,
-            severity_levels=sanitized_severity,
-            limit=limit,
-        )
+        with timed_phase(PHASE_ORM_HYDRATE, exclude_db_time=True):
+            hotspots = HotspotService.get_all(
+                db=db,
+                period_days=validated_days,
+                severity_levels=sanitized_severity,
+                limit=limit,
+            )
 
-        hotspot_data = [_serialize_hotspot(h) for h in hotspots]
+        with timed_phase(PHASE_SERIALIZE):
+            hotspot_data = [_serialize_hotspot(h) for h in hotspots]
 
         return {
             "data": hotspot_data,
@@ -125,7 +151,7 @@ async def get_all_hotspots(
             },
         }
     except Exception as e:
-        logger.error(f"查詢所有熱點失敗: {e}", exc_info=True)
+        logger.error("查詢所有熱點失敗: %s", e, exc_info=True)
         raise
 
 
@@ -144,8 +170,10 @@ async def get_hotspot_by_id(
     """
     sanitized_severity = _normalize_severity_levels(severity_levels)
     logger.info(
-        f"查詢熱點詳細資訊: hotspot_id={hotspot_id}, include_accidents={include_accidents}, "
-        f"severity_levels={sanitized_severity}"
+        "查詢熱點詳細資訊: hotspot_id=%s, include_accidents=%s, severity_levels=%s",
+        hotspot_id,
+        include_accidents,
+        sanitized_severity,
     )
 
     # 驗證 UUID 格式
@@ -156,33 +184,21 @@ async def get_hotspot_by_id(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="無效的 UUID 格式"
         )
 
-    hotspot = HotspotService.get_by_id(db, hotspot_id)
+    with timed_phase(PHASE_ORM_HYDRATE, exclude_db_time=True):
+        hotspot = HotspotService.get_by_id(db, hotspot_id)
     if not hotspot:
         raise NotFoundError("熱點", hotspot_id)
 
-    result = {
-        "id": str(hotspot.id),
-        "center_latitude": float(hotspot.center_latitude),
-        "center_longitude": float(hotspot.center_longitude),
-        "radius_meters": hotspot.radius_meters,
-        "total_accidents": hotspot.total_accidents,
-        "a1_count": hotspot.a1_count,
-        "a2_count": hotspot.a2_count,
-        "a3_count": hotspot.a3_count,
-        "earliest_accident_at": hotspot.earliest_accident_at.isoformat(),
-        "latest_accident_at": hotspot.latest_accident_at.isoformat(),
-        "analysis_date": hotspot.analysis_date.isoformat(),
-        "analysis_period_days": hotspot.analysis_period_days,
-        "analysis_period_start": hotspot.analysis_period_start.isoformat(),
-        "analysis_period_end": hotspot.analysis_period_end.isoformat(),
-        "severity_score": calculate_severity_score(hotspot),
-    }
+    with timed_phase(PHASE_SERIALIZE):
+        result = _serialize_hotspot_detail(hotspot)
 
     if include_accidents:
         # 查詢熱點包含的事故記錄
-        accidents = HotspotService.get_accidents_by_hotspot_id(
-            db, hotspot_id, severity_levels=sanitized_severity
-        )
-        result["accidents"] = [_serialize_accident(acc) for acc in accidents]
+        with timed_phase(PHASE_ORM_HYDRATE, exclude_db_time=True):
+            accidents = HotspotService.get_accidents_by_hotspot_id(
+                db, hotspot_id, severity_levels=sanitized_severity
+            )
+        with timed_phase(PHASE_SERIALIZE):
+            result["accidents"] = [_serialize_accident(acc) for acc in accidents]
 
     return {"data": result}
@@ -0,0 +1,63 @@
+"""指標端點：GET /metrics（Prometheus 文字格式）"""
+import ipaddress
+from typing import Optional, Sequence, Union
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import PlainTextResponse
+from fastapi.security import HTTPAuthorizationCredentials
+
+from src.api.admin import bearer_scheme, require_admin
+from src.core.config import get_settings
+from src.core.metrics import REGISTRY
+
+settings = get_settings()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def parse_networks(value: str) -> tuple[IPNetwork, ...]:
+    """
+    解析允許清單，例如 `127.0.0.1/32,10.0.0.0/8`
+
+    Raises:
+        ValueError: 格式錯誤
+    """
+    return tuple(
+        ipaddress.ip_network(item, strict=False)
+        for item in filter(None, (part.strip() for part in value.split(",")))
+    )
+
+
+def client_allowed(host: Optional[str], networks: Sequence[IPNetwork]) -> bool:
+    """檢查來源 IP 是否在允許清單內（無法解析的來源一律不允許）"""
+    if not host:
+        return False
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in networks)
+
+
+ALLOWED_NETWORKS = parse_networks(settings.metrics_allowed_networks)
+
+
+def require_metrics_access(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> None:
+    """允許清單內的來源（例如同機或內網的 Prometheus）可直接讀取，其餘需要管理員 Token"""
+    host = request.client.host if request.client else None
+    if not client_allowed(host, ALLOWED_NETWORKS):
+        require_admin(credentials)
+
+
+router = APIRouter(dependencies=[Depends(require_metrics_access)])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    """輸出所有應用程式指標"""
+    return PlainTextResponse(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -78,4 +78,19 @@ def encode_hs256_jwt(payload: Dict[str, Any], secret: str) -> str:
     return f"{header_b64}.{payload_b64}.{signature_b64}"
 
 
-__all__ = ["decode_hs256_jwt", "encode_hs256_jwt"]
+def verify_admin_token(token: str, secret: str) -> Dict[str, Any]:
+    """驗證 JWT 並確認具備管理員權限（role=admin 或 scope 內含 admin）"""
+    payload = decode_hs256_jwt(token, secret)
+    role = payload.get("role")
+    scope = payload.get("scope")
+
+    # 允許 role=admin 或 scope 內含 admin 字樣
+    if role != "admin":
+        scope_values = str(scope).split() if scope else []
+        if "admin" not in scope_values:
+            raise UnauthorizedError("此端點需要管理員權限")
+
+    return payload
+
+
+__all__ = ["decode_hs256_jwt", "encode_hs256_jwt", "verify_admin_token"]
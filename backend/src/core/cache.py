@@ -1,8 +1,11 @@
 """API Response Caching：快取機制"""
+from collections import OrderedDict
 from functools import wraps
-from typing import Callable, Any, Optional
+from typing import Callable, Any, Hashable, Optional
 import hashlib
 import json
+import threading
+import time
 from datetime import datetime, timedelta
 
 from src.core.logging import get_logger
@@ -31,7 +34,7 @@ def cache_response(ttl_seconds: int = 300, key_prefix: str = ""):
             if cache_key in _cache:
                 cached_value, cached_time = _cache[cache_key]
                 if datetime.now() - cached_time < timedelta(seconds=ttl_seconds):
-                    logger.debug(f"快取命中: {cache_key}")
+                    logger.debug("快取命中: %s", cache_key)
                     return cached_value
                 else:
                     # 過期，移除
@@ -42,7 +45,7 @@ def cache_response(ttl_seconds: int = 300, key_prefix: str = ""):
 
             # 儲存到快取
             _cache[cache_key] = (result, datetime.now())
-            logger.debug(f"快取儲存: {cache_key}")
+            logger.debug("快取儲存: %s", cache_key)
 
             return result
 
@@ -68,9 +71,11 @@ def clear_cache(key_prefix: Optional[str] = None):
         keys_to_remove = [k for k in _cache.keys() if k.startswith(key_prefix)]
         for key in keys_to_remove:
             del _cache[key]
-        logger.info(f"清除快取: {len(keys_to_remove)} 個鍵")
+        logger.info("清除快取: %s 個鍵", len(keys_to_remove))
     else:
         _cache.clear()
+        nearby_cache.clear()
+        hotspot_version_cache.clear()
         logger.info("清除所有快取")
 
 
@@ -79,6 +84,76 @@ def get_cache_stats() -> dict:
     return {
         "total_keys": len(_cache),
         "keys": list(_cache.keys()),
+        "nearby": nearby_cache.stats(),
     }
 
 
+class LRUCache:
+    """
+    具 TTL 與容量上限的 LRU 快取
+
+    超過容量時淘汰最久未使用的項目，並統計命中率供監控使用。
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """取得快取值（不存在或已過期時回傳 None）"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """儲存快取值"""
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """清除所有項目與統計"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """取得快取統計資訊"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# 附近熱點查詢快取（以 geohash 網格 + 篩選條件為鍵）
+nearby_cache = LRUCache(max_entries=4096, ttl_seconds=300)
+
+# 目前發佈的分析版本（以分析期間為鍵）：快取命中時不需再查詢 hotspot_publications，
+# 同一行程發佈新版本時立即清除，其他行程（排程腳本）發佈的版本最多延遲 TTL 秒生效
+hotspot_version_cache = LRUCache(max_entries=16, ttl_seconds=5)
@@ -17,6 +17,11 @@ class Settings(BaseSettings):
     # 應用程式設定
     environment: str = "development"
     log_level: str = "INFO"
+    # 日誌格式：json（單行 JSON，含 request_id）或 text（本機開發用）
+    log_format: str = "json"
+    # 各 logger 的 INFO 日誌保留比例，例如 "api.request=0.1,src.api.hotspots=0.1"
+    log_sample_rates: str = ""
+    log_queue_size: int = 10_000
 
     # API 設定
     api_v1_prefix: str = "/api/v1"
@@ -24,6 +29,55 @@ class Settings(BaseSettings):
     # CORS 設定
     cors_origins: str = "*"
 
+    # 速率限制設定（GCRA token bucket，以客戶端 IP 計算）
+    rate_limit_requests_per_minute: int = 60
+    rate_limit_burst_size: int = 10
+    rate_limit_max_clients: int = 100_000
+    # 昂貴操作（含事故列表的熱點詳情、管理端點等）的獨立額度，單位為成本點數
+    rate_limit_expensive_per_minute: int = 30
+    rate_limit_expensive_burst_size: int = 20
+    # 依實際資料庫耗時追加計費：每個 token 對應的毫秒數（0 表示停用）
+    rate_limit_ms_per_token: float = 0
+
+    # SQL 監測設定：請求超過查詢數或資料庫耗時門檻時記錄語句
+    sql_instrumentation_enabled: bool = True
+    sql_request_max_queries: int = 20
+    sql_request_max_db_time_ms: float = 500
+    sql_repeated_statement_threshold: int = 10
+    # 慢查詢記錄 EXPLAIN (ANALYZE, BUFFERS) 的門檻（毫秒，0 表示停用；會重複執行該查詢）
+    sql_explain_slow_ms: float = 0
+
+    # 回應附帶 Server-Timing 標頭（db、orm-hydrate、merge、serialize、cache 等階段耗時）
+    server_timing_enabled: bool = True
+
+    # 熱點分析是否以 tracemalloc 量測各階段記憶體峰值（會拖慢分析，預設只記錄 RSS）
+    analysis_trace_memory: bool = False
+    # 多期間熱點分析（analysis_periods）平行執行 DBSCAN 的 worker 行程數（1 表示依序執行）
+    analysis_workers: int = 1
+
+    # 請求剖析：X-Profile: 1（需管理員 Token）或依比例抽樣，結果以 speedscope JSON 保存
+    profiling_enabled: bool = True
+    profiling_sample_rate: float = 0.0
+    profiling_interval_ms: float = 5
+    profiling_max_profiles: int = 20
+
+    # Event loop 延遲監控：超過門檻時記錄阻塞當下的堆疊
+    loop_monitor_enabled: bool = True
+    loop_monitor_interval_ms: float = 100
+    loop_block_threshold_ms: float = 200
+
+    # 健康檢查：資料庫檢查結果快取秒數，分析結果超過天數時 /health 回報 degraded（0 表示不檢查）
+    health_check_ttl_seconds: float = 10
+    health_max_analysis_age_days: int = 30
+
+    # /metrics：停用時不掛載；允許清單（CIDR，逗號分隔）內的來源免驗證，其餘需要管理員 Token
+    metrics_enabled: bool = True
+    metrics_allowed_networks: str = "127.0.0.1/32,::1/128"
+
+    # 過載保護設定（自適應併發限制）
+    load_shedding_enabled: bool = True
+    load_shedding_max_inflight: int = 64
+
     # Pydantic v2 配置方式
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -48,7 +48,7 @@ async def validation_error_handler(request: Request, exc: RequestValidationError
 
 async def sqlalchemy_error_handler(request: Request, exc: SQLAlchemyError) -> JSONResponse:
     """處理資料庫錯誤"""
-    logger.error(f"資料庫錯誤: {exc}", exc_info=True)
+    logger.error("資料庫錯誤: %s", exc, exc_info=True)
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
@@ -60,7 +60,7 @@ async def sqlalchemy_error_handler(request: Request, exc: SQLAlchemyError) -> JS
 
 async def generic_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     """處理一般例外"""
-    logger.error(f"未處理的例外: {exc}", exc_info=True)
+    logger.error("未處理的例外: %s", exc, exc_info=True)
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
@@ -0,0 +1,111 @@
+"""Geohash 工具：座標網格量化與距離計算"""
+from math import asin, cos, radians, sin, sqrt
+from typing import Tuple
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE_MAP = {char: index for index, char in enumerate(_BASE32)}
+
+EARTH_RADIUS_METERS = 6371008.8
+
+# 查詢半徑（公尺）對應的 geohash 精度
+# 精度 7 約 153m x 153m、精度 6 約 1.2km x 0.6km、精度 5 約 4.9km x 4.9km
+# 網格需與查詢半徑同一數量級：太細則快取分散，太粗則每格需撈取過多熱點
+DISTANCE_PRECISION = {
+    100: 7,
+    500: 6,
+    1000: 6,
+    3000: 5,
+}
+
+
+def encode(latitude: float, longitude: float, precision: int = 7) -> str:
+    """將經緯度編碼為 geohash 字串"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        target_range, value = (lng_range, longitude) if even else (lat_range, latitude)
+        mid = (target_range[0] + target_range[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            target_range[0] = mid
+        else:
+            bits <<= 1
+            target_range[1] = mid
+        even = not even
+
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def decode_bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """
+    解碼 geohash 為網格邊界
+
+    Returns:
+        (min_lat, min_lng, max_lat, max_lng)
+    """
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        try:
+            value = _DECODE_MAP[char]
+        except KeyError as exc:
+            raise ValueError(f"無效的 geohash 字元: {char}") from exc
+        for shift in range(4, -1, -1):
+            target_range = lng_range if even else lat_range
+            mid = (target_range[0] + target_range[1]) / 2
+            if (value >> shift) & 1:
+                target_range[0] = mid
+            else:
+                target_range[1] = mid
+            even = not even
+
+    return (lat_range[0], lng_range[0], lat_range[1], lng_range[1])
+
+
+def decode_center(geohash: str) -> Tuple[float, float]:
+    """解碼 geohash 為網格中心點 (lat, lng)"""
+    min_lat, min_lng, max_lat, max_lng = decode_bounds(geohash)
+    return ((min_lat + max_lat) / 2, (min_lng + max_lng) / 2)
+
+
+def cell_half_diagonal_meters(geohash: str) -> float:
+    """計算網格中心到角落的距離（網格內任一點到中心的上界）"""
+    min_lat, min_lng, max_lat, max_lng = decode_bounds(geohash)
+    center_lat, center_lng = (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+    # 靠近赤道的一側經度跨距較寬，取兩個角落的最大值
+    return max(
+        haversine_meters(center_lat, center_lng, min_lat, min_lng),
+        haversine_meters(center_lat, center_lng, max_lat, max_lng),
+    )
+
+
+def precision_for_distance(distance: int) -> int:
+    """取得查詢半徑對應的 geohash 精度（非標準半徑取最接近且不小於的設定）"""
+    if distance in DISTANCE_PRECISION:
+        return DISTANCE_PRECISION[distance]
+    for allowed in sorted(DISTANCE_PRECISION):
+        if distance <= allowed:
+            return DISTANCE_PRECISION[allowed]
+    return min(DISTANCE_PRECISION.values())
+
+
+def haversine_meters(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """計算兩點間的大圓距離（公尺）"""
+    phi1, phi2 = radians(lat1), radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = radians(lng2 - lng1)
+    a = sin(d_phi / 2) ** 2 + cos(phi1) * cos(phi2) * sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * asin(min(1.0, sqrt(a)))
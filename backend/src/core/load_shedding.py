@@ -0,0 +1,254 @@
+"""Load Shedding：自適應併發限制與過載保護"""
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Optional, Sequence
+import math
+import re
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.logging import get_logger
+from src.core.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+CRITICAL_CLASS = "critical"
+DEFAULT_CLASS = "default"
+
+
+@dataclass(frozen=True)
+class RouteClass:
+    """
+    路由類別設定
+
+    Attributes:
+        name: 類別名稱
+        patterns: 路徑比對的正規表示式
+        initial_limit: 初始併發上限
+        min_limit: 併發上限下限
+        max_limit: 併發上限上限
+        target_latency_ms: 目標延遲，超過時視為過載並降低上限
+        critical: 是否為安全關鍵路徑（不受全域併發上限限制）
+    """
+
+    name: str
+    patterns: tuple["re.Pattern[str]", ...] = ()
+    initial_limit: int = 8
+    min_limit: int = 1
+    max_limit: int = 32
+    target_latency_ms: float = 1000
+    critical: bool = False
+
+    def matches(self, path: str) -> bool:
+        """檢查路徑是否屬於此類別"""
+        return any(pattern.match(path) for pattern in self.patterns)
+
+
+class AdaptiveLimit:
+    """
+    AIMD 自適應併發上限
+
+    請求在目標延遲內完成且上限確實被使用時加性增加（每個完整視窗約 +1），
+    逾時或伺服器錯誤時乘性減少，使上限收斂在資料庫能承受的併發數附近。
+    """
+
+    def __init__(self, route_class: RouteClass, backoff_ratio: float = 0.9):
+        self.route_class = route_class
+        self.backoff_ratio = backoff_ratio
+        self.limit = float(route_class.initial_limit)
+        self.inflight = 0
+        self.shed_count = 0
+        self.latency_ewma_ms = 0.0
+
+    def try_acquire(self) -> bool:
+        """嘗試取得執行名額"""
+        if self.inflight >= int(self.limit):
+            return False
+        self.inflight += 1
+        return True
+
+    def release(self, latency_ms: float, failed: bool, inflight_at_start: int) -> None:
+        """
+        釋放執行名額並調整上限
+
+        Args:
+            latency_ms: 請求耗時
+            failed: 是否為伺服器錯誤
+            inflight_at_start: 請求開始時的併發數（含自己）
+        """
+        self.inflight -= 1
+        self.latency_ewma_ms = (
+            latency_ms if self.latency_ewma_ms == 0 else
+            self.latency_ewma_ms * 0.9 + latency_ms * 0.1
+        )
+
+        route_class = self.route_class
+        if failed or latency_ms > route_class.target_latency_ms:
+            self.limit = max(route_class.min_limit, self.limit * self.backoff_ratio)
+        elif inflight_at_start * 2 >= self.limit:
+            self.limit = min(route_class.max_limit, self.limit + 1 / self.limit)
+
+    def retry_after_seconds(self) -> int:
+        """依近期延遲估計建議的重試秒數"""
+        return max(1, math.ceil(self.latency_ewma_ms / 1000))
+
+    def snapshot(self) -> dict:
+        """取得目前狀態"""
+        return {
+            "limit": round(self.limit, 2),
+            "inflight": self.inflight,
+            "shed": self.shed_count,
+            "latency_ewma_ms": round(self.latency_ewma_ms, 2),
+        }
+
+
+def default_route_classes(api_prefix: str = "/api/v1") -> list[RouteClass]:
+    """
+    預設路由類別（依序比對，未符合者歸入 DEFAULT_CLASS）
+
+    客戶端取得警示熱點的 /hotspots/all 與健康檢查為安全關鍵路徑，擁有獨立且較高的上限；
+    單一熱點詳細資訊（地圖瀏覽）與管理端點在全域併發滿載時優先被拒絕。
+    """
+    prefix = re.escape(api_prefix)
+    return [
+        RouteClass(
+            CRITICAL_CLASS,
+            patterns=(
+                re.compile(rf"^{prefix}/health"),
+                re.compile(rf"^{prefix}/hotspots/all$"),
+            ),
+            initial_limit=32,
+            min_limit=8,
+            max_limit=128,
+            target_latency_ms=300,
+            critical=True,
+        ),
+        RouteClass(
+            "map",
+            patterns=(re.compile(rf"^{prefix}/hotspots/"),),
+            initial_limit=16,
+            min_limit=2,
+            max_limit=64,
+            target_latency_ms=1500,
+        ),
+        RouteClass(
+            "admin",
+            patterns=(re.compile(rf"^{prefix}/admin/"),),
+            initial_limit=2,
+            min_limit=1,
+            max_limit=4,
+            target_latency_ms=60_000,
+        ),
+    ]
+
+
+def overloaded_response(retry_after: int) -> JSONResponse:
+    """建立 503 回應（含 Retry-After 標頭）"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "error": "service_overloaded",
+            "message": "伺服器忙碌中，請稍後再試",
+        },
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+class LoadSheddingMiddleware:
+    """
+    自適應併發限制中介層（純 ASGI 實作）
+
+    每個路由類別各自維護 AIMD 併發上限；非關鍵類別另受全域併發上限約束，
+    因此過載時地圖瀏覽請求會先被快速拒絕（503），關鍵的警示熱點清單與健康檢查維持暢通。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        route_classes: Optional[Sequence[RouteClass]] = None,
+        max_inflight: int = 64,
+    ):
+        """
+        初始化中介層
+
+        Args:
+            app: ASGI 應用程式
+            route_classes: 路由類別設定（預設使用 default_route_classes()）
+            max_inflight: 非關鍵類別共用的全域併發上限
+        """
+        self.app = app
+        self.max_inflight = max_inflight
+        self.route_classes = list(
+            route_classes if route_classes is not None else default_route_classes()
+        )
+        self.limits = {rc.name: AdaptiveLimit(rc) for rc in self.route_classes}
+        if DEFAULT_CLASS not in self.limits:
+            self.limits[DEFAULT_CLASS] = AdaptiveLimit(RouteClass(DEFAULT_CLASS))
+        self.total_inflight = 0
+        REGISTRY.register_collector(
+            "load_shedding", self._metric_samples, documentation="過載保護狀態"
+        )
+
+    def _metric_samples(self):
+        for name, limit in self.limits.items():
+            labels = {"route_class": name}
+            yield ("load_shedding_limit", labels, limit.limit)
+            yield ("load_shedding_inflight", labels, limit.inflight)
+            yield ("load_shedding_shed_total", labels, limit.shed_count)
+
+    def classify(self, path: str) -> AdaptiveLimit:
+        """取得路徑所屬類別的併發上限"""
+        for route_class in self.route_classes:
+            if route_class.matches(path):
+                return self.limits[route_class.name]
+        return self.limits[DEFAULT_CLASS]
+
+    def snapshot(self) -> dict:
+        """取得各類別目前狀態"""
+        return {
+            "total_inflight": self.total_inflight,
+            "max_inflight": self.max_inflight,
+            "classes": {name: limit.snapshot() for name, limit in self.limits.items()},
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.classify(scope["path"])
+        critical = limit.route_class.critical
+        if (not critical and self.total_inflight >= self.max_inflight) or not limit.try_acquire():
+            limit.shed_count += 1
+            logger.warning(
+                "過載保護拒絕請求: path=%s, class=%s, inflight=%s, limit=%.1f",
+                scope["path"],
+                limit.route_class.name,
+                limit.inflight,
+                limit.limit,
+            )
+            await overloaded_response(limit.retry_after_seconds())(scope, receive, send)
+            return
+
+        self.total_inflight += 1
+        inflight_at_start = limit.inflight
+        status_code = 500
+        start = perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.total_inflight -= 1
+            limit.release(
+                (perf_counter() - start) * 1000,
+                failed=status_code >= 500,
+                inflight_at_start=inflight_at_start,
+            )
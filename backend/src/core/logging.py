@@ -1,29 +1,212 @@
 """日誌設定：結構化日誌與請求耗時監控"""
+import atexit
+import copy
+import json
 import logging
+import queue
+import random
+import re
 import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 from time import perf_counter
-from typing import Any
+from typing import Any, Callable, Dict, Mapping, Optional
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from src.core.metrics import (
+    HTTP_REQUESTS_IN_FLIGHT,
+    LOG_RECORDS_DROPPED,
+    record_request,
+    route_template,
+)
+from src.core.request_context import (
+    get_request_context,
+    reset_request_context,
+    start_request_context,
+)
 
-def setup_logging(log_level: str = "INFO") -> None:
-    """設定結構化日誌"""
-    # 設定日誌格式
-    log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    date_format = "%Y-%m-%d %H:%M:%S"
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
-    # 設定根日誌記錄器
+# LogRecord 內建屬性，其餘屬性（logger 呼叫時以 extra 傳入者）輸出為 JSON 欄位
+_RESERVED_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord("", logging.INFO, "", 0, "", None, None))
+) | {"message", "asctime", "request_id"}
+
+_listener: Optional[QueueListener] = None
+_listener_running = False
+
+
+class JsonFormatter(logging.Formatter):
+    """單行 JSON 格式（欄位名稱相容 Cloud Logging 的 severity / message）"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "severity": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            payload["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exception"] = record.exc_text
+        if record.stack_info:
+            payload["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    依 logger 名稱抽樣 INFO 以下的日誌
+
+    rates 以 logger 名稱（含子 logger）對應保留比例，最長前綴優先；
+    WARNING 以上一律保留，未設定的 logger 全數保留。
+    """
+
+    def __init__(self, rates: Mapping[str, float], rand: Callable[[], float] = random.random):
+        super().__init__()
+        self._rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+        self._rand = rand
+        self._resolved: Dict[str, float] = {}
+
+    def rate_for(self, name: str) -> float:
+        """取得 logger 的保留比例"""
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            for prefix, prefix_rate in self._rates:
+                if name == prefix or name.startswith(prefix + "."):
+                    rate = prefix_rate
+                    break
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1.0 or self._rand() < rate
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """
+    解析抽樣設定，例如 `api.request=0.1,src.api.hotspots=0.2`
+
+    Raises:
+        ValueError: 格式錯誤或比例不在 0~1 之間
+    """
+    rates: Dict[str, float] = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, separator, rate_text = item.partition("=")
+        if not separator or not name.strip():
+            raise ValueError(f"日誌抽樣設定格式錯誤: {item}")
+        rate = float(rate_text)
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError(f"日誌抽樣比例需介於 0 到 1 之間: {item}")
+        rates[name.strip()] = rate
+    return rates
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    將日誌放入佇列，由背景執行緒格式化並寫出
+
+    呼叫端（event loop）只做 %-格式化與擷取 request_id；
+    JSON 序列化、例外堆疊格式化與 stdout 寫入都在 QueueListener 執行緒完成。
+    佇列滿時丟棄並計入 `log_records_dropped_total`，不阻塞請求。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if getattr(record, "request_id", None) is None:
+            request_context = get_request_context()
+            record.request_id = request_context.request_id if request_context else None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+def start_log_listener() -> None:
+    """啟動背景寫出執行緒（API 於 lifespan 啟動時呼叫；之前的日誌暫存在佇列中）"""
+    global _listener_running
+    if _listener is not None and not _listener_running:
+        _listener.start()
+        _listener_running = True
+
+
+def stop_log_listener() -> None:
+    """停止背景寫出執行緒（會先寫出佇列中剩餘的日誌）"""
+    global _listener_running
+    if _listener is not None and _listener_running:
+        _listener.stop()
+        _listener_running = False
+
+
+atexit.register(stop_log_listener)
+
+
+def setup_logging(
+    log_level: str = "INFO",
+    log_format: str = "json",
+    sample_rates: Optional[Mapping[str, float]] = None,
+    queue_size: int = 10_000,
+    start_listener: bool = True,
+) -> None:
+    """
+    設定結構化日誌
+
+    根日誌記錄器原有的 handler（例如 uvicorn 或 pytest 先設定的）會被替換為佇列 handler。
+
+    Args:
+        log_level: 日誌等級
+        log_format: `json`（單行 JSON）或 `text`（本機開發用）
+        sample_rates: 各 logger 的 INFO 以下日誌保留比例
+        queue_size: 日誌佇列容量（滿時丟棄新日誌）
+        start_listener: 是否立即啟動背景寫出執行緒（False 時由呼叫端呼叫 start_log_listener）
+    """
+    global _listener
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if log_format == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT, DATE_FORMAT))
+
+    queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    if sample_rates:
+        queue_handler.addFilter(SamplingFilter(sample_rates))
+
+    # 設定根日誌記錄器（force：已有 handler 時 basicConfig 不會生效）
     logging.basicConfig(
         level=getattr(logging, log_level.upper()),
-        format=log_format,
-        datefmt=date_format,
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-        ],
+        handlers=[queue_handler],
+        force=True,
     )
 
+    stop_log_listener()
+    _listener = QueueListener(queue_handler.queue, stream_handler)
+    if start_listener:
+        start_log_listener()
+
     # 設定第三方套件日誌等級
     logging.getLogger("uvicorn").setLevel(logging.INFO)
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
@@ -35,24 +218,122 @@ def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
 
 
-class RequestTimingMiddleware(BaseHTTPMiddleware):
-    """量測並記錄 HTTP 請求耗時的中介層"""
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
 
-    def __init__(self, app) -> None:
-        super().__init__(app)
+
+def _request_id_from_scope(scope: Scope) -> str:
+    """沿用上游（負載平衡器、前端）傳入的 X-Request-ID，格式不符或未提供時產生新的"""
+    for name, value in scope.get("headers", ()):
+        if name == b"x-request-id":
+            request_id = value.decode("latin-1")
+            if _REQUEST_ID_PATTERN.match(request_id):
+                return request_id
+            break
+    return uuid.uuid4().hex
+
+
+class RequestTimingMiddleware:
+    """
+    量測並記錄 HTTP 請求耗時的中介層（純 ASGI 實作）
+
+    不經過 BaseHTTPMiddleware 的 task 與 stream 包裝，串流回應可直接傳遞；
+    `X-Response-Time-ms` 為送出回應標頭前的耗時，日誌則記錄整個回應送完的耗時。
+    同時以路由樣板為標籤更新 `/metrics` 的請求數與延遲分組，
+    並建立請求上下文統計 SQL 查詢數與資料庫耗時，超過門檻時記錄語句；
+    各處理階段耗時以 Server-Timing 標頭回傳，可在瀏覽器 devtools 直接檢視。
+    每個請求帶有 request_id（X-Request-ID），請求期間的日誌都會附上該欄位。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_queries: Optional[int] = None,
+        max_db_time_ms: Optional[float] = None,
+        repeated_statement_threshold: int = 10,
+        server_timing: bool = True,
+        timing_allow_origin: Optional[str] = None,
+    ) -> None:
+        """
+        初始化中介層
+
+        Args:
+            app: ASGI 應用程式
+            max_queries: 單一請求查詢數門檻（與 max_db_time_ms 皆未設定時不檢查）
+            max_db_time_ms: 單一請求資料庫耗時門檻（毫秒）
+            repeated_statement_threshold: 同一語句重複執行達此次數時視為疑似 N+1
+            server_timing: 是否輸出 Server-Timing 標頭（各處理階段耗時）
+            timing_allow_origin: Timing-Allow-Origin 標頭值，允許跨來源頁面的
+                Resource Timing API 讀取 Server-Timing（None 表示不輸出）
+        """
+        self.app = app
+        self.server_timing = server_timing
+        self.timing_allow_origin = timing_allow_origin if server_timing else None
         self.logger = logging.getLogger("api.request")
+        if max_queries is None and max_db_time_ms is None:
+            self.query_thresholds = None
+        else:
+            self.query_thresholds = (
+                max_queries if max_queries is not None else float("inf"),
+                max_db_time_ms if max_db_time_ms is not None else float("inf"),
+                repeated_statement_threshold,
+            )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(self, request: Request, call_next):
         start = perf_counter()
-        response = await call_next(request)
-        duration_ms = (perf_counter() - start) * 1000
-
-        self.logger.info(
-            "API 請求 %s %s 完成，狀態碼=%s，耗時=%.2fms",
-            request.method,
-            request.url.path,
-            response.status_code,
-            duration_ms,
+        status_code = 500
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        request_id = _request_id_from_scope(scope)
+        request_context, context_token = start_request_context(
+            scope["method"], scope["path"], request_id
         )
-        response.headers["X-Response-Time-ms"] = f"{duration_ms:.2f}"
-        return response
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                duration_ms = (perf_counter() - start) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Response-Time-ms", f"{duration_ms:.2f}")
+                headers.append("X-Request-ID", request_id)
+                if self.server_timing:
+                    headers.append("Server-Timing", request_context.server_timing(duration_ms))
+                if self.timing_allow_origin:
+                    headers.append("Timing-Allow-Origin", self.timing_allow_origin)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            duration = perf_counter() - start
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            record_request(scope["method"], route_template(scope), status_code, duration)
+            # 伺服器錯誤以 WARNING 記錄，不受請求日誌抽樣影響
+            self.logger.log(
+                logging.WARNING if status_code >= 500 else logging.INFO,
+                "API 請求 %s %s 完成，狀態碼=%s，耗時=%.2fms，查詢=%d 次/%.2fms",
+                scope["method"],
+                scope["path"],
+                status_code,
+                duration * 1000,
+                request_context.query_count,
+                request_context.db_time_ms,
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": route_template(scope),
+                    "status": status_code,
+                    "duration_ms": round(duration * 1000, 2),
+                    "db_queries": request_context.query_count,
+                    "db_time_ms": round(request_context.db_time_ms, 2),
+                },
+            )
+            if self.query_thresholds is not None and request_context.query_count:
+                # 延遲匯入：src.db.instrumentation 依賴本模組的 get_logger
+                from src.db.instrumentation import report_request_queries
+
+                report_request_queries(request_context, *self.query_thresholds)
+            reset_request_context(context_token)
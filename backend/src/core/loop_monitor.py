@@ -0,0 +1,126 @@
+"""Event Loop Monitor：量測 event loop 延遲並偵測阻塞呼叫"""
+from time import perf_counter
+from typing import List, Optional
+import asyncio
+import sys
+import threading
+import traceback
+
+from src.core.logging import get_logger
+from src.core.metrics import EVENT_LOOP_BLOCKED, EVENT_LOOP_LAG, EVENT_LOOP_LAG_LAST
+
+logger = get_logger(__name__)
+
+# 擷取阻塞堆疊時保留的最內層 frame 數
+STACK_LIMIT = 30
+
+
+class EventLoopMonitor:
+    """
+    Event loop 延遲監控
+
+    背景 task 每 interval 秒 sleep 一次，實際醒來時間與預期的差距即為 loop 延遲；
+    另一個 watchdog 執行緒檢查 task 的心跳，loop 被佔用超過門檻時當下擷取 loop
+    執行緒的堆疊（事後量測無法得知是誰阻塞），因此能直接指出同步 DB 呼叫或 CPU 密集迴圈。
+    每個阻塞事件只擷取一次堆疊，平時成本僅為每 interval 一次的 sleep 與心跳檢查。
+    """
+
+    def __init__(self, interval: float = 0.1, block_threshold: float = 0.2):
+        """
+        初始化監控
+
+        Args:
+            interval: 量測間隔（秒）
+            block_threshold: 視為阻塞並擷取堆疊的延遲門檻（秒）
+        """
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.blocked_count = 0
+        self.last_blocked_stack: Optional[List[str]] = None
+        self._heartbeat = perf_counter()
+        self._reported_heartbeat: Optional[float] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """在目前的 event loop 啟動監控（需於 loop 中呼叫，例如 FastAPI lifespan）"""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = perf_counter()
+        self._stop_event.clear()
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="event-loop-monitor")
+        self._watchdog = threading.Thread(
+            target=self._watch, name="event-loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """停止監控"""
+        self._stop_event.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    async def _run(self) -> None:
+        while True:
+            expected = perf_counter() + self.interval
+            self._heartbeat = perf_counter()
+            await asyncio.sleep(self.interval)
+            self.record_lag(max(0.0, perf_counter() - expected))
+
+    def record_lag(self, lag: float) -> None:
+        """記錄一次 loop 延遲（秒）"""
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        EVENT_LOOP_LAG.observe(lag)
+        EVENT_LOOP_LAG_LAST.set(lag)
+
+    def _watch(self) -> None:
+        # 檢查頻率取門檻的一半，阻塞期間最晚在 1.5 倍門檻內擷取到堆疊
+        check_interval = max(0.01, self.block_threshold / 2)
+        while not self._stop_event.wait(check_interval):
+            heartbeat = self._heartbeat
+            blocked_for = perf_counter() - heartbeat - self.interval
+            if blocked_for >= self.block_threshold and self._reported_heartbeat != heartbeat:
+                self._reported_heartbeat = heartbeat
+                self._report_blocked(blocked_for)
+
+    def _report_blocked(self, blocked_for: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = traceback.format_stack(frame, limit=STACK_LIMIT)
+        self.blocked_count += 1
+        self.last_blocked_stack = stack
+        EVENT_LOOP_BLOCKED.inc()
+        logger.warning(
+            "Event loop 已阻塞 %.0fms，目前執行位置:\n%s", blocked_for * 1000, "".join(stack)
+        )
+
+    def snapshot(self) -> dict:
+        """取得目前狀態"""
+        return {
+            "running": self.running,
+            "lag_ms": round(self.last_lag * 1000, 2),
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+            "blocked_count": self.blocked_count,
+        }
+
+
+loop_monitor = EventLoopMonitor()
@@ -0,0 +1,303 @@
+"""Metrics：Prometheus 文字格式的應用程式指標"""
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import threading
+
+# 請求延遲（秒）的預設分組
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 分析工作耗時（秒）的預設分組
+JOB_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+
+LabelValues = Tuple[str, ...]
+# 回呼收集器回傳 (指標名稱, 標籤, 數值)
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    """指標基底類別：依標籤值建立子項目（子類別需實作 _new_child）"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, object] = {}
+        # 只有建立新的標籤組合時才需要鎖，熱路徑上的更新不取鎖
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """取得指定標籤值的子項目"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    @abstractmethod
+    def _new_child(self):
+        """建立新標籤組合的子項目"""
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values: LabelValues, child) -> List[str]:
+        labels = _format_labels(self.labelnames, values)
+        return [f"{self.name}{labels} {_format_value(child.value)}"]
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+
+class Counter(_Metric):
+    """只增不減的計數器"""
+
+    metric_type = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0, labels: LabelValues = ()) -> None:
+        self.labels(*labels).value += amount
+
+
+class Gauge(_Metric):
+    """可增可減的量測值"""
+
+    metric_type = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0, labels: LabelValues = ()) -> None:
+        self.labels(*labels).value += amount
+
+    def dec(self, amount: float = 1.0, labels: LabelValues = ()) -> None:
+        self.labels(*labels).value -= amount
+
+    def set(self, value: float, labels: LabelValues = ()) -> None:
+        self.labels(*labels).value = value
+
+
+class _HistogramValue:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, bucket_count: int):
+        self.counts = [0] * bucket_count
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """分組統計（累積分組於輸出時計算，記錄時只更新單一分組）"""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def _new_child(self):
+        return _HistogramValue(len(self.buckets))
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        child = self.labels(*labels)
+        child.counts[bisect_left(self.buckets, value)] += 1
+        child.sum += value
+        child.count += 1
+
+    def _render_child(self, values: LabelValues, child) -> List[str]:
+        lines = []
+        cumulative = 0
+        labelnames = self.labelnames + ("le",)
+        for bound, count in zip(self.buckets, child.counts):
+            cumulative += count
+            labels = _format_labels(labelnames, values + (_format_value(bound),))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """指標註冊表"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Tuple[str, str, Callable[[], Iterable[Sample]]]] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def register_collector(
+        self,
+        name: str,
+        collect: Callable[[], Iterable[Sample]],
+        metric_type: str = "gauge",
+        documentation: str = "",
+    ) -> None:
+        """
+        註冊回呼收集器（輸出時才計算，例如連線池或快取統計）
+
+        同名收集器會被取代，回呼回傳的每個樣本名稱需以 name 為前綴。
+        """
+        self._collectors[name] = (metric_type, documentation, collect)
+
+    def unregister_collector(self, name: str) -> None:
+        self._collectors.pop(name, None)
+
+    def render(self) -> str:
+        """輸出 Prometheus 文字格式"""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+
+        for name, (metric_type, documentation, collect) in self._collectors.items():
+            try:
+                samples = list(collect())
+            except Exception:  # 收集失敗不影響其他指標
+                continue
+            emitted = set()
+            for sample_name, labels, value in samples:
+                if sample_name not in emitted:
+                    lines.append(f"# HELP {sample_name} {documentation or sample_name}")
+                    lines.append(f"# TYPE {sample_name} {metric_type}")
+                    emitted.add(sample_name)
+                label_names = tuple(labels)
+                label_values = tuple(labels[key] for key in label_names)
+                label_text = _format_labels(label_names, label_values)
+                lines.append(f"{sample_name}{label_text} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.register(
+    Counter("http_requests_total", "HTTP 請求數", ("method", "route", "status"))
+)
+HTTP_REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds", "HTTP 請求耗時（秒）", ("method", "route")
+    )
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.register(
+    Gauge("http_requests_in_flight", "處理中的 HTTP 請求數")
+)
+LOG_RECORDS_DROPPED = REGISTRY.register(
+    Counter("log_records_dropped_total", "日誌佇列已滿而丟棄的日誌數")
+)
+ANALYSIS_JOB_DURATION = REGISTRY.register(
+    Histogram(
+        "analysis_job_duration_seconds",
+        "熱點分析工作耗時（秒）",
+        ("period_days", "status"),
+        buckets=JOB_BUCKETS,
+    )
+)
+ANALYSIS_STAGE_DURATION = REGISTRY.register(
+    Histogram(
+        "analysis_stage_duration_seconds",
+        "熱點分析各階段耗時（秒）",
+        ("stage",),
+        buckets=(0.1, 0.5, 1, 5, 15, 30, 60, 300, 900),
+    )
+)
+EVENT_LOOP_LAG = REGISTRY.register(
+    Histogram(
+        "event_loop_lag_seconds",
+        "Event loop 延遲（秒）",
+        buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+    )
+)
+EVENT_LOOP_LAG_LAST = REGISTRY.register(
+    Gauge("event_loop_lag_last_seconds", "最近一次量測的 event loop 延遲（秒）")
+)
+EVENT_LOOP_BLOCKED = REGISTRY.register(
+    Counter("event_loop_blocked_total", "Event loop 阻塞超過門檻的次數")
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_template(scope: dict) -> str:
+    """取得請求對應的路由樣板（例如 /api/v1/hotspots/{hotspot_id}），避免以原始路徑作為標籤"""
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    return getattr(route, "path_format", None) or getattr(route, "path", UNMATCHED_ROUTE)
+
+
+def record_request(method: str, route: str, status_code: int, duration_seconds: float) -> None:
+    """記錄一次 HTTP 請求"""
+    HTTP_REQUESTS.inc(labels=(method, route, str(status_code)))
+    HTTP_REQUEST_DURATION.observe(duration_seconds, labels=(method, route))
+
+
+def _cache_samples() -> Iterable[Sample]:
+    from src.core.cache import nearby_cache
+
+    stats = nearby_cache.stats()
+    labels = {"cache": "nearby"}
+    yield ("cache_hits_total", labels, stats["hits"])
+    yield ("cache_misses_total", labels, stats["misses"])
+    yield ("cache_entries", labels, stats["size"])
+    yield ("cache_hit_ratio", labels, stats["hit_ratio"])
+
+
+def _db_pool_samples() -> Iterable[Sample]:
+    from src.db.session import get_engine
+
+    pool = get_engine().pool
+    for sample_name, attribute in (
+        ("db_pool_size", "size"),
+        ("db_pool_checked_out", "checkedout"),
+        ("db_pool_overflow", "overflow"),
+        ("db_pool_checked_in", "checkedin"),
+    ):
+        getter: Optional[Callable[[], int]] = getattr(pool, attribute, None)
+        if getter is not None:
+            yield (sample_name, {"pool": type(pool).__name__}, getter())
+
+
+REGISTRY.register_collector("cache", _cache_samples, documentation="快取統計")
+REGISTRY.register_collector("db_pool", _db_pool_samples, documentation="資料庫連線池狀態")
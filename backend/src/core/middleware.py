@@ -1,76 +1,282 @@
 """API Rate Limiting：請求速率限制"""
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
-from typing import Callable
-from datetime import datetime, timedelta
-from collections import defaultdict
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from typing import Callable, Dict, Optional, Sequence
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import perf_counter
+from urllib.parse import parse_qsl
+import math
+import re
+import threading
 import time
 
 from src.core.logging import get_logger
+from src.core.request_context import get_request_context
 
 logger = get_logger(__name__)
 
-# 簡單的記憶體速率限制器（生產環境應使用 Redis）
-_rate_limits: dict[str, list[datetime]] = defaultdict(list)
 
+class TokenBucketLimiter:
+    """
+    GCRA（Generic Cell Rate Algorithm）速率限制器
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """API 速率限制中介層"""
+    等同於容量為 burst_size、每分鐘補充 requests_per_minute 個 token 的 token bucket，
+    但每個客戶端只需儲存一個浮點數：理論抵達時間（TAT）。
+    閒置客戶端的 TAT 會落在過去，淘汰後再出現時與新客戶端等價，
+    因此以容量有上限的 LRU 儲存即可限制記憶體用量而不影響正確性。
+    """
 
     def __init__(
         self,
-        app,
         requests_per_minute: int = 60,
         burst_size: int = 10,
+        max_clients: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        初始化速率限制器
+
+        Args:
+            requests_per_minute: 每分鐘允許的持續請求數
+            burst_size: 突發請求允許的數量（bucket 容量）
+            max_clients: 最多追蹤的客戶端數量（超過時淘汰最久未使用者）
+            clock: 時間來源（秒），測試時可替換
+        """
+        self.requests_per_minute = requests_per_minute
+        self.burst_size = max(1, burst_size)
+        self.max_clients = max_clients
+        self.emission_interval = 60.0 / requests_per_minute
+        # 允許 TAT 超前目前時間的最大量：burst_size 個請求可同時通過
+        self.bucket_interval = self.emission_interval * self.burst_size
+        self._clock = clock
+        self._tat: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, client_id: str, cost: float = 1.0) -> float:
+        """
+        嘗試消耗 token
+
+        Args:
+            client_id: 客戶端識別碼
+            cost: 本次請求消耗的 token 數
+
+        Returns:
+            0 表示允許；大於 0 為需等待的秒數（拒絕時不會消耗 token）
+        """
+        now = self._clock()
+        # 單次成本超過容量時以容量計，避免請求永遠無法通過
+        increment = self.emission_interval * min(cost, self.burst_size)
+        with self._lock:
+            tat = self._tat.get(client_id, now)
+            if tat < now:
+                tat = now
+            new_tat = tat + increment
+            allow_at = new_tat - self.bucket_interval
+            # 容許浮點累積誤差，避免第 burst_size 個請求被誤判
+            if allow_at > now + 1e-9:
+                return allow_at - now
+
+            self._tat[client_id] = new_tat
+            self._tat.move_to_end(client_id)
+            if len(self._tat) > self.max_clients:
+                self._tat.popitem(last=False)
+            return 0.0
+
+    def debit(self, client_id: str, cost: float) -> None:
+        """
+        事後追加扣除 token（不做准入判斷，例如依實際耗時計費）
+
+        欠額最多累積到一個完整 bucket，避免單一慢請求使客戶端被鎖定過久。
+        """
+        if cost <= 0:
+            return
+        now = self._clock()
+        with self._lock:
+            tat = max(self._tat.get(client_id, now), now)
+            self._tat[client_id] = min(
+                tat + self.emission_interval * cost, now + 2 * self.bucket_interval
+            )
+            self._tat.move_to_end(client_id)
+            if len(self._tat) > self.max_clients:
+                self._tat.popitem(last=False)
+
+    def remaining(self, client_id: str) -> int:
+        """取得客戶端目前剩餘可用的 token 數"""
+        now = self._clock()
+        tat = max(self._tat.get(client_id, now), now)
+        used = (tat - now) / self.emission_interval
+        return max(0, math.floor(self.burst_size - used))
+
+    def reset(self) -> None:
+        """清除所有客戶端狀態"""
+        with self._lock:
+            self._tat.clear()
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+
+DEFAULT_BUDGET = "default"
+EXPENSIVE_BUDGET = "expensive"
+
+_TRUTHY_QUERY_VALUES = {"1", "true", "yes", "on"}
+
+
+@dataclass(frozen=True)
+class RouteCost:
+    """
+    路由成本設定
+
+    Attributes:
+        path_pattern: 路徑比對的正規表示式
+        cost: 每次請求消耗的 token 數
+        budget: 計入的額度名稱（昂貴操作使用獨立額度）
+        query_flag: 僅在此查詢參數為真時套用（例如 include_accidents）
+    """
+
+    path_pattern: "re.Pattern[str]"
+    cost: float = 1.0
+    budget: str = DEFAULT_BUDGET
+    query_flag: Optional[str] = None
+
+    def matches(self, path: str, query_string: bytes) -> bool:
+        """檢查請求是否套用此成本設定"""
+        if not self.path_pattern.match(path):
+            return False
+        if self.query_flag is None:
+            return True
+        for key, value in parse_qsl(query_string.decode("latin-1")):
+            if key == self.query_flag and value.lower() in _TRUTHY_QUERY_VALUES:
+                return True
+        return False
+
+
+def default_route_costs(api_prefix: str = "/api/v1") -> list[RouteCost]:
+    """
+    預設路由成本表（依序比對，第一個符合者生效；未符合者成本為 1）
+
+    新增批次、路線（corridor）或匯出等昂貴端點時，應在此登記並計入 EXPENSIVE_BUDGET。
+    """
+    prefix = re.escape(api_prefix)
+    return [
+        RouteCost(re.compile(rf"^{prefix}/health(/live|/ready)?$"), cost=0.2),
+        RouteCost(re.compile(rf"^{prefix}/hotspots/all$"), cost=2),
+        RouteCost(
+            re.compile(rf"^{prefix}/hotspots/[^/]+$"),
+            cost=5,
+            budget=EXPENSIVE_BUDGET,
+            query_flag="include_accidents",
+        ),
+        RouteCost(re.compile(rf"^{prefix}/admin/"), cost=10, budget=EXPENSIVE_BUDGET),
+    ]
+
+
+def rate_limit_exceeded_response(retry_after: float, limit: int) -> JSONResponse:
+    """建立 429 回應（含 Retry-After 標頭）"""
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={
+            "error": "rate_limit_exceeded",
+            "message": "請求過於頻繁，請稍後再試",
+        },
+        headers={
+            "Retry-After": str(max(1, math.ceil(retry_after))),
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": "0",
+        },
+    )
+
+
+class RateLimitMiddleware:
+    """API 速率限制中介層（純 ASGI 實作，依路由成本計費）"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        requests_per_minute: int = 60,
+        burst_size: int = 10,
+        max_clients: int = 100_000,
+        limiter: Optional[TokenBucketLimiter] = None,
+        route_costs: Optional[Sequence[RouteCost]] = None,
+        budgets: Optional[Dict[str, TokenBucketLimiter]] = None,
+        ms_per_token: float = 0,
     ):
         """
         初始化速率限制中介層
 
         Args:
-            app: FastAPI 應用程式
-            requests_per_minute: 每分鐘允許的請求數
-            burst_size: 突發請求允許的數量
+            app: ASGI 應用程式
+            requests_per_minute: 每分鐘允許的請求數（預設額度）
+            burst_size: 突發請求允許的數量（預設額度）
+            max_clients: 最多追蹤的客戶端數量
+            limiter: 自訂預設額度的速率限制器（預設依參數建立）
+            route_costs: 路由成本表（未提供時所有請求成本皆為 1）
+            budgets: 其他額度名稱對應的速率限制器（例如 EXPENSIVE_BUDGET）
+            ms_per_token: 依實際耗時計費時每個 token 對應的毫秒數（0 表示停用）；
+                有請求上下文時以資料庫耗時計算，否則以請求總耗時計算，
+                請求最終以「路由成本」與「耗時成本」兩者較大者計費
         """
-        super().__init__(app)
+        self.app = app
         self.requests_per_minute = requests_per_minute
         self.burst_size = burst_size
+        self.limiter = limiter or TokenBucketLimiter(
+            requests_per_minute=requests_per_minute,
+            burst_size=burst_size,
+            max_clients=max_clients,
+        )
+        self.route_costs = list(route_costs or [])
+        self.budgets = {DEFAULT_BUDGET: self.limiter, **(budgets or {})}
+        self.ms_per_token = ms_per_token
+
+    def resolve_cost(self, path: str, query_string: bytes) -> tuple[float, str]:
+        """取得請求的 (成本, 額度名稱)"""
+        for route_cost in self.route_costs:
+            if route_cost.matches(path, query_string):
+                budget = route_cost.budget if route_cost.budget in self.budgets else DEFAULT_BUDGET
+                return route_cost.cost, budget
+        return 1.0, DEFAULT_BUDGET
 
-    async def dispatch(self, request: Request, call_next: Callable):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """處理請求"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # 取得客戶端識別碼（IP 地址）
-        client_id = request.client.host if request.client else "unknown"
+        client = scope.get("client")
+        client_id = client[0] if client else "unknown"
 
         # 檢查速率限制
-        if not self._check_rate_limit(client_id):
-            logger.warning(f"速率限制觸發: client_id={client_id}")
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="請求過於頻繁，請稍後再試",
+        cost, budget = self.resolve_cost(scope["path"], scope.get("query_string", b""))
+        limiter = self.budgets[budget]
+        retry_after = limiter.acquire(client_id, cost)
+        if retry_after > 0:
+            logger.warning(
+                "速率限制觸發: client_id=%s, budget=%s, cost=%s", client_id, budget, cost
             )
-
-        # 記錄請求時間
-        _rate_limits[client_id].append(datetime.now())
+            response = rate_limit_exceeded_response(retry_after, limiter.requests_per_minute)
+            await response(scope, receive, send)
+            return
 
         # 執行請求
-        response = await call_next(request)
-        return response
+        if not self.ms_per_token:
+            await self.app(scope, receive, send)
+            return
 
-    def _check_rate_limit(self, client_id: str) -> bool:
-        """檢查是否超過速率限制"""
-        now = datetime.now()
-        minute_ago = now - timedelta(minutes=1)
-
-        # 清理過期的記錄
-        _rate_limits[client_id] = [
-            req_time for req_time in _rate_limits[client_id] if req_time > minute_ago
-        ]
-
-        # 檢查速率限制
-        request_count = len(_rate_limits[client_id])
-        if request_count >= self.requests_per_minute:
-            return False
-
-        return True
+        request_context = get_request_context()
+        db_time_before = request_context.db_time_ms if request_context else 0.0
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if request_context is not None:
+                # 有 SQL 監測時以資料庫耗時計費，不受網路傳輸或排隊時間影響
+                elapsed_ms = request_context.db_time_ms - db_time_before
+            else:
+                elapsed_ms = (perf_counter() - start) * 1000
+            limiter.debit(client_id, elapsed_ms / self.ms_per_token - cost)
 
 
 def create_rate_limit_middleware(requests_per_minute: int = 60, burst_size: int = 10):
@@ -78,5 +284,3 @@ def create_rate_limit_middleware(requests_per_minute: int = 60, burst_size: int
     def middleware(app):
         return RateLimitMiddleware(app, requests_per_minute, burst_size)
     return middleware
-
-
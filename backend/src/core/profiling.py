@@ -0,0 +1,299 @@
+"""Profiling：依需求對單一請求進行取樣式效能剖析（輸出 speedscope 格式）"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from time import perf_counter
+from types import FrameType
+from typing import Callable, Dict, List, Optional, Tuple
+import random
+import sys
+import threading
+import uuid
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.auth import verify_admin_token
+from src.core.errors import UnauthorizedError
+from src.core.logging import get_logger
+from src.core.request_context import get_request_context
+
+logger = get_logger(__name__)
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+# 單一堆疊最多保留的層數（避免遞迴過深時佔用過多記憶體）
+MAX_STACK_DEPTH = 128
+
+FrameKey = Tuple[str, str, int]
+
+
+class SamplingProfiler:
+    """
+    取樣式效能剖析器
+
+    以背景執行緒定期讀取目標執行緒的 frame（sys._current_frames），
+    不掛 sys.setprofile，被剖析的請求不需額外付出每次函式呼叫的成本。
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        """
+        初始化剖析器
+
+        Args:
+            thread_id: 要取樣的執行緒 ID（通常為 event loop 所在執行緒）
+            interval: 取樣間隔（秒）
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.sample_count = 0
+        self._frames: Dict[FrameKey, int] = {}
+        self._stacks: Dict[Tuple[int, ...], float] = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = 0.0
+        self._elapsed_ms = 0.0
+
+    def start(self) -> None:
+        """開始取樣"""
+        self._started_at = perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止取樣"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._elapsed_ms = (perf_counter() - self._started_at) * 1000
+
+    def _run(self) -> None:
+        last = perf_counter()
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = perf_counter()
+            if frame is not None:
+                self._record(frame, (now - last) * 1000)
+            last = now
+
+    def _record(self, frame: Optional[FrameType], weight_ms: float) -> None:
+        stack: List[int] = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            name = getattr(code, "co_qualname", code.co_name)
+            key = (name, code.co_filename, code.co_firstlineno)
+            index = self._frames.get(key)
+            if index is None:
+                index = self._frames[key] = len(self._frames)
+            stack.append(index)
+            frame = frame.f_back
+        stack.reverse()
+        stack_key = tuple(stack)
+        self._stacks[stack_key] = self._stacks.get(stack_key, 0.0) + weight_ms
+        self.sample_count += 1
+
+    def to_speedscope(self, name: str) -> dict:
+        """輸出 speedscope 的 sampled profile 格式（可直接拖進 https://www.speedscope.app）"""
+        frames = [
+            {"name": func_name, "file": filename, "line": line}
+            for (func_name, filename, line) in self._frames
+        ]
+        samples = [list(stack) for stack in self._stacks]
+        weights = [round(weight, 3) for weight in self._stacks.values()]
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "smart-road-safety-system",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": round(max(self._elapsed_ms, sum(weights)), 3),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+
+@dataclass
+class ProfileRecord:
+    """已完成的剖析結果"""
+
+    id: str
+    method: str
+    path: str
+    request_id: str
+    status_code: int
+    duration_ms: float
+    sample_count: int
+    trigger: str
+    created_at: str
+    speedscope: dict = field(repr=False)
+
+    def summary(self) -> dict:
+        """不含剖析內容的摘要"""
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "request_id": self.request_id,
+            "status_code": self.status_code,
+            "duration_ms": round(self.duration_ms, 2),
+            "sample_count": self.sample_count,
+            "trigger": self.trigger,
+            "created_at": self.created_at,
+        }
+
+
+class ProfileStore:
+    """保留最近的剖析結果（記憶體內，每個執行個體各自保存）"""
+
+    def __init__(self, max_profiles: int = 20):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, ProfileRecord]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, record: ProfileRecord) -> None:
+        with self._lock:
+            self._profiles[record.id] = record
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[ProfileRecord]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> List[dict]:
+        """取得摘要列表（新到舊）"""
+        with self._lock:
+            return [record.summary() for record in reversed(self._profiles.values())]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._profiles.clear()
+
+
+profile_store = ProfileStore()
+
+TRIGGER_HEADER = "header"
+TRIGGER_SAMPLED = "sampled"
+
+
+class ProfilingMiddleware:
+    """
+    依需求剖析請求的中介層（純 ASGI 實作）
+
+    帶有 `X-Profile: 1` 且附管理員 Bearer Token 的請求，或依 sample_rate 抽中的請求，
+    會在取樣式剖析器下執行；回應附上 `X-Profile-ID`，
+    之後可由 `GET /api/v1/admin/profiles/{id}` 取得 speedscope JSON。
+    同一時間只剖析一個請求，避免多個取樣執行緒互相干擾。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        admin_secret: str,
+        sample_rate: float = 0.0,
+        interval: float = 0.005,
+        store: Optional[ProfileStore] = None,
+        excluded_path_fragments: Tuple[str, ...] = ("/admin/profiles", "/metrics"),
+        rand: Callable[[], float] = random.random,
+    ):
+        """
+        初始化中介層
+
+        Args:
+            app: ASGI 應用程式
+            admin_secret: 驗證 X-Profile 請求的管理員 JWT 密鑰
+            sample_rate: 自動抽樣剖析的請求比例（0 表示只依標頭觸發）
+            interval: 取樣間隔（秒）
+            store: 剖析結果儲存（預設使用 profile_store）
+            excluded_path_fragments: 不參與抽樣的路徑片段
+            rand: 亂數來源，測試時可替換
+        """
+        self.app = app
+        self.admin_secret = admin_secret
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.store = store if store is not None else profile_store
+        self.excluded_path_fragments = excluded_path_fragments
+        self._rand = rand
+        self._active = False
+
+    def _trigger(self, scope: Scope) -> Optional[str]:
+        """判斷請求是否需要剖析，回傳觸發方式"""
+        headers = dict(scope.get("headers", ()))
+        if headers.get(b"x-profile") == b"1":
+            authorization = headers.get(b"authorization", b"").decode("latin-1")
+            scheme, _, token = authorization.partition(" ")
+            if scheme.lower() == "bearer" and token:
+                try:
+                    verify_admin_token(token.strip(), self.admin_secret)
+                    return TRIGGER_HEADER
+                except UnauthorizedError:
+                    pass
+            logger.warning("忽略未授權的剖析請求: path=%s", scope["path"])
+            return None
+
+        if self.sample_rate > 0 and self._rand() < self.sample_rate:
+            if not any(fragment in scope["path"] for fragment in self.excluded_path_fragments):
+                return TRIGGER_SAMPLED
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._active:
+            await self.app(scope, receive, send)
+            return
+
+        trigger = self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        profile_id = uuid.uuid4().hex
+        status_code = 500
+        profiler = SamplingProfiler(threading.get_ident(), self.interval)
+
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-ID", profile_id)
+            await send(message)
+
+        start = perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.stop()
+            self._active = False
+            duration_ms = (perf_counter() - start) * 1000
+            request_context = get_request_context()
+            name = f"{scope['method']} {scope['path']}"
+            self.store.add(
+                ProfileRecord(
+                    id=profile_id,
+                    method=scope["method"],
+                    path=scope["path"],
+                    request_id=request_context.request_id if request_context else "",
+                    status_code=status_code,
+                    duration_ms=duration_ms,
+                    sample_count=profiler.sample_count,
+                    trigger=trigger,
+                    created_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    speedscope=profiler.to_speedscope(name),
+                )
+            )
+            logger.info(
+                "已剖析請求 %s，取樣 %d 次，profile_id=%s",
+                name,
+                profiler.sample_count,
+                profile_id,
+            )
@@ -0,0 +1,139 @@
+"""請求上下文：以 contextvars 保存單一請求的追蹤資訊"""
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 每個請求最多保留的 SQL 語句數（避免大量查詢佔用記憶體）
+MAX_RECORDED_STATEMENTS = 50
+
+# Server-Timing 階段名稱
+PHASE_DB = "db"
+PHASE_ORM_HYDRATE = "orm-hydrate"
+PHASE_MERGE = "merge"
+PHASE_SERIALIZE = "serialize"
+PHASE_CACHE = "cache"
+PHASE_TOTAL = "total"
+
+# SQL 指紋：將字面值與綁定參數替換為 ?，使只差在參數的語句歸為同一類
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_BIND_PARAM = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\$\d+|\?")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+
+
+@dataclass
+class RequestContext:
+    """
+    單一請求的追蹤資訊
+
+    由 RequestTimingMiddleware 建立；同步路由在 threadpool 執行時會複製 context，
+    但共用同一個 RequestContext 物件，因此資料庫事件仍會累加到同一請求。
+    """
+
+    method: str = ""
+    path: str = ""
+    request_id: str = ""
+    query_count: int = 0
+    db_time_ms: float = 0.0
+    statements: List[Tuple[str, float]] = field(default_factory=list)
+    statement_counts: Counter = field(default_factory=Counter)
+    phases: Dict[str, float] = field(default_factory=dict)
+
+    def record_query(self, statement: str, duration_ms: float) -> None:
+        """記錄一次 SQL 執行"""
+        self.query_count += 1
+        self.db_time_ms += duration_ms
+        self.statement_counts[sql_fingerprint(statement)] += 1
+        if len(self.statements) < MAX_RECORDED_STATEMENTS:
+            self.statements.append((statement, duration_ms))
+
+    def add_phase(self, name: str, duration_ms: float) -> None:
+        """累加階段耗時（同一階段可多次進入）"""
+        self.phases[name] = self.phases.get(name, 0.0) + duration_ms
+
+    def server_timing(self, total_ms: Optional[float] = None) -> str:
+        """
+        組成 Server-Timing 標頭值，例如 `db;dur=12.3, serialize;dur=4.1, total;dur=20.5`
+
+        db 為 cursor 執行時間，其餘階段僅在請求中實際經過時才輸出。
+        """
+        entries = []
+        if self.query_count:
+            entries.append((PHASE_DB, self.db_time_ms))
+        entries.extend(self.phases.items())
+        if total_ms is not None:
+            entries.append((PHASE_TOTAL, total_ms))
+        return ", ".join(f"{name};dur={duration_ms:.2f}" for name, duration_ms in entries)
+
+    def repeated_statements(self, min_count: int) -> List[Tuple[str, int]]:
+        """取得重複執行至少 min_count 次的語句指紋（疑似 N+1 查詢）"""
+        return [
+            (statement, count)
+            for statement, count in self.statement_counts.most_common()
+            if count >= min_count
+        ]
+
+
+def sql_fingerprint(statement: str) -> str:
+    """
+    將 SQL 語句正規化為指紋
+
+    字面值與綁定參數替換為 ?，IN 清單收斂為 IN (?)，空白合併為單一空格；
+    例如 `WHERE id IN (%(id_1_1)s, %(id_1_2)s)` 與 `WHERE id IN (%(id_1_1)s)` 視為同一語句。
+    """
+    text = _STRING_LITERAL.sub("?", statement)
+    text = _BIND_PARAM.sub("?", text)
+    text = _NUMBER_LITERAL.sub("?", text)
+    text = _IN_LIST.sub("IN (?)", text)
+    return " ".join(text.split())
+
+
+_current: ContextVar[Optional[RequestContext]] = ContextVar("request_context", default=None)
+
+
+def start_request_context(
+    method: str = "", path: str = "", request_id: str = ""
+) -> Tuple[RequestContext, Token]:
+    """建立並啟用新的請求上下文"""
+    context = RequestContext(method=method, path=path, request_id=request_id)
+    return context, _current.set(context)
+
+
+def reset_request_context(token: Token) -> None:
+    """還原為進入請求前的上下文"""
+    _current.reset(token)
+
+
+def get_request_context() -> Optional[RequestContext]:
+    """取得目前請求的上下文（不在請求中時為 None）"""
+    return _current.get()
+
+
+@contextmanager
+def timed_phase(name: str, exclude_db_time: bool = False) -> Iterator[None]:
+    """
+    計時一個處理階段並累加到目前請求（不在請求中時不做任何事）
+
+    Args:
+        name: 階段名稱（例如 PHASE_MERGE）
+        exclude_db_time: 是否扣除階段內的資料庫耗時；
+            用於 ORM 查詢時只保留物件建構（hydrate）的時間，db 另外計算
+    """
+    context = _current.get()
+    if context is None:
+        yield
+        return
+
+    db_time_before = context.db_time_ms
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        duration_ms = (perf_counter() - start) * 1000
+        if exclude_db_time:
+            duration_ms = max(0.0, duration_ms - (context.db_time_ms - db_time_before))
+        context.add_phase(name, duration_ms)
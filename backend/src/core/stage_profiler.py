@@ -0,0 +1,141 @@
+"""Stage Profiler：批次工作的分段耗時與記憶體量測（僅依賴標準函式庫，ETL 腳本可共用）"""
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from time import perf_counter, process_time
+from typing import Iterator, List, Optional
+import sys
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows 無 resource 模組
+    resource = None
+
+
+def max_rss_bytes() -> Optional[int]:
+    """取得行程至今的最大常駐記憶體（RSS）"""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 單位為 KB，macOS 為 bytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+@dataclass
+class StageTiming:
+    """
+    單一階段的量測結果
+
+    Attributes:
+        name: 階段名稱
+        wall_ms: 經過時間
+        cpu_ms: 行程 CPU 時間（含 BLAS 等原生執行緒）
+        peak_memory_bytes: 階段內 tracemalloc 記錄的記憶體峰值（未啟用時為 None）
+        max_rss_bytes: 階段結束時行程的最大 RSS
+        rows: 階段處理的資料筆數
+    """
+
+    name: str
+    wall_ms: float = 0.0
+    cpu_ms: float = 0.0
+    peak_memory_bytes: Optional[int] = None
+    max_rss_bytes: Optional[int] = None
+    rows: Optional[int] = None
+
+
+class StageProfiler:
+    """
+    分段量測批次工作
+
+    使用方式：
+
+        profiler = StageProfiler()
+        with profiler.stage("fetch_accidents") as stage:
+            accidents = fetch()
+            stage.rows = len(accidents)
+        profiler.finish()
+
+    trace_memory 啟用時以 tracemalloc 量測各階段的 Python 與 NumPy 配置峰值，
+    會拖慢大量小物件配置的程式碼，因此預設關閉，只記錄 RSS。
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.stages: List[StageTiming] = []
+        self.trace_memory = trace_memory
+        self._started_tracing = False
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[StageTiming]:
+        """量測一個階段（例外發生時仍會記錄已經過的時間）"""
+        timing = StageTiming(name=name, rows=rows)
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        wall_start = perf_counter()
+        cpu_start = process_time()
+        try:
+            yield timing
+        finally:
+            timing.wall_ms = (perf_counter() - wall_start) * 1000
+            timing.cpu_ms = (process_time() - cpu_start) * 1000
+            if self.trace_memory:
+                timing.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+            timing.max_rss_bytes = max_rss_bytes()
+            self.stages.append(timing)
+
+    def finish(self) -> None:
+        """停止由本物件啟動的 tracemalloc"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @property
+    def total_wall_ms(self) -> float:
+        return sum(stage.wall_ms for stage in self.stages)
+
+    @property
+    def total_cpu_ms(self) -> float:
+        return sum(stage.cpu_ms for stage in self.stages)
+
+    @property
+    def peak_memory_bytes(self) -> Optional[int]:
+        peaks = [
+            stage.peak_memory_bytes for stage in self.stages if stage.peak_memory_bytes is not None
+        ]
+        return max(peaks) if peaks else None
+
+    @property
+    def max_rss_bytes(self) -> Optional[int]:
+        values = [stage.max_rss_bytes for stage in self.stages if stage.max_rss_bytes is not None]
+        return max(values) if values else None
+
+    def rows_for(self, name: str) -> Optional[int]:
+        """取得指定階段最後一次記錄的資料筆數"""
+        for stage in reversed(self.stages):
+            if stage.name == name:
+                return stage.rows
+        return None
+
+    def as_dicts(self) -> List[dict]:
+        """輸出各階段結果（可直接存入 JSONB）"""
+        return [
+            {**asdict(stage), "wall_ms": round(stage.wall_ms, 3), "cpu_ms": round(stage.cpu_ms, 3)}
+            for stage in self.stages
+        ]
+
+    def format_table(self) -> str:
+        """輸出易讀的階段表格（腳本與日誌用）"""
+        lines = [f"{'stage':<18}{'wall ms':>12}{'cpu ms':>12}{'peak MB':>10}{'rows':>10}"]
+        for stage in self.stages:
+            peak = (
+                f"{stage.peak_memory_bytes / 1024 / 1024:.1f}"
+                if stage.peak_memory_bytes is not None
+                else "-"
+            )
+            rows = stage.rows if stage.rows is not None else "-"
+            lines.append(
+                f"{stage.name:<18}{stage.wall_ms:>12.1f}{stage.cpu_ms:>12.1f}{peak:>10}{rows:>10}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,135 @@
+"""SQL 監測：以 SQLAlchemy engine 事件統計每個請求的查詢數與資料庫耗時"""
+import re
+from time import perf_counter
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.core.logging import get_logger
+from src.core.request_context import RequestContext, get_request_context
+
+logger = get_logger(__name__)
+
+_START_TIMES_KEY = "query_start_times"
+_EXPLAINING_KEY = "explaining"
+
+# 會寫入資料或取得列鎖的語句不可再執行一次 EXPLAIN ANALYZE
+_WRITE_KEYWORD = re.compile(r"\b(?:INSERT|UPDATE|DELETE|MERGE|INTO)\b", re.IGNORECASE)
+_LOCKING_CLAUSE = re.compile(
+    r"\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE|KEY\s+SHARE)\b", re.IGNORECASE
+)
+
+
+def install_query_instrumentation(engine: Engine, explain_slow_ms: float = 0) -> None:
+    """
+    在 engine 上掛載查詢監測事件
+
+    Args:
+        engine: SQLAlchemy engine
+        explain_slow_ms: 單一 SELECT 超過此毫秒數時記錄 EXPLAIN (ANALYZE, BUFFERS)；
+            0 表示停用（EXPLAIN ANALYZE 會再次執行該查詢，僅適合診斷時開啟）
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if conn.info.get(_EXPLAINING_KEY):
+            return
+        conn.info.setdefault(_START_TIMES_KEY, []).append(perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if conn.info.get(_EXPLAINING_KEY):
+            return
+        start_times = conn.info.get(_START_TIMES_KEY)
+        if not start_times:
+            return
+        duration_ms = (perf_counter() - start_times.pop()) * 1000
+
+        request_context = get_request_context()
+        if request_context is not None:
+            request_context.record_query(statement, duration_ms)
+
+        if explain_slow_ms and duration_ms >= explain_slow_ms and _is_read_only_select(statement):
+            plan = _explain_analyze(conn, statement, parameters)
+            if plan:
+                logger.warning(
+                    "慢查詢 %.2fms:\n%s\n執行計畫:\n%s", duration_ms, statement, "\n".join(plan)
+                )
+
+
+def _is_read_only_select(statement: str) -> bool:
+    """
+    是否為可安全重複執行的唯讀 SELECT
+
+    排除 SELECT ... FOR UPDATE / SHARE（會再次取得列鎖）、SELECT ... INTO，
+    以及含 INSERT / UPDATE / DELETE 的 CTE（EXPLAIN ANALYZE 會真的再寫入一次）。
+    """
+    if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return False
+    return not _WRITE_KEYWORD.search(statement) and not _LOCKING_CLAUSE.search(statement)
+
+
+def _explain_analyze(conn, statement: str, parameters) -> Optional[List[str]]:
+    """
+    在 SAVEPOINT 內執行 EXPLAIN (ANALYZE, BUFFERS)
+
+    EXPLAIN 失敗（逾時、鎖、參數錯誤）時只回滾到 SAVEPOINT，PostgreSQL 不會中止請求的交易；
+    執行期間暫停查詢統計，EXPLAIN 與 SAVEPOINT 不計入請求的查詢數。
+    """
+    conn.info[_EXPLAINING_KEY] = True
+    try:
+        with conn.begin_nested():
+            result = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+            return [row[0] for row in result]
+    except Exception as exc:  # 診斷失敗不應影響請求
+        logger.warning("EXPLAIN 失敗（已回滾到 SAVEPOINT）: %s", exc)
+        return None
+    finally:
+        conn.info[_EXPLAINING_KEY] = False
+
+
+def report_request_queries(
+    context: RequestContext,
+    max_queries: int,
+    max_db_time_ms: float,
+    repeated_threshold: int,
+) -> bool:
+    """
+    檢查請求的查詢數與資料庫耗時，超過門檻時記錄語句
+
+    Args:
+        context: 請求上下文
+        max_queries: 查詢數門檻
+        max_db_time_ms: 資料庫耗時門檻（毫秒）
+        repeated_threshold: 同一語句重複執行達此次數時視為疑似 N+1
+
+    Returns:
+        是否超過門檻
+    """
+    repeated = context.repeated_statements(repeated_threshold)
+    if (
+        context.query_count <= max_queries
+        and context.db_time_ms <= max_db_time_ms
+        and not repeated
+    ):
+        return False
+
+    lines = [
+        f"查詢監測: {context.method} {context.path} "
+        f"執行 {context.query_count} 次查詢，資料庫耗時 {context.db_time_ms:.2f}ms"
+    ]
+    for statement, count in repeated:
+        lines.append(f"  疑似 N+1（重複 {count} 次）: {_one_line(statement)}")
+    for statement, duration_ms in context.statements:
+        lines.append(f"  {duration_ms:8.2f}ms  {_one_line(statement)}")
+    if context.query_count > len(context.statements):
+        lines.append(f"  ...（另有 {context.query_count - len(context.statements)} 次查詢未列出）")
+
+    logger.warning("\n".join(lines))
+    return True
+
+
+def _one_line(statement: str, limit: int = 300) -> str:
+    text = " ".join(statement.split())
+    return text if len(text) <= limit else text[:limit] + "..."
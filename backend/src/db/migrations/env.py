@@ -12,6 +12,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from src.db.session import Base
 from src.models.accident import Accident
 from src.models.hotspot import Hotspot
+from src.models.analysis_run import AnalysisRun
+from src.models.hotspot_publication import HotspotPublication
 from src.core.config import get_settings
 
 # Alembic Config 物件
@@ -0,0 +1,63 @@
+"""Add analysis_runs table
+
+Revision ID: 002_analysis_runs
+Revises: 001_initial_schema
+Create Date: 2025-11-20 12:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "002_analysis_runs"
+down_revision = "001_initial_schema"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 建立 analysis_runs 表（熱點分析各階段耗時與記憶體峰值）
+    op.create_table(
+        "analysis_runs",
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            primary_key=True,
+            server_default=sa.text("gen_random_uuid()"),
+        ),
+        sa.Column("source", sa.String(20), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("analysis_period_days", sa.Integer(), nullable=False),
+        sa.Column("epsilon_meters", sa.Integer(), nullable=False),
+        sa.Column("min_samples", sa.Integer(), nullable=False),
+        sa.Column("started_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("wall_ms", sa.Float(), nullable=False),
+        sa.Column("cpu_ms", sa.Float(), nullable=False),
+        sa.Column("peak_memory_bytes", sa.BigInteger(), nullable=True),
+        sa.Column("max_rss_bytes", sa.BigInteger(), nullable=True),
+        sa.Column("accident_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("hotspot_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("stages", postgresql.JSONB(), nullable=False),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+    )
+
+    op.create_index(
+        "idx_analysis_run_started_at",
+        "analysis_runs",
+        ["started_at"],
+        postgresql_ops={"started_at": "DESC"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_analysis_run_started_at", table_name="analysis_runs")
+    op.drop_table("analysis_runs")
@@ -0,0 +1,47 @@
+"""Add hotspot_publications pointer and hotspots.analysis_run_id
+
+Revision ID: 003_hotspot_publications
+Revises: 002_analysis_runs
+Create Date: 2025-12-01 12:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "003_hotspot_publications"
+down_revision = "002_analysis_runs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 熱點所屬的分析版本（analysis_runs.id）；既有資料為 NULL
+    op.add_column(
+        "hotspots",
+        sa.Column("analysis_run_id", postgresql.UUID(as_uuid=True), nullable=True),
+    )
+    op.create_index("idx_hotspot_analysis_run", "hotspots", ["analysis_run_id"])
+
+    # 各分析期間目前發佈的版本（查詢端只讀取此指標指向的熱點）
+    op.create_table(
+        "hotspot_publications",
+        sa.Column("analysis_period_days", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("analysis_run_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("analysis_date", sa.Date(), nullable=False),
+        sa.Column("hotspot_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "published_at",
+            sa.TIMESTAMP(timezone=True),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("hotspot_publications")
+    op.drop_index("idx_hotspot_analysis_run", table_name="hotspots")
+    op.drop_column("hotspots", "analysis_run_id")
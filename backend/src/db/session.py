@@ -1,32 +1,59 @@
 """資料庫連線設定：SQLAlchemy engine, session factory"""
+from functools import lru_cache
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.pool import NullPool
-from typing import Generator
+from typing import Any, Generator
 
 from src.core.config import get_settings
 
-settings = get_settings()
+# 建立 Base 類別（用於定義模型）
+Base = declarative_base()
 
-# 建立資料庫引擎
-engine = create_engine(
-    settings.database_url,
-    poolclass=NullPool,
-    echo=False,  # 設定為 True 可看到 SQL 查詢
-)
 
-# 建立 Session 工廠
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@lru_cache()
+def get_engine() -> Engine:
+    """
+    取得資料庫引擎（第一次使用時才建立）
 
-# 建立 Base 類別（用於定義模型）
-Base = declarative_base()
+    匯入本模組不會載入資料庫驅動或建立引擎，API worker 啟動與只需模型定義的工具都不必付出這段成本。
+    """
+    settings = get_settings()
+    engine = create_engine(
+        settings.database_url,
+        poolclass=NullPool,
+        echo=False,  # 設定為 True 可看到 SQL 查詢
+    )
+
+    # 掛載 SQL 監測（每個請求的查詢數與資料庫耗時）
+    if settings.sql_instrumentation_enabled:
+        from src.db.instrumentation import install_query_instrumentation
+
+        install_query_instrumentation(engine, explain_slow_ms=settings.sql_explain_slow_ms)
+
+    return engine
+
+
+@lru_cache()
+def get_session_factory() -> sessionmaker:
+    """取得 Session 工廠（綁定 get_engine() 的引擎）"""
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+
+
+def __getattr__(name: str) -> Any:
+    # 保留 `from src.db.session import engine, SessionLocal` 的用法，但延後到實際取用時才建立
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        return get_session_factory()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_db() -> Generator:
     """取得資料庫連線（Dependency）"""
-    db = SessionLocal()
+    db = get_session_factory()()
     try:
         yield db
     finally:
         db.close()
-
@@ -1,4 +1,6 @@
 """FastAPI 應用程式主檔：app instance, CORS 設定"""
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -12,18 +14,53 @@ from src.core.errors import (
     sqlalchemy_error_handler,
     generic_exception_handler,
 )
-from src.core.logging import RequestTimingMiddleware, setup_logging
-from src.core.middleware import RateLimitMiddleware
-from src.api import api_router
+from src.core.logging import (
+    RequestTimingMiddleware,
+    parse_sample_rates,
+    setup_logging,
+    start_log_listener,
+    stop_log_listener,
+)
+from src.core.loop_monitor import loop_monitor
+from src.core.profiling import ProfilingMiddleware, profile_store
+from src.core.load_shedding import LoadSheddingMiddleware, default_route_classes
+from src.core.middleware import (
+    EXPENSIVE_BUDGET,
+    RateLimitMiddleware,
+    TokenBucketLimiter,
+    default_route_costs,
+)
+from src.api import api_router, metrics
 from sqlalchemy.exc import SQLAlchemyError
 
 settings = get_settings()
 
-# 設定日誌
-setup_logging(settings.log_level)
+# 設定日誌（寫出執行緒於 lifespan 啟動，匯入時不啟動執行緒）
+setup_logging(
+    settings.log_level,
+    log_format=settings.log_format,
+    sample_rates=parse_sample_rates(settings.log_sample_rates),
+    queue_size=settings.log_queue_size,
+    start_listener=False,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """應用程式生命週期：啟動與停止日誌寫出執行緒與背景監控"""
+    start_log_listener()
+    if settings.loop_monitor_enabled:
+        loop_monitor.interval = settings.loop_monitor_interval_ms / 1000
+        loop_monitor.block_threshold = settings.loop_block_threshold_ms / 1000
+        loop_monitor.start()
+    yield
+    await loop_monitor.stop()
+    stop_log_listener()
+
 
 # 建立 FastAPI 應用程式
 app = FastAPI(
+    lifespan=lifespan,
     title="智慧道路守護系統 API",
     description="提供交通事故熱點查詢與管理功能的RESTful API",
     version="1.0.0",
@@ -45,12 +82,58 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 讓前端與合成監測可讀取各階段耗時
+    expose_headers=["Server-Timing", "X-Response-Time-ms", "X-Request-ID", "X-Profile-ID"],
 )
 
-# 設定速率限制（每分鐘 60 個請求）
-app.add_middleware(RateLimitMiddleware, requests_per_minute=60, burst_size=10)
-# 記錄請求耗時
-app.add_middleware(RequestTimingMiddleware)
+# 設定速率限制（預設每分鐘 60 個成本點數，突發 10 個；昂貴操作使用獨立額度）
+app.add_middleware(
+    RateLimitMiddleware,
+    requests_per_minute=settings.rate_limit_requests_per_minute,
+    burst_size=settings.rate_limit_burst_size,
+    max_clients=settings.rate_limit_max_clients,
+    route_costs=default_route_costs(settings.api_v1_prefix),
+    budgets={
+        EXPENSIVE_BUDGET: TokenBucketLimiter(
+            requests_per_minute=settings.rate_limit_expensive_per_minute,
+            burst_size=settings.rate_limit_expensive_burst_size,
+            max_clients=settings.rate_limit_max_clients,
+        ),
+    },
+    ms_per_token=settings.rate_limit_ms_per_token,
+)
+# 過載保護：依路由類別自適應限制併發，超過時快速回傳 503
+if settings.load_shedding_enabled:
+    app.add_middleware(
+        LoadSheddingMiddleware,
+        route_classes=default_route_classes(settings.api_v1_prefix),
+        max_inflight=settings.load_shedding_max_inflight,
+    )
+# 請求剖析：管理員以 X-Profile: 1 觸發或依比例抽樣（位於計時中介層內側以取得 request_id）
+if settings.profiling_enabled:
+    profile_store.max_profiles = settings.profiling_max_profiles
+    app.add_middleware(
+        ProfilingMiddleware,
+        admin_secret=settings.admin_jwt_secret,
+        sample_rate=settings.profiling_sample_rate,
+        interval=settings.profiling_interval_ms / 1000,
+    )
+# 記錄請求耗時、各階段 Server-Timing 與 SQL 查詢統計（超過門檻時記錄語句並標示疑似 N+1）
+if settings.sql_instrumentation_enabled:
+    app.add_middleware(
+        RequestTimingMiddleware,
+        max_queries=settings.sql_request_max_queries,
+        max_db_time_ms=settings.sql_request_max_db_time_ms,
+        repeated_statement_threshold=settings.sql_repeated_statement_threshold,
+        server_timing=settings.server_timing_enabled,
+        timing_allow_origin=settings.cors_origins,
+    )
+else:
+    app.add_middleware(
+        RequestTimingMiddleware,
+        server_timing=settings.server_timing_enabled,
+        timing_allow_origin=settings.cors_origins,
+    )
 
 # 註冊錯誤處理器
 from fastapi.exceptions import HTTPException
@@ -71,6 +154,10 @@ app.add_exception_handler(Exception, generic_exception_handler)
 # 註冊 API 路由
 app.include_router(api_router, prefix=settings.api_v1_prefix)
 
+# 指標端點（供 Prometheus 抓取，不帶 API 版本前綴）
+if settings.metrics_enabled:
+    app.include_router(metrics.router, tags=["system"])
+
 
 @app.get("/")
 async def root():
@@ -0,0 +1,39 @@
+"""AnalysisRun 模型：熱點分析執行紀錄"""
+
+from sqlalchemy import BigInteger, Column, DateTime, Float, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+import uuid
+from datetime import datetime
+
+from src.db.session import Base
+
+
+class AnalysisRun(Base):
+    """熱點分析執行紀錄（各階段耗時、CPU 時間與記憶體峰值）"""
+
+    __tablename__ = "analysis_runs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # 執行來源：api（管理端點）、script（data/generate_hotspots.py）或 synthetic（合成資料產生器）
+    source = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False)
+    analysis_period_days = Column(Integer, nullable=False)
+    epsilon_meters = Column(Integer, nullable=False)
+    min_samples = Column(Integer, nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=False)
+    wall_ms = Column(Float, nullable=False)
+    cpu_ms = Column(Float, nullable=False)
+    peak_memory_bytes = Column(BigInteger, nullable=True)
+    max_rss_bytes = Column(BigInteger, nullable=True)
+    accident_count = Column(Integer, nullable=False, default=0)
+    hotspot_count = Column(Integer, nullable=False, default=0)
+    # 各階段量測結果：[{name, wall_ms, cpu_ms, peak_memory_bytes, max_rss_bytes, rows}, ...]
+    stages = Column(JSONB, nullable=False)
+    error_message = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        # 時間索引（B-tree，用於查詢最近的執行紀錄）
+        Index("idx_analysis_run_started_at", "started_at", postgresql_ops={"started_at": "DESC"}),
+    )
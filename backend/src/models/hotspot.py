@@ -30,6 +30,8 @@ class Hotspot(Base):
     analysis_period_start = Column(Date, nullable=False)
     analysis_period_end = Column(Date, nullable=False)
     accident_ids = Column(JSONB, nullable=False)
+    # 所屬分析版本（analysis_runs.id），由 hotspot_publications 決定目前發佈的版本
+    analysis_run_id = Column(UUID(as_uuid=True), nullable=True)
     created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
     updated_at = Column(
         DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
@@ -48,4 +50,6 @@ class Hotspot(Base):
         Index("idx_hotspot_accident_time", "earliest_accident_at", "latest_accident_at"),
         # 部分索引（只索引有效熱點）
         Index("idx_hotspot_active", "analysis_date", postgresql_where="total_accidents >= 5"),
+        # 分析版本索引（依發佈指標查詢）
+        Index("idx_hotspot_analysis_run", "analysis_run_id"),
     )
@@ -0,0 +1,24 @@
+"""HotspotPublication 模型：各分析期間目前發佈的熱點版本"""
+
+from sqlalchemy import Column, Date, DateTime, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+
+from src.db.session import Base
+
+
+class HotspotPublication(Base):
+    """
+    熱點發佈指標
+
+    每個分析期間一列，指向目前對外提供的分析版本（analysis_runs.id）。
+    新版本先完整寫入 hotspots，再在同一個交易中更新此指標，讀取端不會看到寫到一半或空的結果。
+    """
+
+    __tablename__ = "hotspot_publications"
+
+    analysis_period_days = Column(Integer, primary_key=True, autoincrement=False)
+    analysis_run_id = Column(UUID(as_uuid=True), nullable=False)
+    analysis_date = Column(Date, nullable=False)
+    hotspot_count = Column(Integer, nullable=False, default=0)
+    published_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
@@ -0,0 +1,732 @@
+"""
+大量合成資料產生器（效能測試用）
+
+以 NumPy 向量化產生百萬筆等級的事故資料，透過 PostgreSQL COPY 串流寫入，
+並依照產生時的群集歸屬計算對應的熱點、分析紀錄（analysis_runs）
+與發佈指標（hotspot_publications）：
+
+- 空間分佈：以實際路口為中心的高斯群集（約略座標），另有一部分散佈在市區的背景事故
+- 群集大小：Pareto 分佈，少數路口佔大多數事故
+- 嚴重程度：A1/A2/A3 比例見 SEVERITY_MIX
+- 季節性：月份、星期與時段權重（早晚尖峰）
+- 分析版本：可產生多個 analysis_date，每個版本涵蓋多個分析期間（30/90/180/365 天），
+  各分析期間發佈最新的 analysis_date
+
+熱點是依「產生時的群集」計算的 ground truth，不經過 DBSCAN；
+需要實際分析結果時，可在資料載入後執行 data/generate_hotspots.py 或管理端點。
+
+用法:
+    python -m src.scripts.generate_synthetic_data --accidents=2000000 --clear --defer-indexes
+    python -m src.scripts.generate_synthetic_data --accidents=100000 --dry-run
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from time import perf_counter
+from typing import Dict, List, Optional, Sequence, Tuple
+import argparse
+import csv
+import io
+import json
+import sys
+import uuid
+
+import numpy as np
+
+from src.core.stage_profiler import StageProfiler
+from src.services.hotspot_engine import clamp_radius, equirectangular_meters
+
+# 實際路口（約略座標）：(名稱, 緯度, 經度)
+INTERSECTIONS: List[Tuple[str, float, float]] = [
+    ("臺北市大安區忠孝東路四段與敦化南路口", 25.0416, 121.5494),
+    ("臺北市中正區忠孝西路一段與館前路口", 25.0464, 121.5148),
+    ("臺北市信義區信義路五段與基隆路口", 25.0330, 121.5585),
+    ("臺北市大安區仁愛路三段與復興南路口", 25.0377, 121.5437),
+    ("臺北市大安區羅斯福路四段與基隆路口", 25.0145, 121.5340),
+    ("臺北市松山區民權東路三段與復興北路口", 25.0622, 121.5443),
+    ("臺北市中山區中山北路二段與民生東路口", 25.0578, 121.5226),
+    ("臺北市大同區承德路三段與民權西路口", 25.0629, 121.5175),
+    ("臺北市中山區市民大道與建國北路口", 25.0449, 121.5370),
+    ("臺北市松山區南京東路四段與敦化北路口", 25.0520, 121.5490),
+    ("新北市板橋區中山路一段與文化路口", 25.0136, 121.4640),
+    ("新北市三重區重新路與正義北路口", 25.0616, 121.4880),
+    ("新北市新莊區中正路與思源路口", 25.0395, 121.4510),
+    ("新北市中和區中山路與景平路口", 24.9985, 121.4930),
+    ("新北市永和區永和路與竹林路口", 25.0090, 121.5150),
+    ("新北市新店區北新路與民權路口", 24.9750, 121.5410),
+    ("桃園市桃園區中正路與三民路口", 24.9930, 121.3120),
+    ("桃園市中壢區中華路與環北路口", 24.9700, 121.2360),
+    ("臺中市西屯區臺灣大道與文心路口", 24.1635, 120.6435),
+    ("臺中市西區五權路與美村路口", 24.1480, 120.6680),
+    ("臺中市北屯區中清路與大連路口", 24.1790, 120.6700),
+    ("臺南市東區中華東路與東門路口", 22.9850, 120.2260),
+    ("臺南市中西區西門路與民族路口", 22.9960, 120.1980),
+    ("高雄市苓雅區中正路與中山路口", 22.6310, 120.3020),
+    ("高雄市三民區九如路與民族路口", 22.6400, 120.3120),
+    ("高雄市左營區博愛路與明誠路口", 22.6650, 120.3030),
+]
+
+# 嚴重程度比例（A1 死亡、A2 受傷、A3 財損）
+SEVERITY_TYPES = ("A1", "A2", "A3")
+SEVERITY_MIX = (0.005, 0.395, 0.6)
+
+VEHICLE_TYPES: Tuple[Tuple[str, float], ...] = (
+    ("機車", 0.55),
+    ("自用-小客車", 0.25),
+    ("營業用-計程車", 0.05),
+    ("自用-小貨車", 0.06),
+    ("腳踏自行車", 0.03),
+    ("行人", 0.03),
+    ("營業用-公車", 0.015),
+    ("自用-大貨車", 0.015),
+)
+
+# 季節性權重：月份（1-12 月）、星期（週一至週日）、時段（0-23 時，早晚尖峰）
+MONTH_WEIGHTS = (1.05, 0.90, 1.00, 0.97, 1.00, 0.98, 1.00, 1.00, 0.97, 1.02, 1.03, 1.08)
+WEEKDAY_WEIGHTS = (1.03, 1.02, 1.02, 1.03, 1.08, 0.93, 0.89)
+HOUR_WEIGHTS = (
+    0.6, 0.4, 0.3, 0.25, 0.3, 0.6, 1.2, 2.4, 2.8, 1.9, 1.5, 1.6,
+    1.8, 1.6, 1.5, 1.6, 1.9, 2.6, 2.8, 2.0, 1.5, 1.2, 1.0, 0.8,
+)
+
+# 事故時間以臺灣時間（UTC+8）產生季節性，寫入時轉為 UTC
+LOCAL_UTC_OFFSET_SECONDS = 8 * 3600
+
+# 群集中心相對於路口的散佈（度，約 1.5km）與群集標準差範圍（公尺）
+CENTER_SPREAD_DEGREES = 0.015
+BLOB_SIGMA_MEDIAN_METERS = 35.0
+BLOB_SIGMA_RANGE_METERS = (10.0, 150.0)
+# 背景事故相對於路口的散佈（度，約 2km）
+BACKGROUND_SPREAD_DEGREES = 0.02
+
+METERS_PER_DEGREE = 111_320.0
+
+HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+UUID_DASH_POSITIONS = (8, 12, 16, 20)
+
+ACCIDENT_COLUMNS = (
+    "id", "source_type", "source_id", "occurred_at", "location_text",
+    "latitude", "longitude", "vehicle_type", "geom", "created_at", "updated_at",
+)
+HOTSPOT_COLUMNS = (
+    "id", "center_latitude", "center_longitude", "geom", "radius_meters", "total_accidents",
+    "a1_count", "a2_count", "a3_count", "earliest_accident_at", "latest_accident_at",
+    "analysis_date", "analysis_period_days", "analysis_period_start", "analysis_period_end",
+    "accident_ids", "created_at", "updated_at", "analysis_run_id",
+)
+
+
+@dataclass
+class SyntheticAccidents:
+    """
+    合成事故資料（欄位皆為長度相同的 NumPy 陣列）
+
+    Attributes:
+        ids: 每筆 16 bytes 的 UUID（uint8，shape=(n, 16)）
+        cluster: 所屬群集索引（背景事故為 -1）
+        latitude / longitude: 座標
+        occurred_at: 發生時間（UTC epoch 秒）
+        severity: SEVERITY_TYPES 的索引
+        vehicle: VEHICLE_TYPES 的索引
+    """
+
+    ids: np.ndarray
+    cluster: np.ndarray
+    latitude: np.ndarray
+    longitude: np.ndarray
+    occurred_at: np.ndarray
+    severity: np.ndarray
+    vehicle: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.cluster)
+
+
+@dataclass
+class ClusterSummary:
+    """單一分析版本與期間內各群集的統計（已套用最少事故數）"""
+
+    analysis_date: date
+    period_days: int
+    window_accidents: int
+    center_latitude: np.ndarray
+    center_longitude: np.ndarray
+    radius_meters: np.ndarray
+    counts: np.ndarray
+    severity_counts: np.ndarray
+    earliest: np.ndarray
+    latest: np.ndarray
+    members: List[np.ndarray]
+
+
+def random_uuids(rng: np.random.Generator, count: int) -> np.ndarray:
+    """產生 version 4 UUID（每列 16 bytes）"""
+    raw = np.frombuffer(rng.bytes(16 * count), dtype=np.uint8).reshape(count, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    return raw
+
+
+def uuid_strings(raw: np.ndarray) -> List[str]:
+    """將 UUID bytes 轉為標準格式字串（以查表向量化轉成十六進位，避免逐筆格式化）"""
+    digits = np.empty((len(raw), 32), dtype=np.uint8)
+    digits[:, 0::2] = HEX_DIGITS[raw >> 4]
+    digits[:, 1::2] = HEX_DIGITS[raw & 0x0F]
+    text = np.insert(digits, UUID_DASH_POSITIONS, ord("-"), axis=1).tobytes().decode("ascii")
+    return [text[i:i + 36] for i in range(0, len(text), 36)]
+
+
+def fixed_point_strings(values: np.ndarray, scale: int = 7) -> np.ndarray:
+    """將座標格式化為小數點後 scale 位的字串（整數運算，比逐筆 "%.7f" 快數倍）"""
+    scaled = np.rint(np.abs(values) * 10**scale).astype(np.int64)
+    whole = (scaled // 10**scale).astype(str)
+    fraction = np.char.zfill((scaled % 10**scale).astype(str), scale)
+    text = np.char.add(np.char.add(whole, "."), fraction)
+    return np.where(values < 0, np.char.add("-", text), text)
+
+
+def build_clusters(
+    rng: np.random.Generator, cluster_count: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    產生群集中心、標準差與權重
+
+    前 len(INTERSECTIONS) 個群集直接位於路口上，其餘散佈在隨機路口附近。
+
+    Returns:
+        (中心緯度, 中心經度, 標準差公尺, 權重, 所屬路口索引)
+    """
+    anchor_lat = np.array([lat for _, lat, _ in INTERSECTIONS])
+    anchor_lng = np.array([lng for _, _, lng in INTERSECTIONS])
+    anchors = np.arange(cluster_count) % len(INTERSECTIONS)
+    anchors[len(INTERSECTIONS) :] = rng.integers(
+        0, len(INTERSECTIONS), cluster_count - len(INTERSECTIONS)
+    )
+
+    offsets = rng.normal(0.0, CENTER_SPREAD_DEGREES, size=(cluster_count, 2))
+    offsets[: len(INTERSECTIONS)] = 0.0
+    center_lat = anchor_lat[anchors] + offsets[:, 0]
+    center_lng = anchor_lng[anchors] + offsets[:, 1]
+
+    sigma = np.clip(
+        rng.lognormal(np.log(BLOB_SIGMA_MEDIAN_METERS), 0.5, cluster_count),
+        *BLOB_SIGMA_RANGE_METERS,
+    )
+    weights = rng.pareto(1.5, cluster_count) + 1.0
+    return center_lat, center_lng, sigma, weights / weights.sum(), anchors
+
+
+def sample_occurrences(rng: np.random.Generator, count: int, days: int, end: date) -> np.ndarray:
+    """依月份、星期與時段權重抽樣發生時間（UTC epoch 秒，範圍為 end 前 days 天）"""
+    day_offsets = np.arange(days)
+    start = np.datetime64(end - timedelta(days=days), "D")
+    dates = start + day_offsets
+    months = dates.astype("datetime64[M]").astype(int) % 12
+    # 1970-01-01 為週四
+    weekdays = (dates.astype(int) + 3) % 7
+    day_weights = np.asarray(MONTH_WEIGHTS)[months] * np.asarray(WEEKDAY_WEIGHTS)[weekdays]
+    hour_weights = np.asarray(HOUR_WEIGHTS)
+
+    chosen_days = rng.choice(dates.astype(np.int64), size=count, p=day_weights / day_weights.sum())
+    hours = rng.choice(24, size=count, p=hour_weights / hour_weights.sum())
+    seconds = rng.integers(0, 3600, size=count)
+    return chosen_days * 86400 + hours * 3600 + seconds - LOCAL_UTC_OFFSET_SECONDS
+
+
+def generate_accidents(
+    count: int,
+    days: int,
+    end: date,
+    rng: np.random.Generator,
+    cluster_count: int = 3000,
+    background_ratio: float = 0.3,
+) -> Tuple[SyntheticAccidents, np.ndarray]:
+    """
+    產生合成事故資料
+
+    Returns:
+        (事故資料, 各群集所屬路口索引)
+    """
+    center_lat, center_lng, sigma, weights, anchors = build_clusters(rng, cluster_count)
+
+    cluster = rng.choice(cluster_count, size=count, p=weights)
+    background = rng.random(count) < background_ratio
+    cluster[background] = -1
+
+    latitude = np.empty(count)
+    longitude = np.empty(count)
+    clustered = ~background
+    members = cluster[clustered]
+    sigma_lat = sigma[members] / METERS_PER_DEGREE
+    sigma_lng = sigma_lat / np.cos(np.radians(center_lat[members]))
+    latitude[clustered] = rng.normal(center_lat[members], sigma_lat)
+    longitude[clustered] = rng.normal(center_lng[members], sigma_lng)
+
+    background_count = int(background.sum())
+    anchor = rng.integers(0, len(INTERSECTIONS), background_count)
+    latitude[background] = (
+        np.array([lat for _, lat, _ in INTERSECTIONS])[anchor]
+        + rng.normal(0.0, BACKGROUND_SPREAD_DEGREES, background_count)
+    )
+    longitude[background] = (
+        np.array([lng for _, _, lng in INTERSECTIONS])[anchor]
+        + rng.normal(0.0, BACKGROUND_SPREAD_DEGREES, background_count)
+    )
+
+    vehicle_weights = np.array([weight for _, weight in VEHICLE_TYPES])
+    accidents = SyntheticAccidents(
+        ids=random_uuids(rng, count),
+        cluster=cluster.astype(np.int32),
+        latitude=np.round(latitude, 7),
+        longitude=np.round(longitude, 7),
+        occurred_at=sample_occurrences(rng, count, days, end),
+        severity=rng.choice(len(SEVERITY_TYPES), size=count, p=SEVERITY_MIX).astype(np.int8),
+        vehicle=rng.choice(
+            len(VEHICLE_TYPES), size=count, p=vehicle_weights / vehicle_weights.sum()
+        ).astype(np.int8),
+    )
+    return accidents, anchors
+
+
+def summarize_clusters(
+    accidents: SyntheticAccidents,
+    analysis_date: date,
+    period_days: int,
+    min_accidents: int,
+) -> ClusterSummary:
+    """
+    計算分析期間 [analysis_date - period_days, analysis_date) 內各群集的熱點統計
+
+    以群集編號排序後用 reduceat 一次算完所有群集，半徑與分析服務相同
+    （成員到中心的最大距離乘上緩衝後限制在 50–2000 公尺）。
+    """
+    window_start = (analysis_date - timedelta(days=period_days) - date(1970, 1, 1)).days * 86400
+    window_end = (analysis_date - date(1970, 1, 1)).days * 86400
+    in_window = (accidents.occurred_at >= window_start) & (accidents.occurred_at < window_end)
+    selected = np.flatnonzero(in_window & (accidents.cluster >= 0))
+
+    order = selected[np.argsort(accidents.cluster[selected], kind="stable")]
+    _, starts, counts = np.unique(accidents.cluster[order], return_index=True, return_counts=True)
+    keep = counts >= min_accidents
+
+    if len(order) == 0:
+        empty = np.empty(0)
+        return ClusterSummary(
+            analysis_date, period_days, int(in_window.sum()), empty, empty,
+            empty.astype(np.int64), empty.astype(np.int64), np.empty((0, 3), dtype=np.int64),
+            empty.astype(np.int64), empty.astype(np.int64), [],
+        )
+
+    latitude = accidents.latitude[order]
+    longitude = accidents.longitude[order]
+    center_lat = np.add.reduceat(latitude, starts) / counts
+    center_lng = np.add.reduceat(longitude, starts) / counts
+
+    distances = equirectangular_meters(
+        latitude, longitude, np.repeat(center_lat, counts), np.repeat(center_lng, counts)
+    )
+    radius = clamp_radius(np.maximum.reduceat(distances, starts))
+
+    severity = accidents.severity[order]
+    severity_counts = np.stack(
+        [np.add.reduceat((severity == index).astype(np.int64), starts) for index in range(3)],
+        axis=1,
+    )
+    occurred = accidents.occurred_at[order]
+    members = [group for group, kept in zip(np.split(order, starts[1:]), keep) if kept]
+
+    return ClusterSummary(
+        analysis_date=analysis_date,
+        period_days=period_days,
+        window_accidents=int(in_window.sum()),
+        center_latitude=center_lat[keep],
+        center_longitude=center_lng[keep],
+        radius_meters=radius[keep],
+        counts=counts[keep],
+        severity_counts=severity_counts[keep],
+        earliest=np.minimum.reduceat(occurred, starts)[keep],
+        latest=np.maximum.reduceat(occurred, starts)[keep],
+        members=members,
+    )
+
+
+def _timestamps(epoch_seconds: np.ndarray) -> np.ndarray:
+    return np.datetime_as_string(epoch_seconds.astype("datetime64[s]"), unit="s", timezone="UTC")
+
+
+def accident_csv(
+    accidents: SyntheticAccidents,
+    start: int,
+    stop: int,
+    location_texts: Sequence[str],
+    batch_tag: str,
+    created_at: str,
+) -> str:
+    """
+    產生 COPY 用的事故 CSV（逐欄向量化格式化後再組成資料列）
+
+    地點描述為固定的路口名稱（不含逗號與引號），因此不需要 CSV 跳脫；
+    背景事故沒有地點描述，寫入空欄位（CSV 格式的 NULL）。
+    """
+    latitudes = fixed_point_strings(accidents.latitude[start:stop])
+    longitudes = fixed_point_strings(accidents.longitude[start:stop])
+    geoms = np.char.add(
+        np.char.add(np.char.add("SRID=4326;POINT(", longitudes), np.char.add(" ", latitudes)), ")"
+    )
+    source_ids = np.char.add(
+        f"SYN-{batch_tag}-", np.char.zfill(np.arange(start, stop).astype(str), 9)
+    )
+    # cluster 為 -1 時取到最後一個元素（空字串）
+    locations = np.array([*location_texts, ""], dtype=object)[accidents.cluster[start:stop]]
+    timestamps = [created_at] * (stop - start)
+    columns = (
+        uuid_strings(accidents.ids[start:stop]),
+        np.array(SEVERITY_TYPES)[accidents.severity[start:stop]].tolist(),
+        source_ids.tolist(),
+        _timestamps(accidents.occurred_at[start:stop]).tolist(),
+        locations.tolist(),
+        latitudes.tolist(),
+        longitudes.tolist(),
+        np.array([name for name, _ in VEHICLE_TYPES])[accidents.vehicle[start:stop]].tolist(),
+        geoms.tolist(),
+        timestamps,
+        timestamps,
+    )
+    return "\n".join(map(",".join, zip(*columns))) + "\n"
+
+
+def hotspot_csv(
+    summary: ClusterSummary,
+    accidents: SyntheticAccidents,
+    rng: np.random.Generator,
+    created_at: str,
+    analysis_run_id: Optional[str] = None,
+) -> str:
+    """
+    產生 COPY 用的熱點 CSV（accident_ids 為 JSON，交給 csv 模組跳脫）
+
+    analysis_run_id 為 None 時該欄寫入空值（COPY 視為 NULL）。
+    """
+    hotspot_ids = uuid_strings(random_uuids(rng, len(summary.counts)))
+    earliest = _timestamps(summary.earliest)
+    latest = _timestamps(summary.latest)
+    latitudes = fixed_point_strings(summary.center_latitude)
+    longitudes = fixed_point_strings(summary.center_longitude)
+    period_start = (summary.analysis_date - timedelta(days=summary.period_days)).isoformat()
+    period_end = (summary.analysis_date - timedelta(days=1)).isoformat()
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for index, members in enumerate(summary.members):
+        lat, lng = latitudes[index], longitudes[index]
+        a1, a2, a3 = (int(value) for value in summary.severity_counts[index])
+        writer.writerow(
+            (
+                hotspot_ids[index],
+                lat,
+                lng,
+                f"SRID=4326;POINT({lng} {lat})",
+                int(summary.radius_meters[index]),
+                int(summary.counts[index]),
+                a1,
+                a2,
+                a3,
+                earliest[index],
+                latest[index],
+                summary.analysis_date.isoformat(),
+                summary.period_days,
+                period_start,
+                period_end,
+                json.dumps(uuid_strings(accidents.ids[members])),
+                created_at,
+                created_at,
+                analysis_run_id or "",
+            )
+        )
+    return buffer.getvalue()
+
+
+def copy_csv(cursor, table: str, columns: Sequence[str], payload: str) -> int:
+    """
+    以 COPY ... FROM STDIN 寫入 CSV（cursor 為 None 時只產生 CSV，用於 --dry-run）
+
+    Returns:
+        CSV 大小（字元數）
+    """
+    if cursor is not None:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            io.StringIO(payload),
+        )
+    return len(payload)
+
+
+def drop_secondary_indexes(cursor, table: str) -> List[str]:
+    """
+    刪除一般索引（不含主鍵與唯一約束），回傳重建用的 CREATE INDEX 語句
+
+    大量載入時先刪除 GIST/B-tree 索引、載入後一次重建，比逐列維護索引快得多。
+    """
+    cursor.execute(
+        """
+        SELECT indexname, indexdef FROM pg_indexes
+        WHERE tablename = %s
+          AND indexname NOT IN (SELECT conname FROM pg_constraint)
+        """,
+        (table,),
+    )
+    definitions = []
+    for name, definition in cursor.fetchall():
+        cursor.execute(f'DROP INDEX IF EXISTS "{name}"')
+        definitions.append(definition)
+    return definitions
+
+
+def record_analysis_runs(connection, runs: List[Dict], started_at: datetime) -> None:
+    """
+    將各分析版本寫入 analysis_runs（source 為 synthetic，需先執行 002 migration）
+
+    寫入失敗只印出警告，不影響已載入的資料。
+    """
+    import psycopg2
+
+    try:
+        with connection.cursor() as cursor:
+            for run in runs:
+                cursor.execute(
+                    """
+                    INSERT INTO analysis_runs (
+                        id, source, status, analysis_period_days, epsilon_meters, min_samples,
+                        started_at, finished_at, wall_ms, cpu_ms, peak_memory_bytes,
+                        max_rss_bytes, accident_count, hotspot_count, stages, created_at
+                    ) VALUES (
+                        %s, 'synthetic', 'success', %s, %s, %s,
+                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+                    )
+                    """,
+                    (
+                        run["id"],
+                        run["period_days"],
+                        run["epsilon_meters"],
+                        run["min_samples"],
+                        started_at,
+                        datetime.now(timezone.utc),
+                        run["stage"]["wall_ms"],
+                        run["stage"]["cpu_ms"],
+                        run["stage"]["peak_memory_bytes"],
+                        run["stage"]["max_rss_bytes"],
+                        run["accident_count"],
+                        run["hotspot_count"],
+                        json.dumps([run["stage"]]),
+                        datetime.now(timezone.utc),
+                    ),
+                )
+        connection.commit()
+    except psycopg2.Error as e:
+        connection.rollback()
+        print(f"⚠️  無法寫入 analysis_runs: {e}", file=sys.stderr)
+
+
+def publish_latest_versions(cursor, runs: List[Dict]) -> int:
+    """
+    將各分析期間的發佈指標（hotspot_publications）指向最新的 analysis_date（需先執行 003 migration）
+
+    Returns:
+        發佈的分析期間數（資料表不存在時為 0）
+    """
+    cursor.execute("SELECT to_regclass('hotspot_publications')")
+    if cursor.fetchone()[0] is None:
+        print("⚠️  hotspot_publications 不存在（尚未執行 003 migration），略過發佈", file=sys.stderr)
+        return 0
+
+    latest: Dict[int, Dict] = {}
+    for run in runs:
+        current = latest.get(run["period_days"])
+        if current is None or run["analysis_date"] > current["analysis_date"]:
+            latest[run["period_days"]] = run
+    for run in latest.values():
+        cursor.execute(
+            """
+            INSERT INTO hotspot_publications (
+                analysis_period_days, analysis_run_id, analysis_date, hotspot_count, published_at
+            ) VALUES (%s, %s, %s, %s, now())
+            ON CONFLICT (analysis_period_days) DO UPDATE SET
+                analysis_run_id = EXCLUDED.analysis_run_id,
+                analysis_date = EXCLUDED.analysis_date,
+                hotspot_count = EXCLUDED.hotspot_count,
+                published_at = EXCLUDED.published_at
+            """,
+            (run["period_days"], run["id"], run["analysis_date"], run["hotspot_count"]),
+        )
+    return len(latest)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="大量合成事故與熱點資料（COPY 寫入）")
+    parser.add_argument("--accidents", type=int, default=1_000_000, help="事故筆數（預設: 1,000,000）")
+    parser.add_argument("--clusters", type=int, default=3000, help="群集數（預設: 3000）")
+    parser.add_argument(
+        "--background-ratio", type=float, default=0.3, help="不屬於任何群集的事故比例（預設: 0.3）"
+    )
+    parser.add_argument("--days", type=int, default=365, help="事故時間範圍天數（預設: 365）")
+    parser.add_argument(
+        "--analysis-versions", type=int, default=1, help="分析版本數（analysis_date，預設: 1）"
+    )
+    parser.add_argument(
+        "--version-interval-days", type=int, default=7, help="分析版本間隔天數（預設: 7）"
+    )
+    parser.add_argument(
+        "--periods", default="30,90,180,365", help="各版本的分析期間（天，逗號分隔）"
+    )
+    parser.add_argument("--min-accidents", type=int, default=5, help="熱點最少事故數（預設: 5）")
+    parser.add_argument(
+        "--epsilon-meters",
+        type=int,
+        default=100,
+        help="記錄在 analysis_runs 的聚類半徑（合成熱點不經過 DBSCAN，僅供比對）",
+    )
+    parser.add_argument("--batch-size", type=int, default=200_000, help="每次 COPY 的筆數")
+    parser.add_argument("--seed", type=int, default=42, help="亂數種子")
+    parser.add_argument("--clear", action="store_true", help="先清除現有事故、熱點、發佈指標與合成分析紀錄")
+    parser.add_argument(
+        "--defer-indexes", action="store_true", help="載入事故前刪除一般索引，載入後重建"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="只產生資料與 CSV，不連線資料庫")
+    parser.add_argument("--database-url", default=None, help="資料庫連線字串（預設使用設定檔）")
+    return parser.parse_args(argv)
+
+
+def _connect(database_url: Optional[str]):
+    if database_url:
+        import psycopg2
+
+        return psycopg2.connect(database_url)
+    from src.db.session import get_engine
+
+    return get_engine().raw_connection()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """主函數"""
+    args = parse_args(argv)
+    periods = [int(value) for value in args.periods.split(",") if value]
+    rng = np.random.default_rng(args.seed)
+    today = date.today()
+    started_at = datetime.now(timezone.utc)
+    created_at = started_at.isoformat(timespec="seconds")
+    batch_tag = started_at.strftime("%Y%m%d%H%M%S")
+    profiler = StageProfiler()
+
+    print(f"🌱 產生 {args.accidents:,} 筆事故（{args.clusters:,} 個群集、{args.days} 天）...")
+    with profiler.stage("generate", rows=args.accidents):
+        accidents, anchors = generate_accidents(
+            args.accidents, args.days, today, rng, args.clusters, args.background_ratio
+        )
+    location_texts = [INTERSECTIONS[anchor][0] for anchor in anchors]
+
+    connection = None if args.dry_run else _connect(args.database_url)
+    cursor = connection.cursor() if connection is not None else None
+    try:
+        if cursor is not None and args.clear:
+            print("🗑️  清除現有資料...")
+            cursor.execute("TRUNCATE hotspots, accidents")
+            cursor.execute("SELECT to_regclass('hotspot_publications')")
+            if cursor.fetchone()[0] is not None:
+                cursor.execute("TRUNCATE hotspot_publications")
+            cursor.execute("SELECT to_regclass('analysis_runs')")
+            if cursor.fetchone()[0] is not None:
+                cursor.execute("DELETE FROM analysis_runs WHERE source = 'synthetic'")
+            connection.commit()
+
+        deferred: List[str] = []
+        if cursor is not None and args.defer_indexes:
+            deferred = drop_secondary_indexes(cursor, "accidents")
+
+        csv_chars = 0
+        load_start = perf_counter()
+        with profiler.stage("copy_accidents", rows=len(accidents)):
+            for start in range(0, len(accidents), args.batch_size):
+                stop = min(start + args.batch_size, len(accidents))
+                csv_chars += copy_csv(
+                    cursor,
+                    "accidents",
+                    ACCIDENT_COLUMNS,
+                    accident_csv(accidents, start, stop, location_texts, batch_tag, created_at),
+                )
+                elapsed = perf_counter() - load_start
+                print(f"   已寫入 {stop:,}/{len(accidents):,} 筆（{stop / elapsed:,.0f} rows/sec）")
+            if connection is not None:
+                connection.commit()
+
+        if deferred:
+            with profiler.stage("rebuild_indexes", rows=len(deferred)):
+                for definition in deferred:
+                    cursor.execute(definition)
+                connection.commit()
+
+        runs: List[Dict] = []
+        hotspot_total = 0
+        for version in range(args.analysis_versions):
+            analysis_date = today - timedelta(days=version * args.version_interval_days)
+            for period_days in periods:
+                stats_profiler = StageProfiler()
+                with stats_profiler.stage("cluster_stats") as stage:
+                    summary = summarize_clusters(
+                        accidents, analysis_date, period_days, args.min_accidents
+                    )
+                    stage.rows = len(summary.counts)
+                run_id = str(uuid.uuid4())
+                with profiler.stage(f"copy_hotspots_{period_days}d", rows=len(summary.counts)):
+                    csv_chars += copy_csv(
+                        cursor,
+                        "hotspots",
+                        HOTSPOT_COLUMNS,
+                        hotspot_csv(summary, accidents, rng, created_at, run_id),
+                    )
+                hotspot_total += len(summary.counts)
+                runs.append(
+                    {
+                        "id": run_id,
+                        "analysis_date": analysis_date,
+                        "period_days": period_days,
+                        "epsilon_meters": args.epsilon_meters,
+                        "min_samples": args.min_accidents,
+                        "accident_count": summary.window_accidents,
+                        "hotspot_count": len(summary.counts),
+                        "stage": stats_profiler.as_dicts()[0],
+                    }
+                )
+                print(
+                    f"🔥 {analysis_date} / {period_days} 天：{len(summary.counts):,} 個熱點"
+                    f"（{summary.window_accidents:,} 筆事故）"
+                )
+
+        if connection is not None:
+            # 熱點與發佈指標在同一個交易中提交
+            publish_latest_versions(cursor, runs)
+            connection.commit()
+            record_analysis_runs(connection, runs, started_at)
+            with profiler.stage("analyze"):
+                cursor.execute("ANALYZE accidents")
+                cursor.execute("ANALYZE hotspots")
+                connection.commit()
+    except Exception:
+        if connection is not None:
+            connection.rollback()
+        raise
+    finally:
+        if connection is not None:
+            connection.close()
+        profiler.finish()
+
+    print()
+    print(profiler.format_table())
+    print(
+        f"\n✨ 完成：{len(accidents):,} 筆事故、{hotspot_total:,} 筆熱點、"
+        f"{len(runs)} 筆分析紀錄（CSV {csv_chars / 1_000_000:,.1f}M 字元）"
+    )
+    if args.dry_run:
+        print("   --dry-run：未寫入資料庫")
+
+
+if __name__ == "__main__":
+    main()
@@ -33,11 +33,11 @@ class DataIngestionService:
         Returns:
             擷取的資料筆數
         """
-        logger.info(f"開始擷取 A1 資料: start_date={start_date}, end_date={end_date}")
+        logger.info("開始擷取 A1 資料: start_date=%s, end_date=%s", start_date, end_date)
         # TODO: 實作從政府 API 擷取 A1 資料的邏輯
         # 這裡是骨架實作，實際需要整合政府開放資料 API
         count = 0
-        logger.info(f"A1 資料擷取完成: {count} 筆")
+        logger.info("A1 資料擷取完成: %s 筆", count)
         return count
 
     async def ingest_a2(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> int:
@@ -51,10 +51,10 @@ class DataIngestionService:
         Returns:
             擷取的資料筆數
         """
-        logger.info(f"開始擷取 A2 資料: start_date={start_date}, end_date={end_date}")
+        logger.info("開始擷取 A2 資料: start_date=%s, end_date=%s", start_date, end_date)
         # TODO: 實作從政府 API 擷取 A2 資料的邏輯
         count = 0
-        logger.info(f"A2 資料擷取完成: {count} 筆")
+        logger.info("A2 資料擷取完成: %s 筆", count)
         return count
 
     async def ingest_a3(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> int:
@@ -68,11 +68,11 @@ class DataIngestionService:
         Returns:
             擷取的資料筆數
         """
-        logger.info(f"開始擷取 A3 資料: start_date={start_date}, end_date={end_date}")
+        logger.info("開始擷取 A3 資料: start_date=%s, end_date=%s", start_date, end_date)
         # TODO: 實作從政府 API 擷取 A3 資料的邏輯
         # 並使用 geocoding_service 進行地址轉換
         count = 0
-        logger.info(f"A3 資料擷取完成: {count} 筆")
+        logger.info("A3 資料擷取完成: %s 筆", count)
         return count
 
     def _save_accident(
@@ -104,7 +104,7 @@ class DataIngestionService:
         )
 
         if existing:
-            logger.debug(f"事故記錄已存在: {source_type}-{source_id}")
+            logger.debug("事故記錄已存在: %s-%s", source_type, source_id)
             return existing
 
         # 建立 PostGIS 地理點（使用 WKT 字串，PostGIS Trigger 會自動處理）
@@ -149,7 +149,7 @@ class DataIngestionService:
         Returns:
             各來源的擷取結果
         """
-        logger.info(f"開始完整資料擷取: source_types={source_types}, force_refresh={force_refresh}")
+        logger.info("開始完整資料擷取: source_types=%s, force_refresh=%s", source_types, force_refresh)
 
         if source_types is None:
             source_types = ["A1", "A2", "A3"]
@@ -172,7 +172,7 @@ class DataIngestionService:
             duplicates_removed = self._deduplicate_accidents()
 
             self.db.commit()
-            logger.info(f"資料擷取完成: {results}, 移除重複記錄 {duplicates_removed} 筆")
+            logger.info("資料擷取完成: %s, 移除重複記錄 %s 筆", results, duplicates_removed)
 
             return {
                 "results": results,
@@ -182,5 +182,5 @@ class DataIngestionService:
 
         except Exception as e:
             self.db.rollback()
-            logger.error(f"資料擷取失敗: {e}", exc_info=True)
+            logger.error("資料擷取失敗: %s", e, exc_info=True)
             raise
@@ -47,7 +47,7 @@ class GeocodingService:
                 data = response.json()
 
                 if data.get("status") != "OK" or not data.get("results"):
-                    logger.warning(f"地理編碼失敗: {address}, status={data.get('status')}")
+                    logger.warning("地理編碼失敗: %s, status=%s", address, data.get("status"))
                     return None
 
                 result = data["results"][0]
@@ -65,11 +65,11 @@ class GeocodingService:
                 }
                 confidence = confidence_map.get(location_type, 0.5)
 
-                logger.debug(f"地理編碼成功: {address} -> ({lat}, {lng}), confidence={confidence}")
+                logger.debug("地理編碼成功: %s -> (%s, %s), confidence=%s", address, lat, lng, confidence)
                 return (lat, lng, confidence)
 
         except Exception as e:
-            logger.error(f"地理編碼錯誤: {address}, error={e}", exc_info=True)
+            logger.error("地理編碼錯誤: %s, error=%s", address, e, exc_info=True)
             return None
 
     async def geocode_batch(
@@ -0,0 +1,268 @@
+"""Health Service：健康檢查（快取資料庫檢查結果，探測本身幾乎不耗資源）"""
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from time import monotonic, perf_counter
+from typing import Callable, List, Optional
+import asyncio
+
+from sqlalchemy import func, text
+from starlette.concurrency import run_in_threadpool
+
+from src.core.cache import nearby_cache
+from src.core.config import get_settings
+from src.core.logging import get_logger
+from src.core.loop_monitor import loop_monitor
+from src.db.session import get_engine, get_session_factory
+from src.models.accident import Accident
+from src.models.analysis_run import AnalysisRun
+from src.models.hotspot import Hotspot
+from src.models.hotspot_publication import HotspotPublication
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class PublishedVersion:
+    """
+    目前發佈的分析版本（hotspot_publications 的指標）
+
+    尚未有任何發佈紀錄時（003 migration 之前的熱點），讀取端沿用最新 analysis_date，
+    此時 analysis_period_days 與 analysis_run_id 為 None。
+    """
+
+    analysis_period_days: Optional[int]
+    analysis_run_id: Optional[str]
+    analysis_date: date
+
+    def as_dict(self) -> dict:
+        return {
+            "analysis_period_days": self.analysis_period_days,
+            "analysis_run_id": self.analysis_run_id,
+            "analysis_date": self.analysis_date.isoformat(),
+        }
+
+
+@dataclass
+class DatabaseSnapshot:
+    """
+    一次資料庫檢查的結果
+
+    Attributes:
+        connected: 是否可連線
+        checked_at: 檢查時間（UTC）
+        latency_ms: 檢查耗時
+        published_versions: 各分析期間目前發佈的版本（即讀取端實際提供的分析版本）
+        last_ingested_at: 最近一筆事故資料的寫入時間
+        last_analysis_run: 最近一次分析執行（status, finished_at）
+        error: 連線失敗時的錯誤訊息
+    """
+
+    connected: bool
+    checked_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    latency_ms: float = 0.0
+    published_versions: List[PublishedVersion] = field(default_factory=list)
+    last_ingested_at: Optional[datetime] = None
+    last_analysis_run: Optional[dict] = None
+    error: Optional[str] = None
+
+
+def _published_versions(db) -> List[PublishedVersion]:
+    """讀取發佈指標；與 hotspot_service 相同，沒有發佈紀錄時沿用最新 analysis_date"""
+    publications = db.query(HotspotPublication).order_by(
+        HotspotPublication.analysis_period_days
+    )
+    versions = [
+        PublishedVersion(
+            analysis_period_days=publication.analysis_period_days,
+            analysis_run_id=str(publication.analysis_run_id),
+            analysis_date=publication.analysis_date,
+        )
+        for publication in publications
+    ]
+    if versions:
+        return versions
+
+    latest_analysis_date = db.query(func.max(Hotspot.analysis_date)).scalar()
+    if latest_analysis_date is None:
+        return []
+    return [PublishedVersion(None, None, latest_analysis_date)]
+
+
+def probe_database() -> DatabaseSnapshot:
+    """連線資料庫並讀取目前發佈的分析版本與最近的擷取、分析時間"""
+    start = perf_counter()
+    db = get_session_factory()()
+    try:
+        try:
+            db.execute(text("SELECT 1"))
+        except Exception as exc:
+            return DatabaseSnapshot(
+                connected=False,
+                latency_ms=(perf_counter() - start) * 1000,
+                error=type(exc).__name__,
+            )
+
+        snapshot = DatabaseSnapshot(connected=True)
+        try:
+            snapshot.published_versions = _published_versions(db)
+            snapshot.last_ingested_at = db.query(func.max(Accident.created_at)).scalar()
+            run = db.query(AnalysisRun).order_by(AnalysisRun.started_at.desc()).first()
+            if run is not None:
+                snapshot.last_analysis_run = {
+                    "status": run.status,
+                    "source": run.source,
+                    "finished_at": run.finished_at.isoformat(),
+                }
+        except Exception as exc:
+            # 細節查詢失敗（例如 migration 尚未套用）不影響連線狀態
+            db.rollback()
+            logger.warning("健康檢查讀取資料狀態失敗: %s", exc)
+        snapshot.latency_ms = (perf_counter() - start) * 1000
+        return snapshot
+    finally:
+        db.close()
+
+
+def pool_status() -> dict:
+    """取得連線池使用狀況（NullPool 沒有可統計的連線數，只回傳類別）"""
+    pool = get_engine().pool
+    status = {"class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            status[name] = method()
+    return status
+
+
+class HealthService:
+    """
+    健康檢查服務
+
+    資料庫檢查結果快取 ttl_seconds 秒：探測頻率再高，每個執行個體在同一區間內也只連線一次，
+    過期時由第一個探測在 threadpool 中更新（其餘探測等待同一次更新），不會阻塞 event loop。
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], DatabaseSnapshot] = probe_database,
+        ttl_seconds: float = 10,
+        max_analysis_age_days: int = 30,
+        clock: Callable[[], float] = monotonic,
+    ):
+        """
+        初始化服務
+
+        Args:
+            probe: 資料庫檢查函式（測試時可替換）
+            ttl_seconds: 檢查結果快取時間（秒）
+            max_analysis_age_days: 分析結果超過此天數視為過期（0 表示不檢查）
+            clock: 時間來源，測試時可替換
+        """
+        self.probe = probe
+        self.ttl_seconds = ttl_seconds
+        self.max_analysis_age_days = max_analysis_age_days
+        self._clock = clock
+        self._snapshot: Optional[DatabaseSnapshot] = None
+        self._snapshot_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _is_fresh(self) -> bool:
+        return self._snapshot is not None and self._clock() - self._snapshot_at < self.ttl_seconds
+
+    async def get_snapshot(self) -> DatabaseSnapshot:
+        """取得資料庫檢查結果（快取過期時才重新檢查）"""
+        if self._is_fresh():
+            return self._snapshot
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._is_fresh():
+                try:
+                    snapshot = await run_in_threadpool(self.probe)
+                except Exception as exc:
+                    snapshot = DatabaseSnapshot(connected=False, error=type(exc).__name__)
+                if not snapshot.connected:
+                    logger.warning("健康檢查資料庫連線失敗: %s", snapshot.error)
+                self._snapshot = snapshot
+                self._snapshot_at = self._clock()
+        return self._snapshot
+
+    def snapshot_age_seconds(self) -> Optional[float]:
+        """快取的檢查結果已存在多久"""
+        if self._snapshot is None:
+            return None
+        return round(self._clock() - self._snapshot_at, 3)
+
+    def analysis_age_days(self, snapshot: DatabaseSnapshot) -> Optional[int]:
+        """最舊的發佈版本距今天數（任一分析期間過期，讀取端就在提供過期的結果）"""
+        if not snapshot.published_versions:
+            return None
+        oldest = min(version.analysis_date for version in snapshot.published_versions)
+        return (datetime.now(timezone.utc).date() - oldest).days
+
+    def is_stale(self, snapshot: DatabaseSnapshot) -> bool:
+        """分析結果是否過期（沒有任何分析結果也視為過期）"""
+        if self.max_analysis_age_days <= 0:
+            return False
+        age_days = self.analysis_age_days(snapshot)
+        return age_days is None or age_days > self.max_analysis_age_days
+
+    def liveness(self) -> dict:
+        """存活探測：不接觸資料庫，能回應即代表 event loop 仍在運作"""
+        return {"status": "alive", "event_loop": loop_monitor.snapshot()}
+
+    async def readiness(self) -> dict:
+        """就緒探測：依快取的資料庫檢查結果判斷能否接收流量"""
+        snapshot = await self.get_snapshot()
+        return {
+            "status": "ready" if snapshot.connected else "not_ready",
+            "database": "connected" if snapshot.connected else "disconnected",
+            "analysis_version": [version.as_dict() for version in snapshot.published_versions],
+        }
+
+    async def report(self) -> dict:
+        """完整健康狀態（連線池、快取、分析版本、最近擷取與分析時間、event loop 延遲）"""
+        snapshot = await self.get_snapshot()
+        stale = self.is_stale(snapshot)
+        if not snapshot.connected:
+            status = "unhealthy"
+        elif stale:
+            status = "degraded"
+        else:
+            status = "healthy"
+
+        return {
+            "status": status,
+            "timestamp": datetime.utcnow().isoformat(),
+            "database": "connected" if snapshot.connected else "disconnected",
+            "database_check": {
+                "checked_at": snapshot.checked_at.isoformat(),
+                "age_seconds": self.snapshot_age_seconds(),
+                "latency_ms": round(snapshot.latency_ms, 2),
+                "error": snapshot.error,
+            },
+            "pool": pool_status(),
+            "cache": nearby_cache.stats(),
+            "analysis": {
+                "version": [version.as_dict() for version in snapshot.published_versions],
+                "age_days": self.analysis_age_days(snapshot),
+                "stale": stale,
+                "last_run": snapshot.last_analysis_run,
+            },
+            "last_ingested_at": (
+                snapshot.last_ingested_at.isoformat() if snapshot.last_ingested_at else None
+            ),
+            "event_loop": loop_monitor.snapshot(),
+        }
+
+
+health_service = HealthService(
+    ttl_seconds=settings.health_check_ttl_seconds,
+    max_analysis_age_days=settings.health_max_analysis_age_days,
+)
+
+
+def get_health_service() -> HealthService:
+    """取得健康檢查服務（Dependency）"""
+    return health_service
@@ -1,163 +1,760 @@
 """Hotspot Analysis Service：DBSCAN 聚類分析"""
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from typing import List, Dict
-from datetime import datetime, timedelta, date
+from sqlalchemy import func, and_, or_
+from typing import List, Dict, Optional, Sequence, Tuple
+from datetime import datetime, timedelta, date, timezone
 from decimal import Decimal
+from time import perf_counter
 import uuid
 import json
 
-from sklearn.cluster import DBSCAN
 import numpy as np
-from geopy.distance import geodesic
 
 from src.models.accident import Accident
+from src.models.analysis_run import AnalysisRun
 from src.models.hotspot import Hotspot
-from src.models import SourceType
+from src.models.hotspot_publication import HotspotPublication
+from src.core.cache import hotspot_version_cache
 from src.core.logging import get_logger
+from src.core.metrics import ANALYSIS_JOB_DURATION, ANALYSIS_STAGE_DURATION
+from src.core.stage_profiler import StageProfiler
+from src.services.hotspot_engine import (
+    SEVERITY_LEVELS,
+    ClusterSummaries,
+    IncrementalRegion,
+    cluster_coordinates,
+    cluster_windows,
+    encode_severities,
+    hotspot_radius,
+    plan_incremental,
+    recluster_region,
+    summarize_clusters,
+    window_sizes,
+)
+from src.services.hotspot_publisher import carry_over_hotspots, publish_hotspots
 
 logger = get_logger(__name__)
 
 
+STAGE_FETCH_ACCIDENTS = "fetch_accidents"
+STAGE_BUILD_ARRAYS = "build_arrays"
+STAGE_DBSCAN_FIT = "dbscan_fit"
+STAGE_CLUSTER_STATS = "cluster_stats"
+STAGE_DB_WRITE = "db_write"
+STAGE_PUBLISH = "publish"
+STAGE_AFFECTED_REGION = "affected_region"
+
+# 多期間模式預設分析的期間（天）
+ANALYSIS_PERIODS = (30, 90, 180, 365)
+
+# 增量分析需要重新聚類的事故超過此比例時改為完整分析（範圍太大時完整分析反而較快）
+INCREMENTAL_MAX_FRACTION = 0.5
+
+
 class HotspotAnalysisService:
     """熱點分析服務（DBSCAN）"""
 
-    def __init__(self, db: Session):
-        """初始化服務"""
+    def __init__(self, db: Session, trace_memory: bool = False):
+        """
+        初始化服務
+
+        Args:
+            db: 資料庫連線
+            trace_memory: 是否以 tracemalloc 量測各階段記憶體峰值（會拖慢分析）
+        """
         self.db = db
+        self.trace_memory = trace_memory
 
     def analyze(
         self,
         analysis_period_days: int = 365,
         epsilon_meters: int = 500,
         min_samples: int = 5,
+        incremental: bool = False,
     ) -> int:
         """
         執行 DBSCAN 聚類分析，識別事故熱點
 
+        各階段的耗時、CPU 時間、記憶體峰值與資料筆數會寫入 analysis_runs。
+        熱點以 COPY 寫入後，在同一個交易中將該分析期間的發佈指標切換到本次分析版本。
+
+        增量模式只對上一版本之後新增、修改或移出分析期間的事故附近重新聚類，
+        其餘熱點沿用上一版本（含 id）；無法增量分析時（尚無發佈版本、參數不同、
+        偵測到刪除的事故或影響範圍過大）自動改為完整分析。
+
         Args:
             analysis_period_days: 分析過去幾天的事故資料（預設：365天）
             epsilon_meters: DBSCAN epsilon參數（公尺）
             min_samples: DBSCAN min_samples參數（最小事故數）
+            incremental: 是否以增量模式分析
 
         Returns:
             產生的熱點數量
         """
+        profiler = StageProfiler(trace_memory=self.trace_memory)
+        started_at = datetime.now(timezone.utc)
+        start = perf_counter()
+        status = "error"
+        error_message = None
+        hotspot_count = 0
+        run_id = uuid.uuid4()
+        try:
+            hotspot_count = self._analyze(
+                profiler, run_id, analysis_period_days, epsilon_meters, min_samples, incremental
+            )
+            status = "success"
+            return hotspot_count
+        except Exception as exc:
+            error_message = str(exc)
+            raise
+        finally:
+            ANALYSIS_JOB_DURATION.observe(
+                perf_counter() - start, labels=(str(analysis_period_days), status)
+            )
+            profiler.finish()
+            for stage in profiler.stages:
+                ANALYSIS_STAGE_DURATION.observe(stage.wall_ms / 1000, labels=(stage.name,))
+            logger.info("熱點分析各階段耗時:\n%s", profiler.format_table())
+            self._record_run(
+                profiler,
+                run_id=run_id,
+                status=status,
+                error_message=error_message,
+                started_at=started_at,
+                analysis_period_days=analysis_period_days,
+                epsilon_meters=epsilon_meters,
+                min_samples=min_samples,
+                hotspot_count=hotspot_count,
+            )
+
+    def _record_run(
+        self,
+        profiler: StageProfiler,
+        run_id: uuid.UUID,
+        status: str,
+        error_message: Optional[str],
+        started_at: datetime,
+        analysis_period_days: int,
+        epsilon_meters: int,
+        min_samples: int,
+        hotspot_count: int,
+        accident_count: Optional[int] = None,
+    ) -> None:
+        """寫入分析執行紀錄（失敗只記錄警告，不影響分析結果）"""
+        if accident_count is None:
+            accident_count = profiler.rows_for(STAGE_FETCH_ACCIDENTS) or 0
+        try:
+            if status != "success":
+                self.db.rollback()
+            self.db.add(
+                AnalysisRun(
+                    id=run_id,
+                    source="api",
+                    status=status,
+                    analysis_period_days=analysis_period_days,
+                    epsilon_meters=epsilon_meters,
+                    min_samples=min_samples,
+                    started_at=started_at,
+                    finished_at=datetime.now(timezone.utc),
+                    wall_ms=profiler.total_wall_ms,
+                    cpu_ms=profiler.total_cpu_ms,
+                    peak_memory_bytes=profiler.peak_memory_bytes,
+                    max_rss_bytes=profiler.max_rss_bytes,
+                    accident_count=accident_count,
+                    hotspot_count=hotspot_count,
+                    stages=profiler.as_dicts(),
+                    error_message=error_message,
+                )
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            logger.warning("無法寫入分析執行紀錄", exc_info=True)
+
+    def _analyze(
+        self,
+        profiler: StageProfiler,
+        run_id: uuid.UUID,
+        analysis_period_days: int,
+        epsilon_meters: int,
+        min_samples: int,
+        incremental: bool = False,
+    ) -> int:
+        """執行分析主流程（各階段由 profiler 量測）"""
         logger.info(
-            f"開始熱點分析: period_days={analysis_period_days}, "
-            f"epsilon={epsilon_meters}m, min_samples={min_samples}"
+            "開始熱點分析: period_days=%s, epsilon=%sm, min_samples=%s, incremental=%s",
+            analysis_period_days,
+            epsilon_meters,
+            min_samples,
+            incremental,
         )
 
         # 查詢過去指定天數內的事故
         cutoff_date = datetime.utcnow() - timedelta(days=analysis_period_days)
-        accidents = (
-            self.db.query(Accident)
-            .filter(Accident.occurred_at >= cutoff_date)
+        rows = self._fetch_accidents(profiler, cutoff_date)
+
+        if len(rows) < min_samples:
+            logger.warning("事故數量不足: %s < %s", len(rows), min_samples)
+            return 0
+
+        accident_ids, occurred_times, latitudes, longitudes, severities, occurred_at = (
+            self._build_arrays(profiler, rows)
+        )
+
+        if incremental:
+            hotspot_count = self._analyze_incremental(
+                profiler,
+                run_id,
+                analysis_period_days,
+                epsilon_meters,
+                min_samples,
+                cutoff_date,
+                accident_ids,
+                occurred_times,
+                latitudes,
+                longitudes,
+                severities,
+                occurred_at,
+            )
+            if hotspot_count is not None:
+                return hotspot_count
+
+        # 執行 DBSCAN（使用 haversine 距離，epsilon 換算為弧度）
+        with profiler.stage(STAGE_DBSCAN_FIT, rows=len(rows)):
+            labels = cluster_coordinates(latitudes, longitudes, epsilon_meters, min_samples)
+
+        # 一次計算所有聚類的中心點、半徑、各嚴重程度事故數與時間範圍
+        with profiler.stage(STAGE_CLUSTER_STATS) as stage:
+            summaries = summarize_clusters(
+                labels, latitudes, longitudes, severities, occurred_at, min_samples
+            )
+            stage.rows = len(summaries)
+
+        # 建立熱點記錄，COPY 寫入並發佈（同一個交易）
+        analysis_date = date.today()
+        with profiler.stage(STAGE_DB_WRITE, rows=len(summaries)):
+            publish_hotspots(
+                self.db.connection().connection,
+                self._hotspot_records(
+                    summaries,
+                    accident_ids,
+                    occurred_times,
+                    analysis_date,
+                    analysis_period_days,
+                    cutoff_date.date(),
+                ),
+                run_id,
+                analysis_period_days,
+                analysis_date,
+            )
+            self.db.commit()
+            hotspot_version_cache.clear()
+
+        hotspot_count = len(summaries)
+        logger.info("熱點分析完成: 產生 %s 個熱點", hotspot_count)
+        return hotspot_count
+
+    def _analyze_incremental(
+        self,
+        profiler: StageProfiler,
+        run_id: uuid.UUID,
+        analysis_period_days: int,
+        epsilon_meters: int,
+        min_samples: int,
+        cutoff_date: datetime,
+        accident_ids: Sequence,
+        occurred_times: Sequence[datetime],
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        severities: np.ndarray,
+        occurred_at: np.ndarray,
+    ) -> Optional[int]:
+        """
+        增量分析：只重新聚類受異動事故影響的範圍，並與上一版本未受影響的熱點合併
+
+        Returns:
+            產生的熱點數量（無法增量分析時回傳 None，由呼叫端改為完整分析）
+        """
+        with profiler.stage(STAGE_AFFECTED_REGION) as stage:
+            previous = self._previous_run(analysis_period_days, epsilon_meters, min_samples)
+            if previous is None:
+                return None
+            planned = self._plan_incremental(
+                previous, cutoff_date, accident_ids, latitudes, longitudes, epsilon_meters
+            )
+            if planned is None:
+                return None
+            region, hotspot_ids = planned
+            region_points = int(region.points.sum())
+            stage.rows = region_points
+
+        if region_points > INCREMENTAL_MAX_FRACTION * len(accident_ids):
+            logger.info(
+                "影響範圍過大（%s/%s 筆事故），改為完整分析", region_points, len(accident_ids)
+            )
+            return None
+
+        with profiler.stage(STAGE_DBSCAN_FIT, rows=region_points):
+            labels = recluster_region(latitudes, longitudes, region, epsilon_meters, min_samples)
+
+        with profiler.stage(STAGE_CLUSTER_STATS) as stage:
+            summaries = summarize_clusters(
+                labels, latitudes, longitudes, severities, occurred_at, min_samples
+            )
+            stage.rows = len(summaries)
+
+        kept_ids = [
+            hotspot_id
+            for hotspot_id, affected in zip(hotspot_ids, region.affected_hotspots)
+            if not affected
+        ]
+        analysis_date = date.today()
+        with profiler.stage(STAGE_DB_WRITE, rows=len(summaries) + len(kept_ids)):
+            connection = self.db.connection().connection
+            moved, _ = carry_over_hotspots(
+                connection,
+                previous.id,
+                kept_ids,
+                run_id,
+                analysis_date,
+                cutoff_date.date(),
+                analysis_date - timedelta(days=1),
+            )
+            publish_hotspots(
+                connection,
+                self._hotspot_records(
+                    summaries,
+                    accident_ids,
+                    occurred_times,
+                    analysis_date,
+                    analysis_period_days,
+                    cutoff_date.date(),
+                ),
+                run_id,
+                analysis_period_days,
+                analysis_date,
+                carried_over=moved,
+            )
+            self.db.commit()
+            hotspot_version_cache.clear()
+
+        hotspot_count = len(summaries) + moved
+        logger.info(
+            "增量熱點分析完成: 重新聚類 %s/%s 筆事故，沿用 %s 個熱點，重新產生 %s 個熱點",
+            region_points,
+            len(accident_ids),
+            moved,
+            len(summaries),
+        )
+        return hotspot_count
+
+    def _previous_run(
+        self, analysis_period_days: int, epsilon_meters: int, min_samples: int
+    ) -> Optional[AnalysisRun]:
+        """目前發佈的版本（成功且參數相同時才能作為增量分析的基準）"""
+        publication = self.db.get(HotspotPublication, analysis_period_days)
+        run = self.db.get(AnalysisRun, publication.analysis_run_id) if publication else None
+        if run is None or run.status != "success":
+            logger.info("沒有可沿用的發佈版本，改為完整分析")
+            return None
+        if (run.epsilon_meters, run.min_samples) != (epsilon_meters, min_samples):
+            logger.info(
+                "上一版本的聚類參數不同（epsilon=%sm, min_samples=%s），改為完整分析",
+                run.epsilon_meters,
+                run.min_samples,
+            )
+            return None
+        return run
+
+    def _plan_incremental(
+        self,
+        previous: AnalysisRun,
+        cutoff_date: datetime,
+        accident_ids: Sequence,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        epsilon_meters: int,
+    ) -> Optional[Tuple[IncrementalRegion, List[uuid.UUID]]]:
+        """
+        找出上一版本之後的異動事故與受影響的範圍
+
+        異動事故包含：上一版本開始後新增（created_at）的事故，以及分析期間往後推移而移出的事故。
+        以下情況無法得知事故原本的位置，回傳 None 改為完整分析：
+        既有事故在上一版本開始後被修改（updated_at，座標可能已改變，舊位置附近的鄰居數也會改變），
+        或目前事故數與「上一版本事故數 - 移出 + 新增」不符（有事故被刪除或發生時間被修改）。
+
+        Returns:
+            (IncrementalRegion, 上一版本的熱點 id 列表)，或 None
+        """
+        started_at = previous.started_at
+        # 與 cutoff_date 相同以 UTC naive 時間比較 occurred_at
+        previous_cutoff = started_at.astimezone(timezone.utc).replace(tzinfo=None) - timedelta(
+            days=previous.analysis_period_days
+        )
+        changed = (
+            self.db.query(Accident.id, Accident.created_at)
+            .filter(
+                Accident.occurred_at >= cutoff_date,
+                or_(Accident.created_at > started_at, Accident.updated_at > started_at),
+            )
+            .all()
+        )
+        expired = (
+            self.db.query(Accident.latitude, Accident.longitude)
+            .filter(
+                Accident.occurred_at >= previous_cutoff,
+                Accident.occurred_at < cutoff_date,
+                Accident.created_at <= started_at,
+            )
             .all()
         )
+        inserted = sum(1 for _, created_at in changed if created_at > started_at)
+        if inserted < len(changed):
+            logger.info(
+                "有 %s 筆既有事故在上一版本之後被修改，無法得知原本的位置，改為完整分析",
+                len(changed) - inserted,
+            )
+            return None
+        if len(accident_ids) != previous.accident_count - len(expired) + inserted:
+            logger.info(
+                "事故數與上一版本不符（%s != %s - %s + %s），可能有事故被刪除，改為完整分析",
+                len(accident_ids),
+                previous.accident_count,
+                len(expired),
+                inserted,
+            )
+            return None
+
+        positions = {str(accident_id): index for index, accident_id in enumerate(accident_ids)}
+        changed_positions = [
+            positions[str(accident_id)]
+            for accident_id, _ in changed
+            if str(accident_id) in positions
+        ]
+
+        hotspots = (
+            self.db.query(Hotspot.id, Hotspot.accident_ids)
+            .filter(Hotspot.analysis_run_id == previous.id)
+            .all()
+        )
+        member_points: List[int] = []
+        member_hotspots: List[int] = []
+        stale = np.zeros(len(hotspots), dtype=bool)
+        for hotspot_index, (_, members) in enumerate(hotspots):
+            for accident_id in members:
+                position = positions.get(str(accident_id))
+                if position is None:
+                    stale[hotspot_index] = True
+                else:
+                    member_points.append(position)
+                    member_hotspots.append(hotspot_index)
+
+        expired_latitudes = np.array([float(lat) for lat, _ in expired], dtype=np.float64)
+        expired_longitudes = np.array([float(lng) for _, lng in expired], dtype=np.float64)
+        region = plan_incremental(
+            latitudes,
+            longitudes,
+            np.concatenate([latitudes[changed_positions], expired_latitudes]),
+            np.concatenate([longitudes[changed_positions], expired_longitudes]),
+            np.array(member_points, dtype=np.int64),
+            np.array(member_hotspots, dtype=np.int64),
+            stale,
+            epsilon_meters,
+        )
+        logger.info(
+            "增量分析: %s 筆異動事故、%s 筆移出分析期間，%s/%s 個熱點受影響",
+            len(changed_positions),
+            len(expired),
+            int(region.affected_hotspots.sum()),
+            len(hotspots),
+        )
+        return region, [hotspot_id for hotspot_id, _ in hotspots]
 
-        if len(accidents) < min_samples:
-            logger.warning(f"事故數量不足: {len(accidents)} < {min_samples}")
-            return 0
+    def analyze_periods(
+        self,
+        analysis_periods: Sequence[int] = ANALYSIS_PERIODS,
+        epsilon_meters: int = 500,
+        min_samples: int = 5,
+        workers: int = 1,
+    ) -> Dict[int, int]:
+        """
+        一次分析多個期間（例如每晚的 30/90/180/365 天）
 
-        # 準備座標資料（轉換為 numpy array）
-        coordinates = np.array([
-            [float(acc.latitude), float(acc.longitude)] for acc in accidents
-        ])
+        只讀取一次最長期間的事故並建立陣列；事故依時間由新到舊排序後，較短的期間都是陣列的前綴，
+        不必重新查詢資料庫。各期間的 DBSCAN 可交給 worker 行程平行執行，結果與逐期間分析相同。
+        各期間各自寫入一筆 analysis_runs（共用同一份階段量測），所有期間在同一個交易中發佈。
 
-        # 執行 DBSCAN（使用 haversine 距離）
-        # epsilon 轉換為度數（約略：1度 ≈ 111公里）
-        epsilon_degrees = epsilon_meters / 111000.0
+        Args:
+            analysis_periods: 分析期間（天）
+            epsilon_meters: DBSCAN epsilon參數（公尺）
+            min_samples: DBSCAN min_samples參數（最小事故數）
+            workers: DBSCAN 的 worker 行程數（1 表示在目前行程依序執行）
 
-        dbscan = DBSCAN(
-            eps=epsilon_degrees,
-            min_samples=min_samples,
-            metric="haversine",
-            algorithm="ball_tree",
+        Returns:
+            {分析期間天數: 熱點數量}
+        """
+        periods = sorted(set(analysis_periods))
+        run_ids = {period_days: uuid.uuid4() for period_days in periods}
+        profiler = StageProfiler(trace_memory=self.trace_memory)
+        started_at = datetime.now(timezone.utc)
+        start = perf_counter()
+        status = "error"
+        error_message = None
+        hotspot_counts: Dict[int, int] = {}
+        accident_counts: Dict[int, int] = {}
+        try:
+            self._analyze_periods(
+                profiler,
+                run_ids,
+                epsilon_meters,
+                min_samples,
+                workers,
+                hotspot_counts,
+                accident_counts,
+            )
+            status = "success"
+            return hotspot_counts
+        except Exception as exc:
+            error_message = str(exc)
+            raise
+        finally:
+            ANALYSIS_JOB_DURATION.observe(
+                perf_counter() - start, labels=(",".join(map(str, periods)), status)
+            )
+            profiler.finish()
+            for stage in profiler.stages:
+                ANALYSIS_STAGE_DURATION.observe(stage.wall_ms / 1000, labels=(stage.name,))
+            logger.info("多期間熱點分析各階段耗時:\n%s", profiler.format_table())
+            for period_days in periods:
+                self._record_run(
+                    profiler,
+                    run_id=run_ids[period_days],
+                    status=status,
+                    error_message=error_message,
+                    started_at=started_at,
+                    analysis_period_days=period_days,
+                    epsilon_meters=epsilon_meters,
+                    min_samples=min_samples,
+                    hotspot_count=hotspot_counts.get(period_days, 0),
+                    accident_count=accident_counts.get(period_days, 0),
+                )
+
+    def _analyze_periods(
+        self,
+        profiler: StageProfiler,
+        run_ids: Dict[int, uuid.UUID],
+        epsilon_meters: int,
+        min_samples: int,
+        workers: int,
+        hotspot_counts: Dict[int, int],
+        accident_counts: Dict[int, int],
+    ) -> None:
+        """執行多期間分析主流程（結果寫入 hotspot_counts 與 accident_counts）"""
+        periods = sorted(run_ids)
+        logger.info(
+            "開始多期間熱點分析: periods=%s, epsilon=%sm, min_samples=%s",
+            periods,
+            epsilon_meters,
+            min_samples,
         )
-        labels = dbscan.fit_predict(np.radians(coordinates))
 
-        # 處理聚類結果
-        unique_labels = set(labels)
-        if -1 in unique_labels:
-            unique_labels.remove(-1)  # 移除噪音點
+        # 只讀取最長期間的事故（依時間由新到舊，各期間為前綴）
+        now = datetime.utcnow()
+        cutoff_dates = {period_days: now - timedelta(days=period_days) for period_days in periods}
+        rows = self._fetch_accidents(profiler, cutoff_dates[periods[-1]], newest_first=True)
 
-        analysis_date = date.today()
-        analysis_period_start = cutoff_date.date()
-        analysis_period_end = date.today() - timedelta(days=1)
+        if len(rows) < min_samples:
+            logger.warning("事故數量不足: %s < %s", len(rows), min_samples)
+            hotspot_counts.update({period_days: 0 for period_days in periods})
+            accident_counts[periods[-1]] = len(rows)
+            return
 
-        hotspot_count = 0
-        for label in unique_labels:
-            cluster_mask = labels == label
-            cluster_accidents = [accidents[i] for i in range(len(accidents)) if cluster_mask[i]]
+        accident_ids, occurred_times, latitudes, longitudes, severities, occurred_at = (
+            self._build_arrays(profiler, rows)
+        )
+        cutoffs = [
+            cutoff_dates[period_days].replace(tzinfo=timezone.utc).timestamp()
+            for period_days in periods
+        ]
+        sizes = dict(zip(periods, window_sizes(occurred_at, cutoffs)))
+        accident_counts.update(sizes)
+
+        # 各期間的 DBSCAN（可平行）
+        with profiler.stage(STAGE_DBSCAN_FIT, rows=sum(sizes.values())):
+            window_labels = dict(
+                zip(
+                    periods,
+                    cluster_windows(
+                        latitudes,
+                        longitudes,
+                        [sizes[period_days] for period_days in periods],
+                        epsilon_meters,
+                        min_samples,
+                        workers,
+                    ),
+                )
+            )
 
-            if len(cluster_accidents) < min_samples:
+        analysis_date = date.today()
+        connection = self.db.connection().connection
+        for period_days in periods:
+            size = sizes[period_days]
+            if size < min_samples:
+                logger.warning("事故數量不足（%s 天）: %s < %s", period_days, size, min_samples)
+                hotspot_counts[period_days] = 0
                 continue
 
-            # 計算熱點統計
-            stats = self.calculate_hotspot_stats([str(acc.id) for acc in cluster_accidents])
-
-            # 計算中心點和半徑
-            cluster_coords = [(float(acc.latitude), float(acc.longitude)) for acc in cluster_accidents]
-            center_lat, center_lng = self.calculate_hotspot_center(cluster_coords)
-            radius = self.calculate_hotspot_radius(cluster_coords, (center_lat, center_lng))
-
-            # 建立熱點記錄
-            from geoalchemy2 import WKTElement
-            
-            hotspot = Hotspot(
-                id=uuid.uuid4(),
-                center_latitude=Decimal(str(center_lat)).quantize(Decimal("0.0000001")),
-                center_longitude=Decimal(str(center_lng)).quantize(Decimal("0.0000001")),
-                geom=WKTElement(f"POINT({center_lng} {center_lat})", srid=4326),
-                radius_meters=radius,
-                total_accidents=stats["total_accidents"],
-                a1_count=stats["a1_count"],
-                a2_count=stats["a2_count"],
-                a3_count=stats["a3_count"],
-                earliest_accident_at=stats["earliest_accident_at"],
-                latest_accident_at=stats["latest_accident_at"],
-                analysis_date=analysis_date,
-                analysis_period_start=analysis_period_start,
-                analysis_period_end=analysis_period_end,
-                accident_ids=json.dumps([str(acc.id) for acc in cluster_accidents]),
-            )
-
-            self.db.add(hotspot)
-            hotspot_count += 1
-
-        self.db.commit()
-        logger.info(f"熱點分析完成: 產生 {hotspot_count} 個熱點")
-        return hotspot_count
+            with profiler.stage(f"{STAGE_CLUSTER_STATS}_{period_days}d") as stage:
+                summaries = summarize_clusters(
+                    window_labels[period_days],
+                    latitudes[:size],
+                    longitudes[:size],
+                    severities[:size],
+                    occurred_at[:size],
+                    min_samples,
+                )
+                stage.rows = len(summaries)
+
+            with profiler.stage(f"{STAGE_DB_WRITE}_{period_days}d", rows=len(summaries)):
+                publish_hotspots(
+                    connection,
+                    self._hotspot_records(
+                        summaries,
+                        accident_ids,
+                        occurred_times,
+                        analysis_date,
+                        period_days,
+                        cutoff_dates[period_days].date(),
+                    ),
+                    run_ids[period_days],
+                    period_days,
+                    analysis_date,
+                )
+            hotspot_counts[period_days] = len(summaries)
+            logger.info("熱點分析完成（%s 天）: 產生 %s 個熱點", period_days, len(summaries))
+
+        # 所有期間一起切換到新版本
+        with profiler.stage(STAGE_PUBLISH, rows=len(hotspot_counts)):
+            self.db.commit()
+            hotspot_version_cache.clear()
+
+    def _fetch_accidents(
+        self, profiler: StageProfiler, cutoff_date: datetime, newest_first: bool = False
+    ) -> List[tuple]:
+        """讀取分析需要的欄位（不建立 ORM 物件）：(id, source_type, occurred_at, latitude, longitude)"""
+        with profiler.stage(STAGE_FETCH_ACCIDENTS) as stage:
+            query = self.db.query(
+                Accident.id,
+                Accident.source_type,
+                Accident.occurred_at,
+                Accident.latitude,
+                Accident.longitude,
+            ).filter(Accident.occurred_at >= cutoff_date)
+            if newest_first:
+                query = query.order_by(Accident.occurred_at.desc())
+            rows = query.all()
+            stage.rows = len(rows)
+        return rows
+
+    def _build_arrays(self, profiler: StageProfiler, rows: Sequence[tuple]) -> tuple:
+        """
+        準備座標、嚴重程度與時間陣列
 
-    def calculate_hotspot_stats(self, accident_ids: List[str]) -> Dict:
+        Returns:
+            (accident_ids, occurred_times, latitudes, longitudes, severities, occurred_at)
+        """
+        with profiler.stage(STAGE_BUILD_ARRAYS, rows=len(rows)):
+            accident_ids, source_types, occurred_times, lats, lngs = zip(*rows)
+            latitudes = np.array(lats, dtype=np.float64)
+            longitudes = np.array(lngs, dtype=np.float64)
+            severities = encode_severities(source_types)
+            occurred_at = np.array([occurred.timestamp() for occurred in occurred_times])
+        return accident_ids, occurred_times, latitudes, longitudes, severities, occurred_at
+
+    def _hotspot_records(
+        self,
+        summaries: ClusterSummaries,
+        accident_ids: Sequence,
+        occurred_times: Sequence[datetime],
+        analysis_date: date,
+        analysis_period_days: int,
+        analysis_period_start: date,
+    ) -> List[Dict]:
+        """將聚類統計轉為 publish_hotspots 的熱點記錄"""
+        analysis_period_end = analysis_date - timedelta(days=1)
+        hotspots = []
+        for cluster in range(len(summaries)):
+            a1_count, a2_count, a3_count = summaries.severity_counts[cluster].tolist()
+            hotspots.append(
+                {
+                    "id": uuid.uuid4(),
+                    "center_latitude": Decimal(
+                        str(float(summaries.center_latitude[cluster]))
+                    ).quantize(Decimal("0.0000001")),
+                    "center_longitude": Decimal(
+                        str(float(summaries.center_longitude[cluster]))
+                    ).quantize(Decimal("0.0000001")),
+                    "radius_meters": int(summaries.radius_meters[cluster]),
+                    "total_accidents": int(summaries.counts[cluster]),
+                    "a1_count": a1_count,
+                    "a2_count": a2_count,
+                    "a3_count": a3_count,
+                    "earliest_accident_at": occurred_times[summaries.earliest_index[cluster]],
+                    "latest_accident_at": occurred_times[summaries.latest_index[cluster]],
+                    "analysis_date": analysis_date,
+                    "analysis_period_days": analysis_period_days,
+                    "analysis_period_start": analysis_period_start,
+                    "analysis_period_end": analysis_period_end,
+                    "accident_ids": json.dumps(
+                        [str(accident_ids[index]) for index in summaries.members(cluster)]
+                    ),
+                }
+            )
+        return hotspots
+
+    def calculate_hotspot_stats(
+        self,
+        accident_ids: List[str],
+        source_types: Optional[Sequence] = None,
+        occurred_at: Optional[Sequence[datetime]] = None,
+    ) -> Dict:
         """
         計算熱點統計資訊
 
+        同時傳入 source_types 與 occurred_at（與 accident_ids 逐筆對應）時直接以記憶體中的資料計算，
+        不查詢資料庫；只傳入 accident_ids 時才從資料庫讀取。
+
         Args:
             accident_ids: 事故ID列表
+            source_types: 各事故的 source_type（SourceType 或 "A1"/"A2"/"A3"）
+            occurred_at: 各事故的發生時間
 
         Returns:
             統計資訊
         """
-        accidents = self.db.query(Accident).filter(Accident.id.in_(accident_ids)).all()
+        if source_types is None or occurred_at is None:
+            accidents = (
+                self.db.query(Accident.source_type, Accident.occurred_at)
+                .filter(Accident.id.in_(accident_ids))
+                .all()
+            )
+            source_types = [acc.source_type for acc in accidents]
+            occurred_at = [acc.occurred_at for acc in accidents]
+        elif not len(source_types) == len(occurred_at) == len(accident_ids):
+            raise ValueError("accident_ids、source_types 與 occurred_at 長度必須相同")
 
         # 從 source_type 推斷事故嚴重程度（A1/A2/A3）
-        a1_count = sum(1 for acc in accidents if acc.source_type == SourceType.A1)
-        a2_count = sum(1 for acc in accidents if acc.source_type == SourceType.A2)
-        a3_count = sum(1 for acc in accidents if acc.source_type == SourceType.A3)
-
-        occurred_times = [acc.occurred_at for acc in accidents]
-        earliest = min(occurred_times)
-        latest = max(occurred_times)
+        a1_count, a2_count, a3_count = np.bincount(
+            encode_severities(source_types), minlength=len(SEVERITY_LEVELS)
+        ).tolist()
 
         return {
-            "total_accidents": len(accidents),
+            "total_accidents": len(source_types),
             "a1_count": a1_count,
             "a2_count": a2_count,
             "a3_count": a3_count,
-            "earliest_accident_at": earliest,
-            "latest_accident_at": latest,
+            "earliest_accident_at": min(occurred_at),
+            "latest_accident_at": max(occurred_at),
         }
 
     def calculate_hotspot_center(self, coordinates: List[tuple[float, float]]) -> tuple[float, float]:
@@ -174,9 +771,8 @@ class HotspotAnalysisService:
             raise ValueError("座標列表不能為空")
 
         # 簡單的平均值（對於小範圍區域足夠準確）
-        lats = [coord[0] for coord in coordinates]
-        lngs = [coord[1] for coord in coordinates]
-        return (sum(lats) / len(lats), sum(lngs) / len(lngs))
+        center_lat, center_lng = np.asarray(coordinates, dtype=np.float64).mean(axis=0)
+        return (float(center_lat), float(center_lng))
 
     def calculate_hotspot_radius(
         self, coordinates: List[tuple[float, float]], center: tuple[float, float]
@@ -194,13 +790,7 @@ class HotspotAnalysisService:
         if not coordinates:
             return 100  # 預設半徑
 
-        # 計算所有點到中心的距離，取最大值
-        max_distance = 0
-        for coord in coordinates:
-            distance = geodesic(center, coord).meters
-            max_distance = max(max_distance, distance)
-
-        # 加上緩衝區（20%）
-        radius = int(max_distance * 1.2)
-        # 限制在半徑範圍內（50-2000公尺）
-        return max(50, min(2000, radius))
+        # 所有點到中心的最大距離（向量化，誤差見 hotspot_engine.EQUIRECTANGULAR_TOLERANCE），
+        # 加上 20% 緩衝並限制在 50-2000 公尺
+        points = np.asarray(coordinates, dtype=np.float64)
+        return hotspot_radius(points[:, 0], points[:, 1], center[0], center[1])
@@ -0,0 +1,496 @@
+"""
+Hotspot Engine：熱點聚類與統計（API 服務與 data/generate_hotspots.py 共用）
+
+所有計算都以 NumPy 陣列進行：DBSCAN 標記聚類後，依聚類標籤排序，
+以 np.bincount 與 reduceat 一次算出所有聚類的中心點、各嚴重程度事故數、
+最早/最晚事故與半徑，不再對每個聚類掃描全部事故。
+
+多期間分析（30/90/180/365 天）只讀取一次最長期間的事故：依時間由新到舊排序後，
+各期間都是陣列的前綴（window_sizes），再由 cluster_windows 分別聚類（可平行）。
+
+增量分析以邊長不小於 epsilon 的圖塊（TileGrid）劃分事故：plan_incremental 找出受異動事故影響的
+圖塊，recluster_region 只對這些圖塊（加上一圈鄰近圖塊）重新執行 DBSCAN，其餘熱點沿用上一版本。
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence
+import multiprocessing
+
+import numpy as np
+from sklearn.cluster import DBSCAN
+
+EARTH_RADIUS_METERS = 6_371_000.0
+
+# WGS84 橢球長半徑與第一偏心率平方
+WGS84_SEMI_MAJOR_AXIS = 6_378_137.0
+WGS84_ECCENTRICITY_SQUARED = 6.69437999014e-3
+
+# 與 geopy geodesic（WGS84）相比的最大相對誤差，量測範圍為臺灣緯度（21.9°–25.3°）、5 公里以內：
+# - equirectangular_meters：以中心點的 WGS84 曲率半徑做局部平面近似，約 7e-5（2 公里內約 3e-5）
+# - haversine_meters：球體近似，南北向高估、東西向低估，約 4.2e-3
+EQUIRECTANGULAR_TOLERANCE = 1e-4
+HAVERSINE_TOLERANCE = 5e-3
+
+# 嚴重程度代碼（encode_severities 的輸出為此 tuple 的索引）
+SEVERITY_LEVELS = ("A1", "A2", "A3")
+
+# 熱點半徑：最遠事故距離加上 20% 緩衝，限制在 50-2000 公尺
+RADIUS_BUFFER = 1.2
+MIN_RADIUS_METERS = 50
+MAX_RADIUS_METERS = 2000
+
+# 每度緯度（或赤道上每度經度）的公尺數下限：球面上約 111.2 公里，取 110 公里讓圖塊邊長不小於 epsilon
+TILE_METERS_PER_DEGREE = 110_000.0
+
+# 圖塊編碼：緯度索引 * 2^32 + 經度索引（加上 2^31 偏移，避免負數進位到緯度）
+_TILE_ROW = 1 << 32
+_TILE_COLUMN_OFFSET = 1 << 31
+
+
+@dataclass
+class ClusterSummaries:
+    """
+    所有聚類的統計結果（第 i 個元素對應第 i 個熱點）
+
+    Attributes:
+        labels: 每筆事故的聚類編號（已重新編號為 0..k-1，噪音與過小的聚類為 -1）
+        order: 依聚類排序的事故索引（同一聚類內依發生時間排序）
+        starts: 各聚類在 order 中的起始位置
+        counts: 各聚類事故數
+        center_latitude / center_longitude: 中心點（座標平均）
+        radius_meters: 影響半徑（公尺）
+        severity_counts: 各嚴重程度事故數，shape=(k, 3)，欄位順序同 SEVERITY_LEVELS
+        earliest_index / latest_index: 最早與最晚事故在輸入陣列中的索引
+    """
+
+    labels: np.ndarray
+    order: np.ndarray
+    starts: np.ndarray
+    counts: np.ndarray
+    center_latitude: np.ndarray
+    center_longitude: np.ndarray
+    radius_meters: np.ndarray
+    severity_counts: np.ndarray
+    earliest_index: np.ndarray
+    latest_index: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def members(self, cluster: int) -> np.ndarray:
+        """取得聚類內的事故索引（依發生時間排序）"""
+        start = self.starts[cluster]
+        return self.order[start : start + self.counts[cluster]]
+
+
+def epsilon_radians(epsilon_meters: float) -> float:
+    """將公尺換算為 haversine 距離使用的弧度"""
+    return epsilon_meters / EARTH_RADIUS_METERS
+
+
+def encode_severities(values: Iterable) -> np.ndarray:
+    """將 source_type（字串或 SourceType）轉為 SEVERITY_LEVELS 的索引"""
+    index = {level: code for code, level in enumerate(SEVERITY_LEVELS)}
+    return np.fromiter(
+        (index[getattr(value, "value", value)] for value in values), dtype=np.int8
+    )
+
+
+def haversine_meters(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    center_latitudes: np.ndarray,
+    center_longitudes: np.ndarray,
+) -> np.ndarray:
+    """逐元素計算兩組座標間的大圓距離（公尺）"""
+    lat1, lng1, lat2, lng2 = (
+        np.radians(values)
+        for values in (latitudes, longitudes, center_latitudes, center_longitudes)
+    )
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def equirectangular_meters(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    center_latitudes: np.ndarray,
+    center_longitudes: np.ndarray,
+) -> np.ndarray:
+    """
+    逐元素計算到中心點的距離（公尺），以中心點緯度的 WGS84 子午圈與卯酉圈曲率半徑
+    將經緯度差換算為局部平面座標
+
+    熱點半徑在 2 公里以內，誤差見 EQUIRECTANGULAR_TOLERANCE；比 haversine 更接近 geodesic，
+    且只需要一次 sin/cos。
+    """
+    phi = np.radians(center_latitudes)
+    w = 1.0 - WGS84_ECCENTRICITY_SQUARED * np.sin(phi) ** 2
+    meridional = WGS84_SEMI_MAJOR_AXIS * (1.0 - WGS84_ECCENTRICITY_SQUARED) / w**1.5
+    prime_vertical = WGS84_SEMI_MAJOR_AXIS / np.sqrt(w)
+    north = np.radians(np.subtract(latitudes, center_latitudes)) * meridional
+    east = np.radians(np.subtract(longitudes, center_longitudes)) * prime_vertical * np.cos(phi)
+    return np.hypot(east, north)
+
+
+def clamp_radius(max_distance_meters: np.ndarray) -> np.ndarray:
+    """加上緩衝並限制半徑範圍"""
+    radius = (np.asarray(max_distance_meters) * RADIUS_BUFFER).astype(np.int64)
+    return np.clip(radius, MIN_RADIUS_METERS, MAX_RADIUS_METERS)
+
+
+def hotspot_radius(
+    latitudes: np.ndarray, longitudes: np.ndarray, center_latitude: float, center_longitude: float
+) -> int:
+    """單一熱點的影響半徑：最遠事故距離加上緩衝後限制範圍（公尺）"""
+    distances = equirectangular_meters(latitudes, longitudes, center_latitude, center_longitude)
+    return int(clamp_radius(distances.max()))
+
+
+def cluster_coordinates(
+    latitudes: np.ndarray, longitudes: np.ndarray, epsilon_meters: float, min_samples: int
+) -> np.ndarray:
+    """
+    DBSCAN 聚類（haversine 距離）
+
+    Returns:
+        每筆事故的聚類標籤（噪音為 -1）
+    """
+    coordinates = np.radians(np.column_stack((latitudes, longitudes)))
+    dbscan = DBSCAN(
+        eps=epsilon_radians(epsilon_meters),
+        min_samples=min_samples,
+        metric="haversine",
+        algorithm="ball_tree",
+    )
+    return dbscan.fit_predict(coordinates)
+
+
+def window_sizes(occurred_at_desc: np.ndarray, cutoffs: Sequence[float]) -> List[int]:
+    """
+    各時間窗口的事故數（occurred_at_desc 需依發生時間由新到舊排序）
+
+    排序後每個「occurred_at >= cutoff」的窗口都是陣列的前綴 [:size]。
+    """
+    newest_first = -np.asarray(occurred_at_desc, dtype=np.float64)
+    return [int(np.searchsorted(newest_first, -cutoff, side="right")) for cutoff in cutoffs]
+
+
+# 平行處理時各 worker 行程持有的座標與參數（由 _init_window_worker 設定）
+_window_inputs: Optional[tuple] = None
+
+
+def _cluster_prefix(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    size: int,
+    epsilon_meters: float,
+    min_samples: int,
+) -> np.ndarray:
+    """對前 size 筆事故執行 DBSCAN（事故數不足 min_samples 時全部為噪音）"""
+    if size < min_samples:
+        return np.full(size, -1, dtype=np.int64)
+    return cluster_coordinates(latitudes[:size], longitudes[:size], epsilon_meters, min_samples)
+
+
+def _init_window_worker(
+    latitudes: np.ndarray, longitudes: np.ndarray, epsilon_meters: float, min_samples: int
+) -> None:
+    global _window_inputs
+    _window_inputs = (latitudes, longitudes, epsilon_meters, min_samples)
+
+
+def _cluster_window(size: int) -> np.ndarray:
+    latitudes, longitudes, epsilon_meters, min_samples = _window_inputs
+    return _cluster_prefix(latitudes, longitudes, size, epsilon_meters, min_samples)
+
+
+def cluster_windows(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    sizes: Sequence[int],
+    epsilon_meters: float,
+    min_samples: int,
+    workers: int = 1,
+) -> List[np.ndarray]:
+    """
+    對多個時間窗口（同一組事故的前綴，見 window_sizes）分別執行 DBSCAN
+
+    每個窗口的結果與單獨執行 cluster_coordinates 完全相同。workers > 1 時以 spawn 啟動的
+    worker 行程平行處理（座標只傳送一次給每個 worker），最大的窗口優先執行，
+    總耗時約等於最長期間單獨分析的時間。
+
+    Args:
+        latitudes / longitudes: 依發生時間由新到舊排序的座標
+        sizes: 各窗口的事故數
+        epsilon_meters: DBSCAN epsilon（公尺）
+        min_samples: DBSCAN min_samples
+        workers: worker 行程數（1 表示在目前行程依序執行）
+
+    Returns:
+        各窗口的聚類標籤（順序同 sizes）
+    """
+    if workers <= 1 or len(sizes) <= 1:
+        return [
+            _cluster_prefix(latitudes, longitudes, size, epsilon_meters, min_samples)
+            for size in sizes
+        ]
+
+    largest_first = sorted(range(len(sizes)), key=lambda index: sizes[index], reverse=True)
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(sizes)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_window_worker,
+        initargs=(latitudes, longitudes, epsilon_meters, min_samples),
+    ) as pool:
+        results = list(pool.map(_cluster_window, [sizes[index] for index in largest_first]))
+    labels: List[Optional[np.ndarray]] = [None] * len(sizes)
+    for index, result in zip(largest_first, results):
+        labels[index] = result
+    return labels
+
+
+@dataclass
+class TileGrid:
+    """
+    邊長不小於 epsilon 的經緯度圖塊
+
+    相距不超過 epsilon 的兩筆事故一定落在同一個或相鄰（含對角）的圖塊，
+    因此一筆事故的 DBSCAN 鄰居只需要在周圍 3x3 個圖塊內尋找。
+    """
+
+    latitude_step: float
+    longitude_step: float
+
+    @classmethod
+    def for_latitudes(cls, epsilon_meters: float, latitudes: np.ndarray) -> "TileGrid":
+        """依資料的最高緯度決定經度方向的圖塊寬度（高緯度每度經度較短）"""
+        max_latitude = float(np.max(np.abs(latitudes))) if len(latitudes) else 0.0
+        latitude_step = epsilon_meters / TILE_METERS_PER_DEGREE
+        longitude_step = latitude_step / np.cos(np.radians(min(max_latitude + 1.0, 89.0)))
+        return cls(latitude_step=latitude_step, longitude_step=float(longitude_step))
+
+    def keys(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        """各座標所在的圖塊編碼"""
+        rows = np.floor(np.asarray(latitudes, dtype=np.float64) / self.latitude_step)
+        columns = np.floor(np.asarray(longitudes, dtype=np.float64) / self.longitude_step)
+        return rows.astype(np.int64) * _TILE_ROW + columns.astype(np.int64) + _TILE_COLUMN_OFFSET
+
+
+def neighbor_tiles(keys: np.ndarray) -> np.ndarray:
+    """圖塊及其周圍 8 個圖塊（去除重複、已排序）"""
+    offsets = np.array(
+        [row * _TILE_ROW + column for row in (-1, 0, 1) for column in (-1, 0, 1)], dtype=np.int64
+    )
+    return np.unique((np.asarray(keys, dtype=np.int64)[:, None] + offsets).ravel())
+
+
+@dataclass
+class IncrementalRegion:
+    """
+    增量分析需要重新聚類的範圍
+
+    Attributes:
+        inner: 受影響圖塊內的事故（bool，對應輸入陣列）；新聚類至少要有一筆事故在此範圍
+        points: 重新聚類的事故（inner 加上周圍一圈圖塊，讓 inner 內事故的鄰居完整）
+        affected_hotspots: 需要以新結果取代的上一版本熱點（bool，對應熱點索引）
+    """
+
+    inner: np.ndarray
+    points: np.ndarray
+    affected_hotspots: np.ndarray
+
+
+def plan_incremental(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    changed_latitudes: np.ndarray,
+    changed_longitudes: np.ndarray,
+    member_points: np.ndarray,
+    member_hotspots: np.ndarray,
+    stale_hotspots: np.ndarray,
+    epsilon_meters: float,
+) -> IncrementalRegion:
+    """
+    找出異動事故影響的範圍
+
+    1. 異動事故（新增、修改、移出分析期間）所在圖塊及周圍一圈：這些事故的鄰居數可能改變
+    2. 與範圍（含周圍一圈）有事故重疊的上一版本熱點可能合併、分裂或消失，
+       將其所有事故的圖塊併入範圍，重複直到沒有新的熱點受影響
+    範圍外的熱點，其事故與鄰居都沒有改變，DBSCAN 的結果與上一版本相同。
+
+    Args:
+        latitudes / longitudes: 目前分析期間內的事故座標
+        changed_latitudes / changed_longitudes: 異動事故的座標（含已移出分析期間的事故）
+        member_points: 上一版本熱點的事故在 latitudes 中的索引
+        member_hotspots: member_points 各自所屬的熱點索引
+        stale_hotspots: 有事故已不在分析期間內（或已刪除）的熱點（bool，對應熱點索引）
+        epsilon_meters: DBSCAN epsilon（公尺）
+
+    Returns:
+        IncrementalRegion
+    """
+    member_points = np.asarray(member_points, dtype=np.int64)
+    member_hotspots = np.asarray(member_hotspots, dtype=np.int64)
+    affected = np.asarray(stale_hotspots, dtype=bool).copy()
+
+    grid = TileGrid.for_latitudes(
+        epsilon_meters, np.concatenate([np.asarray(latitudes), np.asarray(changed_latitudes)])
+    )
+    point_tiles = grid.keys(latitudes, longitudes)
+    member_tiles = point_tiles[member_points]
+
+    dirty = np.concatenate(
+        [grid.keys(changed_latitudes, changed_longitudes), member_tiles[affected[member_hotspots]]]
+    )
+    region = neighbor_tiles(dirty)
+    while True:
+        touched = np.isin(member_tiles, neighbor_tiles(region)) & ~affected[member_hotspots]
+        if not touched.any():
+            break
+        affected[member_hotspots[touched]] = True
+        region = np.union1d(region, member_tiles[affected[member_hotspots]])
+
+    return IncrementalRegion(
+        inner=np.isin(point_tiles, region),
+        points=np.isin(point_tiles, neighbor_tiles(region)),
+        affected_hotspots=affected,
+    )
+
+
+def recluster_region(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    region: IncrementalRegion,
+    epsilon_meters: float,
+    min_samples: int,
+) -> np.ndarray:
+    """
+    只對 region.points 執行 DBSCAN
+
+    周圍一圈的事故鄰居不完整，只作為 inner 內聚類的邊界點；完全落在周圍一圈的聚類
+    不在受影響範圍內，予以捨棄。
+
+    Returns:
+        每筆事故的聚類標籤（範圍外與噪音為 -1）
+    """
+    labels = np.full(len(latitudes), -1, dtype=np.int64)
+    indices = np.flatnonzero(region.points)
+    if len(indices) < min_samples:
+        return labels
+
+    region_labels = cluster_coordinates(
+        latitudes[indices], longitudes[indices], epsilon_meters, min_samples
+    )
+    clustered = region_labels >= 0
+    if not clustered.any():
+        return labels
+    inside = np.zeros(int(region_labels.max()) + 1, dtype=bool)
+    inside[region_labels[clustered & region.inner[indices]]] = True
+    keep = clustered & inside[np.maximum(region_labels, 0)]
+    labels[indices[keep]] = region_labels[keep]
+    return labels
+
+
+def summarize_clusters(
+    labels: np.ndarray,
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    severities: np.ndarray,
+    occurred_at: np.ndarray,
+    min_size: int = 1,
+) -> ClusterSummaries:
+    """
+    以分組運算計算所有聚類的統計
+
+    Args:
+        labels: 聚類標籤（-1 為噪音）
+        latitudes / longitudes: 座標
+        severities: encode_severities 的結果
+        occurred_at: 發生時間（可比較的數值，例如 epoch 秒）
+        min_size: 事故數少於此值的聚類視為噪音
+
+    Returns:
+        ClusterSummaries
+    """
+    labels = np.asarray(labels)
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    severities = np.asarray(severities, dtype=np.int64)
+    occurred_at = np.asarray(occurred_at, dtype=np.float64)
+
+    # 過濾過小的聚類後重新編號為 0..k-1（保持原本的標籤順序）
+    clustered = labels >= 0
+    raw_counts = np.bincount(labels[clustered]) if clustered.any() else np.zeros(0, np.int64)
+    kept = raw_counts >= min_size
+    # remap 多一個結尾元素，讓標籤 -1 對應到 -1
+    remap = np.full(len(raw_counts) + 1, -1, dtype=np.int64)
+    remap[:-1][kept] = np.arange(int(kept.sum()))
+    dense = remap[labels]
+    cluster_count = int(kept.sum())
+
+    members = np.flatnonzero(dense >= 0)
+    # 依聚類、再依發生時間排序：每組第一筆為最早、最後一筆為最晚
+    order = members[np.lexsort((occurred_at[members], dense[members]))]
+    counts = np.bincount(dense[members], minlength=cluster_count)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+
+    center_latitude = np.bincount(
+        dense[members], weights=latitudes[members], minlength=cluster_count
+    )
+    center_longitude = np.bincount(
+        dense[members], weights=longitudes[members], minlength=cluster_count
+    )
+    if cluster_count:
+        center_latitude /= counts
+        center_longitude /= counts
+
+    severity_counts = np.bincount(
+        dense[members] * len(SEVERITY_LEVELS) + severities[members],
+        minlength=cluster_count * len(SEVERITY_LEVELS),
+    ).reshape(cluster_count, len(SEVERITY_LEVELS))
+
+    if cluster_count:
+        sorted_labels = dense[order]
+        distances = equirectangular_meters(
+            latitudes[order],
+            longitudes[order],
+            center_latitude[sorted_labels],
+            center_longitude[sorted_labels],
+        )
+        radius = clamp_radius(np.maximum.reduceat(distances, starts))
+        earliest_index = order[starts]
+        latest_index = order[starts + counts - 1]
+    else:
+        radius = np.zeros(0, dtype=np.int64)
+        earliest_index = latest_index = np.zeros(0, dtype=np.int64)
+
+    return ClusterSummaries(
+        labels=dense,
+        order=order,
+        starts=starts,
+        counts=counts,
+        center_latitude=center_latitude,
+        center_longitude=center_longitude,
+        radius_meters=radius,
+        severity_counts=severity_counts,
+        earliest_index=earliest_index,
+        latest_index=latest_index,
+    )
+
+
+def find_hotspots(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    severities: np.ndarray,
+    occurred_at: np.ndarray,
+    epsilon_meters: float,
+    min_samples: int,
+) -> ClusterSummaries:
+    """DBSCAN 聚類並計算統計（少於 min_samples 的聚類不列為熱點）"""
+    labels = cluster_coordinates(latitudes, longitudes, epsilon_meters, min_samples)
+    return summarize_clusters(labels, latitudes, longitudes, severities, occurred_at, min_samples)
+
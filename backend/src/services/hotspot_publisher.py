@@ -0,0 +1,201 @@
+"""
+Hotspot Publisher：以 COPY 批次寫入熱點並原子發佈新的分析版本（API 服務與 data/generate_hotspots.py 共用）
+
+寫入流程（全部在呼叫端的同一個交易內，由呼叫端 commit）：
+1. COPY 新版本的熱點到暫存表 hotspots_staging（交易結束時自動刪除）
+2. INSERT ... SELECT 從暫存表搬到 hotspots（geom 於此時計算）
+3. 更新 hotspot_publications 中該分析期間的指標，指向新版本
+4. （選擇性）刪除同一分析期間的舊版本
+
+查詢端只讀取指標指向的版本，交易提交前看到的是舊版本、提交後一次切換到新版本，
+不會讀到寫到一半或被清空的 hotspots。
+
+增量分析先以 carry_over_hotspots 將上一版本中未受影響的熱點（沿用 id）移到新版本，
+再以 publish_hotspots 寫入重新聚類的熱點並切換指標。
+"""
+from datetime import date, datetime
+import csv
+import io
+import json
+import uuid
+from typing import Dict, Iterable, Sequence, Tuple, Union
+
+# COPY 到暫存表的欄位（geom、created_at、updated_at 在搬移到 hotspots 時產生）
+HOTSPOT_COPY_COLUMNS = (
+    "id",
+    "center_latitude",
+    "center_longitude",
+    "radius_meters",
+    "total_accidents",
+    "a1_count",
+    "a2_count",
+    "a3_count",
+    "earliest_accident_at",
+    "latest_accident_at",
+    "analysis_date",
+    "analysis_period_days",
+    "analysis_period_start",
+    "analysis_period_end",
+    "accident_ids",
+    "analysis_run_id",
+)
+
+STAGING_TABLE = "hotspots_staging"
+
+
+def _csv_value(value) -> str:
+    """將欄位值轉為 COPY CSV 的文字"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return json.dumps([str(item) for item in value])
+    return str(value)
+
+
+def hotspots_csv(hotspots: Iterable[Dict], analysis_run_id: Union[str, uuid.UUID]) -> str:
+    """
+    產生 COPY 用的熱點 CSV
+
+    Args:
+        hotspots: 熱點記錄（鍵為 HOTSPOT_COPY_COLUMNS 中除 analysis_run_id 以外的欄位；
+            accident_ids 可為 JSON 字串或 ID 列表）
+        analysis_run_id: 所屬分析版本
+
+    Returns:
+        CSV 文字
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    run_id = str(analysis_run_id)
+    for hotspot in hotspots:
+        writer.writerow(
+            [_csv_value(hotspot[column]) for column in HOTSPOT_COPY_COLUMNS[:-1]] + [run_id]
+        )
+    return buffer.getvalue()
+
+
+def publish_hotspots(
+    connection,
+    hotspots: Sequence[Dict],
+    analysis_run_id: Union[str, uuid.UUID],
+    analysis_period_days: int,
+    analysis_date: date,
+    replace_existing: bool = False,
+    carried_over: int = 0,
+) -> int:
+    """
+    寫入新版本的熱點並將該分析期間的發佈指標指向此版本（不 commit）
+
+    Args:
+        connection: psycopg2 連線（或 SQLAlchemy 的 DBAPI 連線代理）
+        hotspots: 熱點記錄（格式見 hotspots_csv）
+        analysis_run_id: 分析版本（對應 analysis_runs.id）
+        analysis_period_days: 分析期間天數
+        analysis_date: 分析日期
+        replace_existing: 發佈後刪除同一分析期間的其他版本
+        carried_over: 由 carry_over_hotspots 移入此版本的熱點數（計入 hotspot_count）
+
+    Returns:
+        刪除的舊熱點數（replace_existing 為 False 時為 0）
+    """
+    columns = ", ".join(HOTSPOT_COPY_COLUMNS)
+    run_id = str(analysis_run_id)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS pg_temp.{STAGING_TABLE}")
+        cursor.execute(
+            f"CREATE TEMP TABLE {STAGING_TABLE} ON COMMIT DROP AS "
+            f"SELECT {columns} FROM hotspots WITH NO DATA"
+        )
+        cursor.copy_expert(
+            f"COPY {STAGING_TABLE} ({columns}) FROM STDIN WITH (FORMAT csv)",
+            io.StringIO(hotspots_csv(hotspots, run_id)),
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO hotspots ({columns}, geom, created_at, updated_at)
+            SELECT {columns},
+                   ST_SetSRID(ST_MakePoint(center_longitude, center_latitude), 4326)::geography,
+                   now(), now()
+            FROM {STAGING_TABLE}
+            """
+        )
+        cursor.execute(
+            """
+            INSERT INTO hotspot_publications (
+                analysis_period_days, analysis_run_id, analysis_date, hotspot_count, published_at
+            ) VALUES (%s, %s, %s, %s, now())
+            ON CONFLICT (analysis_period_days) DO UPDATE SET
+                analysis_run_id = EXCLUDED.analysis_run_id,
+                analysis_date = EXCLUDED.analysis_date,
+                hotspot_count = EXCLUDED.hotspot_count,
+                published_at = EXCLUDED.published_at
+            """,
+            (analysis_period_days, run_id, analysis_date, len(hotspots) + carried_over),
+        )
+
+        deleted = 0
+        if replace_existing:
+            cursor.execute(
+                """
+                DELETE FROM hotspots
+                WHERE analysis_period_days = %s
+                  AND analysis_run_id IS DISTINCT FROM %s
+                """,
+                (analysis_period_days, run_id),
+            )
+            deleted = cursor.rowcount
+    return deleted
+
+
+def carry_over_hotspots(
+    connection,
+    previous_run_id: Union[str, uuid.UUID],
+    hotspot_ids: Sequence[Union[str, uuid.UUID]],
+    analysis_run_id: Union[str, uuid.UUID],
+    analysis_date: date,
+    analysis_period_start: date,
+    analysis_period_end: date,
+) -> Tuple[int, int]:
+    """
+    將上一版本中未受影響的熱點移到新版本，並刪除上一版本其餘的熱點（不 commit）
+
+    移動的熱點沿用 id 與統計，只更新分析版本與分析期間。上一版本只剩部分熱點，
+    不再是完整的分析結果，因此一併刪除。
+
+    Args:
+        connection: psycopg2 連線（或 SQLAlchemy 的 DBAPI 連線代理）
+        previous_run_id: 上一版本（目前發佈的 analysis_runs.id）
+        hotspot_ids: 沿用的熱點 id
+        analysis_run_id: 新版本
+        analysis_date: 分析日期
+        analysis_period_start / analysis_period_end: 新版本的分析期間
+
+    Returns:
+        (移動的熱點數, 刪除的熱點數)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            UPDATE hotspots SET
+                analysis_run_id = %s,
+                analysis_date = %s,
+                analysis_period_start = %s,
+                analysis_period_end = %s,
+                updated_at = now()
+            WHERE analysis_run_id = %s AND id = ANY(%s::uuid[])
+            """,
+            (
+                str(analysis_run_id),
+                analysis_date,
+                analysis_period_start,
+                analysis_period_end,
+                str(previous_run_id),
+                [str(hotspot_id) for hotspot_id in hotspot_ids],
+            ),
+        )
+        moved = cursor.rowcount
+        cursor.execute(
+            "DELETE FROM hotspots WHERE analysis_run_id = %s", (str(previous_run_id),)
+        )
+        deleted = cursor.rowcount
+    return moved, deleted
@@ -1,20 +1,23 @@
 """Hotspot Service：熱點查詢服務"""
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, text
+from sqlalchemy import ColumnElement, func, and_, or_, text
 from geoalchemy2 import Geography
 from geoalchemy2.functions import (
     ST_DWithin,
-    ST_Distance,
     ST_SetSRID,
     ST_MakePoint,
     ST_MakeEnvelope,
 )
-from typing import List, Optional
+from typing import Hashable, List, Optional, Tuple
 from datetime import datetime, timedelta
 from decimal import Decimal
 
 from src.models.hotspot import Hotspot
+from src.models.hotspot_publication import HotspotPublication
+from src.core import geohash
+from src.core.cache import hotspot_version_cache, nearby_cache
+from src.core.request_context import PHASE_CACHE, PHASE_MERGE, PHASE_ORM_HYDRATE, timed_phase
 from src.core.errors import BadRequestError
 
 
@@ -43,6 +46,10 @@ class HotspotService:
 
         Returns:
             熱點列表（已按距離排序）
+
+        Note:
+            候選熱點以 geohash 網格（精度依查詢半徑調整）與篩選條件為鍵快取，
+            同一網格內的用戶只需一次資料庫查詢，精確距離篩選與排序在記憶體中完成。
         """
         # 驗證經緯度範圍
         if not (21.5 <= latitude <= 25.5):
@@ -50,15 +57,63 @@ class HotspotService:
         if not (119.5 <= longitude <= 122.5):
             raise BadRequestError("經度必須介於 119.5 到 122.5 之間")
 
-        # 建立用戶位置點（使用 PostGIS 函式）
-        user_point = ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)
+        # 只查詢目前發佈的分析版本
+        version_filter, version = _current_version(db)
+
+        # 以 geohash 網格量化用戶位置：同一網格內的用戶共用一份候選熱點
+        cell = geohash.encode(latitude, longitude, geohash.precision_for_distance(distance))
+        cache_key = (cell, distance, time_range, severity_levels, version)
+        with timed_phase(PHASE_CACHE):
+            candidates = nearby_cache.get(cache_key)
+        if candidates is None:
+            with timed_phase(PHASE_ORM_HYDRATE, exclude_db_time=True):
+                candidates = HotspotService._query_nearby_cell(
+                    db, cell, distance, time_range, severity_levels, version_filter
+                )
+            nearby_cache.set(cache_key, candidates)
+
+        # 在記憶體中套用用戶的精確距離篩選並排序
+        nearby = []
+        for hotspot, center_lat, center_lng in candidates:
+            distance_meters = geohash.haversine_meters(latitude, longitude, center_lat, center_lng)
+            if distance_meters <= distance:
+                nearby.append((distance_meters, hotspot))
+        nearby.sort(key=lambda item: item[0])
+        hotspots = [hotspot for _, hotspot in nearby]
+
+        # 合併重疊的熱點
+        with timed_phase(PHASE_MERGE):
+            merged_hotspots = HotspotService.merge_overlapping_hotspots(db, hotspots)
+
+        return merged_hotspots
+
+    @staticmethod
+    def _query_nearby_cell(
+        db: Session,
+        cell: str,
+        distance: int,
+        time_range: Optional[str],
+        severity_levels: Optional[str],
+        version_filter: Optional[ColumnElement] = None,
+    ) -> List[Tuple[Hotspot, float, float]]:
+        """
+        查詢 geohash 網格向外擴張查詢半徑後涵蓋的熱點
+
+        網格內任一點到網格中心的距離不超過半對角線，因此以
+        「查詢半徑 + 半對角線」查詢可涵蓋網格內所有用戶的結果。
+
+        Returns:
+            (熱點, 中心緯度, 中心經度) 列表（熱點已脫離 session，可跨請求共用）
+        """
+        center_lat, center_lng = geohash.decode_center(cell)
+        search_radius = distance + geohash.cell_half_diagonal_meters(cell)
+        cell_point = ST_SetSRID(ST_MakePoint(center_lng, center_lat), 4326)
 
-        # 建立查詢
         query = db.query(Hotspot).filter(
             ST_DWithin(
                 Hotspot.geom,
-                user_point.cast(Geography),
-                distance,
+                cell_point.cast(Geography),
+                search_radius,
             )
         )
 
@@ -80,26 +135,17 @@ class HotspotService:
             if conditions:
                 query = query.filter(or_(*conditions))
 
-        # 只查詢最新的分析結果
-        latest_analysis_date = db.query(func.max(Hotspot.analysis_date)).scalar()
-        if latest_analysis_date:
-            query = query.filter(Hotspot.analysis_date == latest_analysis_date)
-
-        # 計算距離並排序
-        query = query.add_columns(
-            ST_Distance(
-                Hotspot.geom,
-                user_point.cast(Geography),
-            ).label("distance_meters")
-        ).order_by("distance_meters")
-
-        results = query.all()
-        hotspots = [row[0] for row in results]  # 只回傳 Hotspot 物件
-
-        # 合併重疊的熱點
-        merged_hotspots = HotspotService.merge_overlapping_hotspots(db, hotspots)
+        if version_filter is not None:
+            query = query.filter(version_filter)
 
-        return merged_hotspots
+        hotspots = query.all()
+        candidates = []
+        for hotspot in hotspots:
+            db.expunge(hotspot)
+            candidates.append(
+                (hotspot, float(hotspot.center_latitude), float(hotspot.center_longitude))
+            )
+        return candidates
 
     @staticmethod
     def get_all(
@@ -177,10 +223,10 @@ class HotspotService:
             if conditions:
                 query = query.filter(or_(*conditions))
 
-        # 只查詢最新的分析結果
-        latest_analysis_date = db.query(func.max(Hotspot.analysis_date)).scalar()
-        if latest_analysis_date:
-            query = query.filter(Hotspot.analysis_date == latest_analysis_date)
+        # 只查詢目前發佈的分析版本
+        version_filter, _ = _current_version(db)
+        if version_filter is not None:
+            query = query.filter(version_filter)
 
         # 按事故數排序
         query = query.order_by(Hotspot.total_accidents.desc()).limit(limit)
@@ -211,14 +257,10 @@ class HotspotService:
         # 篩選指定分析期間
         query = query.filter(Hotspot.analysis_period_days == period_days)
 
-        # 只查詢最新的分析結果
-        latest_analysis_date = (
-            db.query(func.max(Hotspot.analysis_date))
-            .filter(Hotspot.analysis_period_days == period_days)
-            .scalar()
-        )
-        if latest_analysis_date:
-            query = query.filter(Hotspot.analysis_date == latest_analysis_date)
+        # 只查詢目前發佈的分析版本
+        version_filter, _ = _current_version(db, period_days)
+        if version_filter is not None:
+            query = query.filter(version_filter)
 
         # 嚴重程度篩選
         if severity_levels:
@@ -428,6 +470,66 @@ def _merge_hotspot_cluster(cluster: List[Hotspot]) -> Hotspot:
     return merged
 
 
+def _current_version(
+    db: Session, period_days: Optional[int] = None
+) -> Tuple[Optional[ColumnElement], Hashable]:
+    """
+    取得目前發佈的分析版本
+
+    版本資訊快取於 hotspot_version_cache（TTL 數秒），附近熱點快取命中時不會產生任何查詢。
+
+    Args:
+        db: 資料庫連線
+        period_days: 只取指定分析期間的版本（None 表示所有分析期間）
+
+    Returns:
+        (熱點篩選條件（無資料時為 None）, 版本識別（作為快取鍵的一部分）)
+    """
+    cached = hotspot_version_cache.get(period_days)
+    if cached is None:
+        cached = _load_current_version(db, period_days)
+        hotspot_version_cache.set(period_days, cached)
+
+    kind, version = cached
+    if kind == "run":
+        return Hotspot.analysis_run_id.in_(version), version
+    if kind == "date":
+        return Hotspot.analysis_date == version, version
+    return None, None
+
+
+def _load_current_version(
+    db: Session, period_days: Optional[int] = None
+) -> Tuple[Optional[str], Hashable]:
+    """
+    從資料庫查詢目前發佈的分析版本
+
+    以 hotspot_publications 的指標為準（新版本完整寫入後才切換，不會讀到寫到一半的結果）；
+    尚未有任何發佈紀錄時（例如 003 migration 之前產生的熱點），沿用最新 analysis_date。
+
+    Returns:
+        (版本種類 "run" / "date"（無資料時為 None）, 版本識別)
+    """
+    publications = db.query(HotspotPublication.analysis_run_id)
+    if period_days is not None:
+        publications = publications.filter(
+            HotspotPublication.analysis_period_days == period_days
+        )
+    run_ids = sorted(run_id for (run_id,) in publications.all())
+    if run_ids:
+        return "run", tuple(run_ids)
+
+    latest_analysis_date = db.query(func.max(Hotspot.analysis_date))
+    if period_days is not None:
+        latest_analysis_date = latest_analysis_date.filter(
+            Hotspot.analysis_period_days == period_days
+        )
+    latest_analysis_date = latest_analysis_date.scalar()
+    if latest_analysis_date:
+        return "date", latest_analysis_date
+    return None, None
+
+
 def _parse_time_range(time_range: str) -> datetime:
     """解析時間範圍字串"""
     from datetime import timezone
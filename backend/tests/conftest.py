@@ -31,6 +31,10 @@ if _is_pytest_running:
     if "DATABASE_URL" not in os.environ or "test" in os.environ.get("DATABASE_URL", "").lower():
         os.environ["DATABASE_URL"] = TEST_DATABASE_URL
     
+    # 所有 TestClient 請求都來自同一個客戶端，放寬突發上限避免測試間互相觸發速率限制
+    os.environ.setdefault("RATE_LIMIT_BURST_SIZE", "10000")
+    os.environ.setdefault("RATE_LIMIT_EXPENSIVE_BURST_SIZE", "10000")
+
     # 驗證測試資料庫 URL（避免意外使用正式資料庫）
     if "road_safety_db_test" not in TEST_DATABASE_URL and "test" not in TEST_DATABASE_URL.lower():
         import warnings
@@ -47,3 +51,12 @@ if _is_pytest_running:
         from src.core.config import get_settings
         get_settings.cache_clear()
 
+
+
+@pytest.fixture(autouse=True)
+def _clear_response_caches():
+    """每個測試前清除記憶體快取，避免跨測試共用查詢結果"""
+    from src.core.cache import clear_cache
+
+    clear_cache()
+    yield
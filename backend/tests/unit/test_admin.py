@@ -151,9 +151,9 @@ async def test_trigger_hotspot_analysis_success():
     mock_service = Mock()
     mock_service.analyze = Mock(return_value=42)  # 回傳 42 個熱點
 
-    with patch("src.api.admin.HotspotAnalysisService", return_value=mock_service):
+    with patch("src.services.hotspot_analysis.HotspotAnalysisService", return_value=mock_service):
         request = HotspotAnalysisRequest(
-            analysis_period_days=180, epsilon_meters=300, min_samples=3
+            analysis_period_days=180, epsilon_meters=300, min_samples=3, incremental=True
         )
         result = await trigger_hotspot_analysis(request, mock_db)
 
@@ -163,7 +163,7 @@ async def test_trigger_hotspot_analysis_success():
 
     # 驗證 service 被正確呼叫
     mock_service.analyze.assert_called_once_with(
-        analysis_period_days=180, epsilon_meters=300, min_samples=3
+        analysis_period_days=180, epsilon_meters=300, min_samples=3, incremental=True
     )
 
 
@@ -176,13 +176,13 @@ async def test_trigger_hotspot_analysis_with_defaults():
     mock_service = Mock()
     mock_service.analyze = Mock(return_value=10)
 
-    with patch("src.api.admin.HotspotAnalysisService", return_value=mock_service):
+    with patch("src.services.hotspot_analysis.HotspotAnalysisService", return_value=mock_service):
         result = await trigger_hotspot_analysis(None, mock_db)
 
     assert "job_id" in result
     assert result["hotspot_count"] == 10
     mock_service.analyze.assert_called_once_with(
-        analysis_period_days=365, epsilon_meters=500, min_samples=5
+        analysis_period_days=365, epsilon_meters=500, min_samples=5, incremental=False
     )
 
 
@@ -195,7 +195,7 @@ async def test_trigger_hotspot_analysis_failure():
     mock_service = Mock()
     mock_service.analyze = Mock(side_effect=Exception("分析失敗"))
 
-    with patch("src.api.admin.HotspotAnalysisService", return_value=mock_service):
+    with patch("src.services.hotspot_analysis.HotspotAnalysisService", return_value=mock_service):
         request = HotspotAnalysisRequest()
 
         with pytest.raises(HTTPException) as exc_info:
@@ -203,3 +203,49 @@ async def test_trigger_hotspot_analysis_failure():
 
         assert exc_info.value.status_code == 500
         assert "熱點分析失敗" in exc_info.value.detail
+
+
+@pytest.mark.parametrize("periods", [[], [0, 30], [-30], [30, "abc"]])
+def test_hotspot_analysis_request_rejects_invalid_periods(periods):
+    """測試 analysis_periods 必須為非空的正整數列表"""
+    from pydantic import ValidationError
+    from src.api.admin import HotspotAnalysisRequest
+
+    with pytest.raises(ValidationError):
+        HotspotAnalysisRequest(analysis_periods=periods)
+
+
+@pytest.mark.asyncio
+async def test_trigger_hotspot_analysis_dedupes_periods():
+    """測試重複的分析期間在分派前移除"""
+    from src.api.admin import trigger_hotspot_analysis, HotspotAnalysisRequest
+
+    mock_service = Mock()
+    mock_service.analyze_periods = Mock(return_value={30: 2, 365: 5})
+
+    with patch("src.services.hotspot_analysis.HotspotAnalysisService", return_value=mock_service):
+        request = HotspotAnalysisRequest(analysis_periods=[365, 30, 365, 30])
+        result = await trigger_hotspot_analysis(request, Mock())
+
+    assert result["hotspot_count"] == 7
+    assert mock_service.analyze_periods.call_args.kwargs["analysis_periods"] == [365, 30]
+
+
+def test_analyze_hotspots_rejects_incremental_with_periods():
+    """測試同時指定 analysis_periods 與 incremental 時回傳 422，而非默默忽略 incremental"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.api import admin
+    from src.db.session import get_db
+
+    app = FastAPI()
+    app.include_router(admin.router)
+    app.dependency_overrides[require_admin] = lambda: {"role": "admin"}
+    app.dependency_overrides[get_db] = lambda: Mock()
+
+    response = TestClient(app).post(
+        "/analyze-hotspots", json={"analysis_periods": [30, 365], "incremental": True}
+    )
+
+    assert response.status_code == 422
+    assert "incremental" in response.text
@@ -0,0 +1,167 @@
+"""Unit test for geohash 網格量化與附近熱點快取"""
+import pytest
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from src.core import geohash
+from src.core.cache import LRUCache
+from src.services.hotspot_service import HotspotService
+
+
+def test_encode_known_value():
+    """測試已知座標的 geohash 編碼"""
+    assert geohash.encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+
+def test_decode_bounds_contains_point():
+    """測試解碼後的網格包含原始座標"""
+    latitude, longitude = 25.0330, 121.5654
+    cell = geohash.encode(latitude, longitude, 7)
+    min_lat, min_lng, max_lat, max_lng = geohash.decode_bounds(cell)
+
+    assert min_lat <= latitude <= max_lat
+    assert min_lng <= longitude <= max_lng
+
+
+def test_nearby_points_share_cell():
+    """測試相距數公尺的用戶落在同一網格"""
+    assert geohash.encode(25.03300, 121.56540, 6) == geohash.encode(25.03302, 121.56543, 6)
+
+
+def test_precision_for_allowed_distances():
+    """測試查詢半徑越大網格越粗"""
+    precisions = [geohash.precision_for_distance(d) for d in (100, 500, 1000, 3000)]
+
+    assert precisions == sorted(precisions, reverse=True)
+    assert geohash.precision_for_distance(200) == geohash.precision_for_distance(500)
+
+
+def test_cell_half_diagonal_covers_cell():
+    """測試網格內任一點到中心的距離不超過半對角線"""
+    cell = geohash.encode(25.0330, 121.5654, 6)
+    min_lat, min_lng, max_lat, max_lng = geohash.decode_bounds(cell)
+    center_lat, center_lng = geohash.decode_center(cell)
+    half_diagonal = geohash.cell_half_diagonal_meters(cell)
+
+    for lat, lng in [(min_lat, max_lng), (max_lat, min_lng), (min_lat, min_lng)]:
+        assert geohash.haversine_meters(center_lat, center_lng, lat, lng) <= half_diagonal + 1e-6
+
+
+def test_haversine_meters():
+    """測試大圓距離計算（緯度 0.001 度約 111 公尺）"""
+    distance = geohash.haversine_meters(25.0, 121.0, 25.001, 121.0)
+    assert distance == pytest.approx(111.2, abs=0.5)
+
+
+def test_decode_invalid_geohash():
+    """測試無效的 geohash 字元會拋出錯誤"""
+    with pytest.raises(ValueError):
+        geohash.decode_bounds("wsqa")
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """測試超過容量時淘汰最久未使用的項目"""
+    cache = LRUCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_lru_cache_expires_entries():
+    """測試過期項目視為未命中"""
+    cache = LRUCache(max_entries=2, ttl_seconds=0)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_cache_stats():
+    """測試命中率統計"""
+    cache = LRUCache(max_entries=10, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_get_nearby_reuses_cell_cache(monkeypatch):
+    """測試同一網格內的用戶共用候選熱點，並各自套用精確距離篩選"""
+    near = SimpleNamespace(
+        id=uuid4(), center_latitude=Decimal("25.0335"), center_longitude=Decimal("121.5654")
+    )
+    far = SimpleNamespace(
+        id=uuid4(), center_latitude=Decimal("25.0400"), center_longitude=Decimal("121.5654")
+    )
+    calls = []
+
+    def fake_query_nearby_cell(db, cell, distance, time_range, severity_levels, analysis_date):
+        calls.append(cell)
+        return [(hotspot, float(hotspot.center_latitude), float(hotspot.center_longitude))
+                for hotspot in (far, near)]
+
+    monkeypatch.setattr(
+        HotspotService, "_query_nearby_cell", staticmethod(fake_query_nearby_cell)
+    )
+    db = MagicMock()
+    db.query.return_value.scalar.return_value = date(2025, 1, 1)
+
+    first = HotspotService.get_nearby(db, 25.03300, 121.56540, 100)
+    second = HotspotService.get_nearby(db, 25.03302, 121.56543, 1000)
+    third = HotspotService.get_nearby(db, 25.03301, 121.56541, 1000)
+
+    assert [h.id for h in first] == [near.id]
+    assert [h.id for h in second] == [near.id, far.id]
+    assert [h.id for h in third] == [near.id, far.id]
+    assert len(calls) == 2
+
+
+def test_get_nearby_cache_hit_issues_no_queries(monkeypatch):
+    """測試附近熱點快取命中時（含分析版本）不會對資料庫發出任何查詢"""
+    hotspot = SimpleNamespace(
+        id=uuid4(), center_latitude=Decimal("25.0335"), center_longitude=Decimal("121.5654")
+    )
+    monkeypatch.setattr(
+        HotspotService,
+        "_query_nearby_cell",
+        staticmethod(lambda *args: [(hotspot, 25.0335, 121.5654)]),
+    )
+    db = MagicMock()
+    db.query.return_value.all.return_value = [(uuid4(),)]
+
+    first = HotspotService.get_nearby(db, 25.03300, 121.56540, 100)
+    queries = db.query.call_count
+    second = HotspotService.get_nearby(db, 25.03301, 121.56541, 100)
+
+    assert queries > 0
+    assert db.query.call_count == queries
+    assert [h.id for h in first] == [h.id for h in second] == [hotspot.id]
+
+
+def test_current_version_cached_until_cleared():
+    """測試分析版本在 TTL 內沿用快取，清除後（發佈新版本時）立即讀到新版本"""
+    from src.core.cache import hotspot_version_cache
+    from src.services.hotspot_service import _current_version
+
+    old_run, new_run = uuid4(), uuid4()
+    db = MagicMock()
+    db.query.return_value.all.return_value = [(old_run,)]
+    assert _current_version(db)[1] == (old_run,)
+
+    db.query.return_value.all.return_value = [(new_run,)]
+    assert _current_version(db)[1] == (old_run,)
+
+    hotspot_version_cache.clear()
+    assert _current_version(db)[1] == (new_run,)
@@ -0,0 +1,120 @@
+"""Unit test for 健康檢查端點"""
+from datetime import date, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api import health
+from src.services.health_service import (
+    DatabaseSnapshot,
+    HealthService,
+    PublishedVersion,
+    _published_versions,
+    get_health_service,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _client(service: HealthService) -> TestClient:
+    app = FastAPI()
+    app.include_router(health.router)
+    app.dependency_overrides[get_health_service] = lambda: service
+    return TestClient(app)
+
+
+def test_database_check_is_cached_between_probes():
+    """測試 TTL 內的探測共用同一次資料庫檢查"""
+    calls = []
+    clock = FakeClock()
+
+    def probe():
+        calls.append(clock.now)
+        return DatabaseSnapshot(
+            connected=True, published_versions=[PublishedVersion(365, "run-1", date.today())]
+        )
+
+    client = _client(HealthService(probe=probe, ttl_seconds=10, clock=clock))
+
+    for _ in range(5):
+        assert client.get("/health/ready").status_code == 200
+    clock.now = 3
+    body = client.get("/health").json()
+    assert len(calls) == 1
+    assert body["status"] == "healthy"
+    assert body["database_check"]["age_seconds"] == 3
+    assert "hit_ratio" in body["cache"]
+
+    clock.now = 11
+    client.get("/health/ready")
+    assert len(calls) == 2
+
+
+def test_readiness_fails_when_database_unavailable():
+    """測試資料庫無法連線時就緒探測回傳 503，存活探測不受影響"""
+    def probe():
+        raise ConnectionError("refused")
+
+    client = _client(HealthService(probe=probe))
+
+    ready = client.get("/health/ready")
+    assert ready.status_code == 503
+    assert ready.json()["database"] == "disconnected"
+    assert client.get("/health").json()["status"] == "unhealthy"
+    assert client.get("/health/live").json()["status"] == "alive"
+
+
+def test_stale_analysis_reports_degraded():
+    """測試分析結果過期時回報 degraded"""
+    old = date.today() - timedelta(days=45)
+    versions = [PublishedVersion(30, "run-2", date.today()), PublishedVersion(365, "run-1", old)]
+    service = HealthService(
+        probe=lambda: DatabaseSnapshot(connected=True, published_versions=versions),
+        max_analysis_age_days=30,
+    )
+
+    body = _client(service).get("/health").json()
+
+    assert body["status"] == "degraded"
+    assert body["analysis"] == {
+        "version": [
+            {
+                "analysis_period_days": 30,
+                "analysis_run_id": "run-2",
+                "analysis_date": date.today().isoformat(),
+            },
+            {
+                "analysis_period_days": 365,
+                "analysis_run_id": "run-1",
+                "analysis_date": old.isoformat(),
+            },
+        ],
+        "age_days": 45,
+        "stale": True,
+        "last_run": None,
+    }
+
+
+def test_probe_reports_published_pointer_not_latest_hotspot_rows():
+    """測試分析版本取自發佈指標：已寫入但尚未切換指標的版本不會被回報"""
+    run_id = uuid4()
+    published = SimpleNamespace(
+        analysis_period_days=365, analysis_run_id=run_id, analysis_date=date(2025, 1, 1)
+    )
+    db = MagicMock()
+    db.query.return_value.order_by.return_value = [published]
+    db.query.return_value.scalar.return_value = date(2025, 2, 1)
+
+    assert _published_versions(db) == [PublishedVersion(365, str(run_id), date(2025, 1, 1))]
+
+    db.query.return_value.order_by.return_value = []
+    assert _published_versions(db) == [PublishedVersion(None, None, date(2025, 2, 1))]
@@ -0,0 +1,265 @@
+"""Unit test for 熱點聚類引擎"""
+import numpy as np
+import pytest
+from geopy.distance import geodesic
+
+from src.models import SourceType
+from src.services.hotspot_analysis import HotspotAnalysisService
+from src.services.hotspot_engine import (
+    EQUIRECTANGULAR_TOLERANCE,
+    HAVERSINE_TOLERANCE,
+    cluster_coordinates,
+    cluster_windows,
+    encode_severities,
+    equirectangular_meters,
+    find_hotspots,
+    haversine_meters,
+    plan_incremental,
+    recluster_region,
+    summarize_clusters,
+    window_sizes,
+)
+
+
+def _blob(rng, lat, lng, count, spread=0.0003):
+    return lat + rng.normal(0, spread, count), lng + rng.normal(0, spread, count)
+
+
+def test_epsilon_is_converted_to_radians():
+    """測試 epsilon 以公尺換算為弧度：相距約 1.1 公里的兩群在 500 公尺下不會合併"""
+    rng = np.random.default_rng(0)
+    lat_a, lng_a = _blob(rng, 25.0400, 121.5400, 20, spread=0.0001)
+    lat_b, lng_b = _blob(rng, 25.0500, 121.5400, 20, spread=0.0001)
+    labels = cluster_coordinates(
+        np.concatenate([lat_a, lat_b]), np.concatenate([lng_a, lng_b]), 500, 5
+    )
+
+    assert len(set(labels[:20])) == 1
+    assert len(set(labels[20:])) == 1
+    assert labels[0] != labels[20]
+
+
+def test_summaries_match_per_cluster_computation():
+    """測試分組運算的結果與逐聚類計算一致"""
+    rng = np.random.default_rng(1)
+    parts = [_blob(rng, 25.03 + 0.01 * i, 121.50, 30 + 10 * i) for i in range(4)]
+    latitudes = np.concatenate([lat for lat, _ in parts])
+    longitudes = np.concatenate([lng for _, lng in parts])
+    severities = rng.integers(0, 3, len(latitudes))
+    occurred_at = rng.uniform(0, 1e6, len(latitudes))
+
+    summaries = find_hotspots(latitudes, longitudes, severities, occurred_at, 200, 5)
+
+    assert len(summaries) == 4
+    for cluster in range(len(summaries)):
+        members = np.flatnonzero(summaries.labels == cluster)
+        assert sorted(summaries.members(cluster)) == sorted(members)
+        assert summaries.counts[cluster] == len(members)
+        center = (latitudes[members].mean(), longitudes[members].mean())
+        assert np.isclose(summaries.center_latitude[cluster], center[0])
+        assert np.isclose(summaries.center_longitude[cluster], center[1])
+        assert summaries.severity_counts[cluster].tolist() == [
+            int((severities[members] == level).sum()) for level in range(3)
+        ]
+        assert occurred_at[summaries.earliest_index[cluster]] == occurred_at[members].min()
+        assert occurred_at[summaries.latest_index[cluster]] == occurred_at[members].max()
+
+        farthest = max(
+            geodesic(center, (latitudes[i], longitudes[i])).meters for i in members
+        )
+        assert abs(summaries.radius_meters[cluster] - max(50, int(farthest * 1.2))) <= 1
+
+
+def test_small_clusters_and_noise_are_excluded():
+    """測試少於 min_size 的聚類視為噪音，其餘重新編號"""
+    labels = np.array([-1, 0, 0, 1, 1, 1, 2, 2, 2, -1])
+    latitudes = np.full(len(labels), 25.0)
+    longitudes = np.full(len(labels), 121.5)
+
+    summaries = summarize_clusters(
+        labels, latitudes, longitudes, np.zeros(len(labels), dtype=int), np.arange(len(labels)), 3
+    )
+
+    assert summaries.counts.tolist() == [3, 3]
+    assert summaries.labels.tolist() == [-1, -1, -1, 0, 0, 0, 1, 1, 1, -1]
+    assert summaries.radius_meters.tolist() == [50, 50]
+
+    empty = summarize_clusters(np.full(3, -1), latitudes[:3], longitudes[:3], [0, 0, 0], [0, 1, 2])
+    assert len(empty) == 0
+    assert empty.severity_counts.shape == (0, 3)
+
+
+def test_encode_severities_accepts_enum_and_string():
+    """測試 source_type 可為 SourceType 或字串"""
+    assert encode_severities([SourceType.A1, "A2", SourceType.A3]).tolist() == [0, 1, 2]
+
+
+def test_distance_kernels_within_documented_tolerance_of_geodesic():
+    """測試距離核心與 geodesic 的相對誤差在文件記載的範圍內（臺灣緯度、5 公里內）"""
+    rng = np.random.default_rng(2)
+    count = 300
+    center_lat = rng.uniform(21.9, 25.3, count)
+    center_lng = rng.uniform(120.0, 122.0, count)
+    distance = rng.uniform(1, 5000, count)
+    bearing = rng.uniform(0, 2 * np.pi, count)
+    latitudes = center_lat + distance * np.cos(bearing) / 111_000
+    longitudes = center_lng + distance * np.sin(bearing) / (111_000 * np.cos(np.radians(center_lat)))
+
+    expected = np.array(
+        [
+            geodesic((lat0, lng0), (lat1, lng1)).meters
+            for lat0, lng0, lat1, lng1 in zip(center_lat, center_lng, latitudes, longitudes)
+        ]
+    )
+    equirectangular = equirectangular_meters(latitudes, longitudes, center_lat, center_lng)
+    haversine = haversine_meters(latitudes, longitudes, center_lat, center_lng)
+
+    assert np.max(np.abs(equirectangular - expected) / expected) < EQUIRECTANGULAR_TOLERANCE
+    assert np.max(np.abs(haversine - expected) / expected) < HAVERSINE_TOLERANCE
+
+
+def test_calculate_hotspot_radius_keeps_buffer_and_clamp():
+    """測試服務的半徑計算保留 1.2 倍緩衝與 50-2000 公尺範圍"""
+    service = HotspotAnalysisService(db=None)
+    center = (25.0479, 121.5170)
+    coordinates = [center, (25.0529, 121.5170), (25.0479, 121.5200)]
+
+    farthest = max(geodesic(center, coord).meters for coord in coordinates)
+    radius = service.calculate_hotspot_radius(coordinates, center)
+
+    assert isinstance(radius, int)
+    assert abs(radius - int(farthest * 1.2)) <= 1
+    assert service.calculate_hotspot_radius([center], center) == 50
+    assert service.calculate_hotspot_radius([center, (25.10, 121.5170)], center) == 2000
+    assert service.calculate_hotspot_center(coordinates) == pytest.approx((25.0495667, 121.518))
+
+
+def test_cluster_windows_match_separate_dbscan():
+    """測試多期間（前綴窗口）聚類與逐期間執行 DBSCAN 的結果相同，平行與依序執行一致"""
+    rng = np.random.default_rng(3)
+    parts = [_blob(rng, 25.03 + 0.004 * i, 121.50 + 0.003 * (i % 3), 60) for i in range(8)]
+    latitudes = np.concatenate([lat for lat, _ in parts])
+    longitudes = np.concatenate([lng for _, lng in parts])
+    occurred_at = np.sort(rng.uniform(0, 365 * 86400, len(latitudes)))[::-1]
+
+    cutoffs = [occurred_at[0] - days * 86400 for days in (30, 90, 365)] + [occurred_at[0] + 1]
+    sizes = window_sizes(occurred_at, cutoffs)
+    assert sizes == [int((occurred_at >= cutoff).sum()) for cutoff in cutoffs]
+    assert sizes[-1] == 0
+
+    sequential = cluster_windows(latitudes, longitudes, sizes, 100, 5)
+    parallel = cluster_windows(latitudes, longitudes, sizes, 100, 5, workers=2)
+    for size, labels, parallel_labels in zip(sizes, sequential, parallel):
+        assert len(labels) == size
+        if size >= 5:
+            expected = cluster_coordinates(latitudes[:size], longitudes[:size], 100, 5)
+            assert np.array_equal(labels, expected)
+        assert np.array_equal(labels, parallel_labels)
+
+
+def _partition(summaries):
+    return {frozenset(summaries.members(cluster).tolist()) for cluster in range(len(summaries))}
+
+
+def test_incremental_recluster_matches_full_dbscan():
+    """測試增量分析（只重新聚類受影響範圍並沿用其餘熱點）與完整分析的聚類結果相同"""
+    rng = np.random.default_rng(4)
+    centers = np.column_stack([rng.uniform(22.0, 25.2, 150), rng.uniform(120.1, 121.9, 150)])
+    picks = rng.integers(0, len(centers), 6000)
+    latitudes = centers[picks, 0] + rng.normal(0, 0.003, len(picks))
+    longitudes = centers[picks, 1] + rng.normal(0, 0.003, len(picks))
+    previous = find_hotspots(
+        latitudes, longitudes, np.zeros(len(picks), dtype=int), np.arange(len(picks)), 500, 5
+    )
+
+    # 前 20 筆移出分析期間，新增 20 筆
+    added = rng.integers(0, len(centers), 20)
+    new_latitudes = np.concatenate([latitudes[20:], centers[added, 0] + rng.normal(0, 0.003, 20)])
+    new_longitudes = np.concatenate([longitudes[20:], centers[added, 1] + rng.normal(0, 0.003, 20)])
+    old_to_new = np.arange(len(picks)) - 20
+
+    members = [old_to_new[previous.members(cluster)] for cluster in range(len(previous))]
+    stale = np.array([(positions < 0).any() for positions in members])
+    member_points = np.concatenate([positions[positions >= 0] for positions in members])
+    member_hotspots = np.concatenate(
+        [np.full((positions >= 0).sum(), cluster) for cluster, positions in enumerate(members)]
+    )
+    region = plan_incremental(
+        new_latitudes,
+        new_longitudes,
+        np.concatenate([latitudes[:20], new_latitudes[-20:]]),
+        np.concatenate([longitudes[:20], new_longitudes[-20:]]),
+        member_points,
+        member_hotspots,
+        stale,
+        500,
+    )
+    labels = recluster_region(new_latitudes, new_longitudes, region, 500, 5)
+    count = len(new_latitudes)
+    reclustered = summarize_clusters(
+        labels, new_latitudes, new_longitudes, np.zeros(count, dtype=int), np.arange(count), 5
+    )
+    kept = {
+        frozenset(positions.tolist())
+        for cluster, positions in enumerate(members)
+        if not region.affected_hotspots[cluster]
+    }
+
+    full = find_hotspots(
+        new_latitudes, new_longitudes, np.zeros(count, dtype=int), np.arange(count), 500, 5
+    )
+    assert kept and region.points.sum() < count / 2
+    assert kept | _partition(reclustered) == _partition(full)
+
+
+def test_incremental_recluster_handles_moved_noise_point():
+    """測試修改座標的噪音事故（新舊位置都列為異動）增量分析與完整分析的結果相同"""
+    rng = np.random.default_rng(5)
+    centers = np.column_stack([rng.uniform(22.0, 25.2, 150), rng.uniform(120.1, 121.9, 150)])
+    picks = rng.integers(0, len(centers), 3000)
+    latitudes = centers[picks, 0] + rng.normal(0, 0.004, len(picks))
+    longitudes = centers[picks, 1] + rng.normal(0, 0.004, len(picks))
+    count = len(picks)
+    previous = find_hotspots(
+        latitudes, longitudes, np.zeros(count, dtype=int), np.arange(count), 500, 5
+    )
+    members = [previous.members(cluster) for cluster in range(len(previous))]
+    clustered = np.concatenate(members)
+    member_hotspots = np.concatenate(
+        [np.full(len(positions), cluster) for cluster, positions in enumerate(members)]
+    )
+    noise = np.setdiff1d(np.arange(count), clustered)[0]
+
+    # 噪音事故移到某個熱點的事故旁邊
+    target = members[-1][0]
+    new_latitudes = latitudes.copy()
+    new_longitudes = longitudes.copy()
+    new_latitudes[noise] = latitudes[target] + 0.001
+    new_longitudes[noise] = longitudes[target]
+
+    region = plan_incremental(
+        new_latitudes,
+        new_longitudes,
+        np.array([latitudes[noise], new_latitudes[noise]]),
+        np.array([longitudes[noise], new_longitudes[noise]]),
+        clustered,
+        member_hotspots,
+        np.zeros(len(members), dtype=bool),
+        500,
+    )
+    labels = recluster_region(new_latitudes, new_longitudes, region, 500, 5)
+    reclustered = summarize_clusters(
+        labels, new_latitudes, new_longitudes, np.zeros(count, dtype=int), np.arange(count), 5
+    )
+    kept = {
+        frozenset(positions.tolist())
+        for cluster, positions in enumerate(members)
+        if not region.affected_hotspots[cluster]
+    }
+
+    full = find_hotspots(
+        new_latitudes, new_longitudes, np.zeros(count, dtype=int), np.arange(count), 500, 5
+    )
+    assert region.affected_hotspots[-1] and kept
+    assert any(noise in cluster for cluster in _partition(full))
+    assert kept | _partition(reclustered) == _partition(full)
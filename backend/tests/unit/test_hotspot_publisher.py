@@ -0,0 +1,123 @@
+"""Unit test for 熱點批次寫入與原子發佈"""
+from datetime import date, datetime, timezone
+from decimal import Decimal
+import csv
+import io
+import json
+import uuid
+
+from src.services.hotspot_publisher import (
+    HOTSPOT_COPY_COLUMNS,
+    carry_over_hotspots,
+    hotspots_csv,
+    publish_hotspots,
+)
+
+RUN_ID = uuid.UUID("00000000-0000-4000-8000-000000000001")
+
+
+class _RecordingCursor:
+    """記錄執行的 SQL（不連線資料庫）"""
+
+    def __init__(self, statements):
+        self.statements = statements
+        self.rowcount = 3
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.statements.append((" ".join(sql.split()), params))
+
+    def copy_expert(self, sql, payload):
+        self.statements.append((" ".join(sql.split()), payload.read()))
+
+
+class _RecordingConnection:
+    def __init__(self):
+        self.statements = []
+
+    def cursor(self):
+        return _RecordingCursor(self.statements)
+
+
+def _hotspot():
+    return {
+        "id": uuid.uuid4(),
+        "center_latitude": Decimal("25.0479000"),
+        "center_longitude": Decimal("121.5170000"),
+        "radius_meters": 120,
+        "total_accidents": 2,
+        "a1_count": 0,
+        "a2_count": 1,
+        "a3_count": 1,
+        "earliest_accident_at": datetime(2025, 1, 1, 8, 0, tzinfo=timezone.utc),
+        "latest_accident_at": datetime(2025, 3, 1, 18, 30, tzinfo=timezone.utc),
+        "analysis_date": date(2025, 10, 1),
+        "analysis_period_days": 365,
+        "analysis_period_start": date(2024, 10, 1),
+        "analysis_period_end": date(2025, 9, 30),
+        "accident_ids": json.dumps(["a", "b"]),
+    }
+
+
+def test_hotspots_csv_columns():
+    """測試 CSV 欄位順序、時間格式與 accident_ids 的 JSON 跳脫"""
+    hotspot = _hotspot()
+    row = next(csv.reader(io.StringIO(hotspots_csv([hotspot], RUN_ID))))
+    values = dict(zip(HOTSPOT_COPY_COLUMNS, row))
+
+    assert len(row) == len(HOTSPOT_COPY_COLUMNS)
+    assert values["id"] == str(hotspot["id"])
+    assert values["earliest_accident_at"] == "2025-01-01T08:00:00+00:00"
+    assert json.loads(values["accident_ids"]) == ["a", "b"]
+    assert values["analysis_run_id"] == str(RUN_ID)
+
+
+def test_publish_copies_then_flips_pointer_before_delete():
+    """測試寫入順序：暫存表 COPY → 搬移到 hotspots → 切換發佈指標 → 刪除舊版本（不 commit）"""
+    connection = _RecordingConnection()
+    deleted = publish_hotspots(
+        connection, [_hotspot(), _hotspot()], RUN_ID, 365, date(2025, 10, 1), replace_existing=True
+    )
+    statements = [sql.split(" (")[0] for sql, _ in connection.statements]
+
+    assert deleted == 3
+    assert statements[0].startswith("DROP TABLE IF EXISTS pg_temp.hotspots_staging")
+    assert statements[1].startswith("CREATE TEMP TABLE hotspots_staging ON COMMIT DROP")
+    assert statements[2:] == [
+        "COPY hotspots_staging",
+        "INSERT INTO hotspots",
+        "INSERT INTO hotspot_publications",
+        "DELETE FROM hotspots WHERE analysis_period_days = %s AND analysis_run_id IS DISTINCT FROM %s",
+    ]
+    assert connection.statements[2][1].count("\n") == 2
+    assert connection.statements[4][1] == (365, str(RUN_ID), date(2025, 10, 1), 2)
+
+    connection = _RecordingConnection()
+    assert publish_hotspots(connection, [], RUN_ID, 30, date(2025, 10, 1)) == 0
+    assert not any(sql.startswith("DELETE") for sql, _ in connection.statements)
+
+
+def test_carry_over_moves_kept_hotspots_then_drops_previous_version():
+    """測試增量分析：沿用的熱點移到新版本（保留 id），上一版本其餘熱點刪除，發佈數量包含沿用的熱點"""
+    connection = _RecordingConnection()
+    previous_run = uuid.UUID("00000000-0000-4000-8000-000000000002")
+    kept = [uuid.uuid4(), uuid.uuid4()]
+    moved, deleted = carry_over_hotspots(
+        connection, previous_run, kept, RUN_ID, date(2025, 10, 2), date(2024, 10, 2), date(2025, 10, 1)
+    )
+    (update_sql, update_params), (delete_sql, delete_params) = connection.statements
+
+    assert (moved, deleted) == (3, 3)
+    assert update_sql.startswith("UPDATE hotspots SET analysis_run_id = %s")
+    assert update_params[0] == str(RUN_ID)
+    assert update_params[-2:] == (str(previous_run), [str(hotspot_id) for hotspot_id in kept])
+    assert delete_sql == "DELETE FROM hotspots WHERE analysis_run_id = %s"
+    assert delete_params == (str(previous_run),)
+
+    publish_hotspots(connection, [_hotspot()], RUN_ID, 365, date(2025, 10, 2), carried_over=moved)
+    assert connection.statements[-1][1] == (365, str(RUN_ID), date(2025, 10, 2), 4)
@@ -110,3 +110,34 @@ def test_calculate_hotspot_radius_empty_list(analysis_service):
     
     assert radius == 100  # 預設半徑
 
+
+
+def test_calculate_hotspot_stats_from_arrays_without_db():
+    """測試傳入記憶體中的欄位時不查詢資料庫"""
+    service = HotspotAnalysisService(db=None)
+    base_time = datetime.utcnow()
+    occurred_at = [base_time - timedelta(days=days) for days in (3, 0, 7, 1)]
+
+    stats = service.calculate_hotspot_stats(
+        [str(uuid4()) for _ in range(4)],
+        source_types=[SourceType.A1, "A3", SourceType.A3, "A2"],
+        occurred_at=occurred_at,
+    )
+
+    assert stats == {
+        "total_accidents": 4,
+        "a1_count": 1,
+        "a2_count": 1,
+        "a3_count": 2,
+        "earliest_accident_at": occurred_at[2],
+        "latest_accident_at": occurred_at[1],
+    }
+
+
+def test_calculate_hotspot_stats_rejects_mismatched_arrays():
+    """測試欄位長度不一致時拋出錯誤"""
+    service = HotspotAnalysisService(db=None)
+    with pytest.raises(ValueError):
+        service.calculate_hotspot_stats(
+            [str(uuid4())], source_types=["A1", "A2"], occurred_at=[datetime.utcnow()]
+        )
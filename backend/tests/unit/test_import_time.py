@@ -0,0 +1,55 @@
+"""Unit test for API 啟動時的匯入成本（python -X importtime）"""
+from pathlib import Path
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# 只有熱點分析需要的科學計算套件，不應在 API worker 啟動時載入
+HEAVY_MODULES = ("sklearn", "scipy", "numpy", "geopy")
+
+# src.main 的累計匯入時間上限（秒），較慢的 CI 可用環境變數放寬
+IMPORT_TIME_BUDGET_SECONDS = float(os.environ.get("IMPORT_TIME_BUDGET_SECONDS", "1.5"))
+
+
+def _import_main() -> dict:
+    """在新的直譯器中匯入 src.main，回傳各模組的累計匯入時間（微秒）"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, module = line[len("import time:"):].split("|")
+        cumulative[module.strip()] = int(cumulative_us)
+    return cumulative
+
+
+def test_api_startup_does_not_import_analysis_stack():
+    """測試匯入 API 不會載入 scikit-learn 等分析套件，也不會建立資料庫引擎"""
+    cumulative = _import_main()
+
+    loaded = sorted(
+        module for module in cumulative if module.split(".")[0] in HEAVY_MODULES
+    )
+    assert loaded == []
+    assert "psycopg2" not in cumulative
+    assert cumulative["src.main"] / 1_000_000 < IMPORT_TIME_BUDGET_SECONDS
+
+
+def test_api_import_starts_no_threads():
+    """測試匯入 API 不會啟動背景執行緒（日誌寫出與監控都在 lifespan 啟動）"""
+    result = subprocess.run(
+        [sys.executable, "-c", "import threading, src.main; print(threading.active_count())"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "1"
@@ -0,0 +1,116 @@
+"""Unit test for 自適應併發限制與過載保護"""
+import asyncio
+import re
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.core.load_shedding import (
+    AdaptiveLimit,
+    LoadSheddingMiddleware,
+    RouteClass,
+    default_route_classes,
+)
+
+
+def test_limit_decreases_on_slow_requests():
+    """測試延遲超過目標時乘性減少上限"""
+    limit = AdaptiveLimit(RouteClass("map", initial_limit=10, min_limit=2, target_latency_ms=100))
+    for _ in range(30):
+        assert limit.try_acquire()
+        limit.release(500, failed=False, inflight_at_start=10)
+
+    assert limit.limit == 2
+
+
+def test_limit_increases_when_saturated_and_fast():
+    """測試上限被充分使用且延遲正常時加性增加"""
+    limit = AdaptiveLimit(RouteClass("map", initial_limit=4, max_limit=8, target_latency_ms=100))
+    for _ in range(20):
+        limit.try_acquire()
+        limit.release(10, failed=False, inflight_at_start=4)
+
+    assert 4 < limit.limit <= 8
+
+
+def test_limit_does_not_grow_when_idle():
+    """測試低負載時不會無限制增加上限"""
+    limit = AdaptiveLimit(RouteClass("map", initial_limit=10, target_latency_ms=100))
+    for _ in range(50):
+        limit.try_acquire()
+        limit.release(10, failed=False, inflight_at_start=1)
+
+    assert limit.limit == 10
+
+
+def test_classify_routes():
+    """測試路由類別判定"""
+    middleware = LoadSheddingMiddleware(None, route_classes=default_route_classes())
+
+    assert middleware.classify("/api/v1/health").route_class.critical
+    assert middleware.classify("/api/v1/hotspots/all").route_class.critical
+    assert middleware.classify("/api/v1/hotspots/123").route_class.name == "map"
+    assert middleware.classify("/api/v1/admin/analyze-hotspots").route_class.name == "admin"
+    assert middleware.classify("/").route_class.name == "default"
+
+
+def test_classify_real_app_routes():
+    """測試實際註冊的路由：每個關鍵路徑樣式都對應到存在的路由，警示熱點清單不會被優先拒絕"""
+    from src.main import app, settings
+
+    route_classes = default_route_classes(settings.api_v1_prefix)
+    middleware = LoadSheddingMiddleware(None, route_classes=route_classes)
+    # OpenAPI 路徑由 app.routes 產生（含 include_router 掛載的子路由完整路徑）
+    paths = list(app.openapi()["paths"])
+    classes = {path: middleware.classify(path).route_class.name for path in paths}
+
+    for route_class in route_classes:
+        for pattern in route_class.patterns:
+            assert any(pattern.match(path) for path in paths), pattern.pattern
+    assert classes[f"{settings.api_v1_prefix}/hotspots/all"] == "critical"
+    assert classes[f"{settings.api_v1_prefix}/health"] == "critical"
+    assert classes[f"{settings.api_v1_prefix}/hotspots/{{hotspot_id}}"] == "map"
+    assert classes[f"{settings.api_v1_prefix}/admin/analyze-hotspots"] == "admin"
+
+
+@pytest.mark.asyncio
+async def test_sheds_map_requests_but_keeps_critical_path():
+    """測試全域併發滿載時拒絕地圖請求，但關鍵路徑仍可通過"""
+    release = asyncio.Event()
+    app = FastAPI()
+
+    @app.get("/api/v1/hotspots/{hotspot_id}")
+    async def hotspot_detail(hotspot_id: str):
+        await release.wait()
+        return {"id": hotspot_id}
+
+    @app.get("/api/v1/health")
+    async def health():
+        return {"status": "healthy"}
+
+    app.add_middleware(
+        LoadSheddingMiddleware,
+        route_classes=[
+            RouteClass("critical", (re.compile(r"^/api/v1/health"),), critical=True),
+            RouteClass("map", (re.compile(r"^/api/v1/hotspots/"),), initial_limit=4),
+        ],
+        max_inflight=2,
+    )
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        pending = [asyncio.create_task(client.get("/api/v1/hotspots/a")) for _ in range(2)]
+        await asyncio.sleep(0.05)
+
+        shed = await client.get("/api/v1/hotspots/b")
+        critical = await client.get("/api/v1/health")
+
+        release.set()
+        completed = await asyncio.gather(*pending)
+
+    assert shed.status_code == 503
+    assert shed.json()["error"] == "service_overloaded"
+    assert int(shed.headers["Retry-After"]) >= 1
+    assert critical.status_code == 200
+    assert [r.status_code for r in completed] == [200, 200]
@@ -0,0 +1,126 @@
+"""Unit test for 結構化日誌（JSON 格式、抽樣、非阻塞佇列）"""
+import json
+import logging
+import queue
+import sys
+
+import pytest
+
+from src.core.logging import (
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    SamplingFilter,
+    parse_sample_rates,
+    setup_logging,
+    start_log_listener,
+    stop_log_listener,
+)
+from src.core.metrics import LOG_RECORDS_DROPPED
+from src.core.request_context import reset_request_context, start_request_context
+
+
+def _record(name="api.request", level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+def test_json_formatter_outputs_single_line_with_extra_fields():
+    """測試 JSON 格式包含訊息、request_id 與 extra 欄位"""
+    line = JsonFormatter().format(_record(request_id="abc123", status=200))
+
+    payload = json.loads(line)
+    assert "\n" not in line
+    assert payload["message"] == "hello world"
+    assert payload["severity"] == "INFO"
+    assert payload["logger"] == "api.request"
+    assert payload["request_id"] == "abc123"
+    assert payload["status"] == 200
+
+
+def test_json_formatter_includes_exception():
+    """測試 JSON 格式包含例外堆疊"""
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord("x", logging.ERROR, __file__, 1, "failed", None, sys.exc_info())
+
+    payload = json.loads(JsonFormatter().format(record))
+    assert "ValueError: boom" in payload["exception"]
+
+
+def test_sampling_filter_uses_longest_prefix_and_keeps_warnings():
+    """測試抽樣依最長前綴套用，WARNING 以上一律保留"""
+    sampling = SamplingFilter({"api": 1.0, "api.request": 0.0}, rand=lambda: 0.5)
+
+    assert sampling.filter(_record(name="api.request")) is False
+    assert sampling.filter(_record(name="api.request.child")) is False
+    assert sampling.filter(_record(name="api.other")) is True
+    assert sampling.filter(_record(name="unrelated")) is True
+    assert sampling.filter(_record(name="api.request", level=logging.WARNING)) is True
+
+
+def test_parse_sample_rates():
+    """測試解析抽樣設定"""
+    assert parse_sample_rates("") == {}
+    assert parse_sample_rates("api.request=0.1, src.api.hotspots=0.5") == {
+        "api.request": 0.1,
+        "src.api.hotspots": 0.5,
+    }
+    with pytest.raises(ValueError):
+        parse_sample_rates("api.request")
+    with pytest.raises(ValueError):
+        parse_sample_rates("api.request=2")
+
+
+def test_queue_handler_captures_request_id_and_formats_lazily():
+    """測試佇列處理器在呼叫端擷取 request_id，且不修改原始紀錄"""
+    handler = NonBlockingQueueHandler(queue.Queue())
+    record = _record()
+    _, token = start_request_context("GET", "/ping", "req-1")
+    try:
+        handler.handle(record)
+    finally:
+        reset_request_context(token)
+
+    queued = handler.queue.get_nowait()
+    assert queued.request_id == "req-1"
+    assert queued.msg == "hello world"
+    assert queued.args is None
+    assert record.args == ("world",)
+
+
+def test_queue_handler_drops_when_full():
+    """測試佇列已滿時丟棄日誌而不阻塞"""
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    dropped_before = LOG_RECORDS_DROPPED.labels().value
+
+    handler.handle(_record())
+    handler.handle(_record())
+
+    assert handler.queue.qsize() == 1
+    assert LOG_RECORDS_DROPPED.labels().value == dropped_before + 1
+
+
+def test_setup_logging_replaces_existing_root_handlers(capsys):
+    """測試根日誌記錄器已有 handler 時仍改用佇列，且寫出執行緒啟動後才輸出"""
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    existing = logging.StreamHandler(sys.stderr)
+    root.addHandler(existing)
+    try:
+        setup_logging("INFO", log_format="text", start_listener=False)
+        assert existing not in root.handlers
+        assert [type(handler) for handler in root.handlers] == [NonBlockingQueueHandler]
+
+        logging.getLogger("test.setup").info("queued %s", "record")
+        assert "queued record" not in capsys.readouterr().out
+
+        start_log_listener()
+        stop_log_listener()
+        assert "queued record" in capsys.readouterr().out
+    finally:
+        stop_log_listener()
+        root.handlers[:] = saved_handlers
+        root.setLevel(saved_level)
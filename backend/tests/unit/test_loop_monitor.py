@@ -0,0 +1,68 @@
+"""Unit test for event loop 延遲監控"""
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from src.core.loop_monitor import EventLoopMonitor
+from src.core.metrics import EVENT_LOOP_LAG
+
+
+def _block_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+def test_measures_lag_and_captures_blocking_stack():
+    """測試阻塞 loop 時記錄延遲並擷取阻塞當下的堆疊"""
+    monitor = EventLoopMonitor(interval=0.01, block_threshold=0.05)
+
+    async def scenario():
+        monitor.start()
+        await asyncio.sleep(0.05)
+        _block_loop(0.2)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    asyncio.run(scenario())
+
+    assert monitor.max_lag >= 0.15
+    assert monitor.blocked_count == 1
+    assert any("_block_loop" in line for line in monitor.last_blocked_stack)
+    assert not monitor.running
+
+
+def test_idle_loop_reports_no_blocking():
+    """測試 loop 閒置時不會誤報阻塞"""
+    monitor = EventLoopMonitor(interval=0.01, block_threshold=0.1)
+
+    async def scenario():
+        monitor.start()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+
+    asyncio.run(scenario())
+
+    assert monitor.blocked_count == 0
+    assert monitor.snapshot()["max_lag_ms"] < 100
+
+
+def test_lag_exported_as_metric():
+    """測試延遲輸出為直方圖"""
+    monitor = EventLoopMonitor()
+    before = EVENT_LOOP_LAG.labels().count
+
+    monitor.record_lag(0.02)
+
+    assert EVENT_LOOP_LAG.labels().count == before + 1
+    assert monitor.snapshot()["lag_ms"] == 20.0
+
+
+def test_monitor_runs_during_app_lifespan():
+    """測試應用程式 lifespan 啟動與停止監控"""
+    from src.main import app
+    from src.core.loop_monitor import loop_monitor
+
+    with TestClient(app):
+        assert loop_monitor.running
+
+    assert not loop_monitor.running
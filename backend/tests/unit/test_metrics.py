@@ -0,0 +1,110 @@
+"""Unit test for Prometheus 指標"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.core.logging import RequestTimingMiddleware
+from src.core.metrics import Counter, Histogram, HTTP_REQUESTS, MetricsRegistry, _Metric
+
+
+def test_counter_render_with_labels():
+    """測試計數器輸出格式"""
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("jobs_total", "工作數", ("status",)))
+    counter.inc(labels=("success",))
+    counter.inc(2, labels=("success",))
+
+    output = registry.render()
+
+    assert "# TYPE jobs_total counter" in output
+    assert 'jobs_total{status="success"} 3' in output
+
+
+def test_metric_subclass_must_implement_new_child():
+    """測試未實作 _new_child 的指標在建立時即失敗，而非第一次使用標籤時"""
+
+    class Incomplete(_Metric):
+        metric_type = "gauge"
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete", "未實作 _new_child")
+
+
+def test_histogram_buckets_are_cumulative():
+    """測試分組統計輸出為累積值"""
+    registry = MetricsRegistry()
+    histogram = registry.register(Histogram("latency_seconds", "延遲", buckets=(0.1, 1.0)))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value)
+
+    output = registry.render()
+
+    assert 'latency_seconds_bucket{le="0.1"} 1' in output
+    assert 'latency_seconds_bucket{le="1"} 3' in output
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in output
+    assert "latency_seconds_count 4" in output
+    assert "latency_seconds_sum 6.05" in output
+
+
+def test_collector_samples():
+    """測試回呼收集器"""
+    registry = MetricsRegistry()
+    registry.register_collector("pool", lambda: [("pool_size", {"pool": "QueuePool"}, 5)])
+
+    assert 'pool_size{pool="QueuePool"} 5' in registry.render()
+
+
+def test_requests_labelled_by_route_template():
+    """測試以路由樣板（而非原始路徑）作為標籤"""
+    app = FastAPI()
+
+    @app.get("/things/{thing_id}")
+    async def thing(thing_id: str):
+        return {"id": thing_id}
+
+    app.add_middleware(RequestTimingMiddleware)
+
+    with TestClient(app) as client:
+        client.get("/things/a")
+        client.get("/things/b")
+        client.get("/missing/path")
+
+    labels = set(HTTP_REQUESTS._children)
+    assert ("GET", "/things/{thing_id}", "200") in labels
+    assert ("GET", "unmatched", "404") in labels
+    assert not any("/things/a" in label for label in labels)
+
+
+def test_metrics_endpoint():
+    """測試 /metrics 端點（允許清單內的來源免驗證）"""
+    from src.main import app
+
+    with TestClient(app, client=("127.0.0.1", 50000)) as client:
+        client.get("/")
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "http_request_duration_seconds_bucket" in response.text
+    assert 'cache_hit_ratio{cache="nearby"}' in response.text
+
+
+def test_metrics_requires_admin_token_outside_allowlist():
+    """測試允許清單外的來源需要管理員 Token"""
+    from src.api.metrics import client_allowed, parse_networks
+    from src.core.auth import encode_hs256_jwt
+    from src.main import app, settings
+
+    with TestClient(app, client=("203.0.113.7", 50000)) as client:
+        anonymous = client.get("/metrics")
+        token = encode_hs256_jwt({"role": "admin"}, settings.admin_jwt_secret)
+        admin = client.get("/metrics", headers={"Authorization": f"Bearer {token}"})
+
+    assert anonymous.status_code == 401
+    assert admin.status_code == 200
+
+    networks = parse_networks("10.0.0.0/8, ::1/128")
+    assert client_allowed("10.1.2.3", networks)
+    assert client_allowed("::1", networks)
+    assert not client_allowed("192.168.0.1", networks)
+    assert not client_allowed("testclient", networks)
@@ -0,0 +1,156 @@
+"""Unit test for 請求剖析"""
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.admin import get_profile, list_profiles
+from src.core.auth import encode_hs256_jwt
+from src.core.errors import NotFoundError
+from src.core.profiling import (
+    ProfileRecord,
+    ProfileStore,
+    ProfilingMiddleware,
+    SamplingProfiler,
+    profile_store,
+)
+
+SECRET = "test-secret"
+
+
+def _busy_wait(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _build_app(store: ProfileStore, **options) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/slow")
+    async def slow():
+        _busy_wait(0.05)
+        return {"ok": True}
+
+    app.add_middleware(
+        ProfilingMiddleware, admin_secret=SECRET, interval=0.001, store=store, **options
+    )
+    return app
+
+
+def _admin_headers() -> dict:
+    token = encode_hs256_jwt({"role": "admin"}, SECRET)
+    return {"X-Profile": "1", "Authorization": f"Bearer {token}"}
+
+
+def test_sampling_profiler_outputs_speedscope():
+    """測試剖析器輸出 speedscope 格式且包含被取樣的函式"""
+    profiler = SamplingProfiler(threading.get_ident(), interval=0.001)
+    profiler.start()
+    _busy_wait(0.05)
+    profiler.stop()
+
+    document = profiler.to_speedscope("busy")
+    profile = document["profiles"][0]
+    frame_names = {frame["name"] for frame in document["shared"]["frames"]}
+
+    assert profiler.sample_count > 0
+    assert profile["type"] == "sampled"
+    assert len(profile["samples"]) == len(profile["weights"])
+    assert "_busy_wait" in frame_names
+
+
+def test_admin_header_triggers_profile():
+    """測試管理員以 X-Profile 標頭觸發剖析"""
+    store = ProfileStore()
+    with TestClient(_build_app(store)) as client:
+        response = client.get("/slow", headers=_admin_headers())
+
+    profile_id = response.headers["X-Profile-ID"]
+    record = store.get(profile_id)
+    assert record is not None
+    assert record.trigger == "header"
+    assert record.status_code == 200
+    assert store.list()[0]["id"] == profile_id
+
+
+def test_unauthorized_profile_header_is_ignored():
+    """測試未授權的 X-Profile 標頭不會觸發剖析"""
+    store = ProfileStore()
+    token = encode_hs256_jwt({"role": "user"}, SECRET)
+    with TestClient(_build_app(store)) as client:
+        without_token = client.get("/slow", headers={"X-Profile": "1"})
+        non_admin = client.get(
+            "/slow", headers={"X-Profile": "1", "Authorization": f"Bearer {token}"}
+        )
+
+    assert without_token.status_code == 200
+    assert "X-Profile-ID" not in without_token.headers
+    assert "X-Profile-ID" not in non_admin.headers
+    assert store.list() == []
+
+
+def test_sampled_profiling():
+    """測試依比例抽樣剖析"""
+    store = ProfileStore()
+    with TestClient(_build_app(store, sample_rate=0.5, rand=lambda: 0.1)) as client:
+        response = client.get("/slow")
+
+    assert store.get(response.headers["X-Profile-ID"]).trigger == "sampled"
+
+
+def test_profile_store_keeps_most_recent():
+    """測試剖析結果只保留最近的數量"""
+    store = ProfileStore(max_profiles=2)
+    for index in range(3):
+        store.add(
+            ProfileRecord(
+                id=str(index),
+                method="GET",
+                path="/",
+                request_id="",
+                status_code=200,
+                duration_ms=1.0,
+                sample_count=1,
+                trigger="header",
+                created_at="",
+                speedscope={},
+            )
+        )
+
+    assert [summary["id"] for summary in store.list()] == ["2", "1"]
+    assert store.get("0") is None
+
+
+def test_admin_profile_endpoints():
+    """測試管理端點可列出與下載剖析結果"""
+    profile_store.clear()
+    profile_store.add(
+        ProfileRecord(
+            id="abc",
+            method="GET",
+            path="/api/v1/hotspots/all",
+            request_id="req-1",
+            status_code=200,
+            duration_ms=12.5,
+            sample_count=3,
+            trigger="header",
+            created_at="2025-01-01T00:00:00+00:00",
+            speedscope={"profiles": []},
+        )
+    )
+    try:
+        listed = asyncio.run(list_profiles())
+        response = asyncio.run(get_profile("abc"))
+
+        assert listed["data"][0]["path"] == "/api/v1/hotspots/all"
+        assert json.loads(response.body) == {"profiles": []}
+        assert "speedscope.json" in response.headers["Content-Disposition"]
+        with pytest.raises(NotFoundError):
+            asyncio.run(get_profile("missing"))
+    finally:
+        profile_store.clear()
@@ -0,0 +1,194 @@
+"""Unit test for 速率限制（GCRA token bucket）"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.core.middleware import (
+    DEFAULT_BUDGET,
+    EXPENSIVE_BUDGET,
+    RateLimitMiddleware,
+    TokenBucketLimiter,
+    default_route_costs,
+)
+
+
+class FakeClock:
+    """可手動推進的時間來源"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_allows_burst_then_rejects(clock):
+    """測試允許 burst_size 個突發請求後拒絕"""
+    limiter = TokenBucketLimiter(requests_per_minute=60, burst_size=10, clock=clock)
+
+    results = [limiter.acquire("1.2.3.4") for _ in range(11)]
+
+    assert results[:10] == [0.0] * 10
+    assert results[10] == pytest.approx(1.0)
+
+
+def test_refills_at_sustained_rate(clock):
+    """測試依每分鐘請求數補充 token"""
+    limiter = TokenBucketLimiter(requests_per_minute=60, burst_size=2, clock=clock)
+    limiter.acquire("client")
+    limiter.acquire("client")
+    assert limiter.acquire("client") > 0
+
+    clock.now += 1.0
+    assert limiter.acquire("client") == 0.0
+    assert limiter.acquire("client") > 0
+
+
+def test_rejected_request_does_not_consume_token(clock):
+    """測試被拒絕的請求不會延長等待時間"""
+    limiter = TokenBucketLimiter(requests_per_minute=60, burst_size=1, clock=clock)
+    limiter.acquire("client")
+    first = limiter.acquire("client")
+    second = limiter.acquire("client")
+
+    assert first == pytest.approx(second)
+
+
+def test_clients_are_independent(clock):
+    """測試不同客戶端各自計算"""
+    limiter = TokenBucketLimiter(requests_per_minute=60, burst_size=1, clock=clock)
+
+    assert limiter.acquire("a") == 0.0
+    assert limiter.acquire("b") == 0.0
+    assert limiter.acquire("a") > 0
+
+
+def test_remaining_tokens(clock):
+    """測試剩餘 token 數"""
+    limiter = TokenBucketLimiter(requests_per_minute=60, burst_size=5, clock=clock)
+    assert limiter.remaining("client") == 5
+
+    limiter.acquire("client")
+    limiter.acquire("client")
+    assert limiter.remaining("client") == 3
+
+
+def test_idle_clients_are_evicted(clock):
+    """測試超過追蹤上限時淘汰最久未使用的客戶端"""
+    limiter = TokenBucketLimiter(
+        requests_per_minute=60, burst_size=1, max_clients=100, clock=clock
+    )
+    for i in range(1000):
+        limiter.acquire(f"10.0.{i // 256}.{i % 256}")
+
+    assert len(limiter) == 100
+
+
+def test_middleware_returns_429_with_retry_after():
+    """測試超過限制時回傳 429 與 Retry-After 標頭"""
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    app.add_middleware(RateLimitMiddleware, requests_per_minute=60, burst_size=2)
+
+    with TestClient(app) as client:
+        assert client.get("/ping").status_code == 200
+        assert client.get("/ping").status_code == 200
+        response = client.get("/ping")
+
+    assert response.status_code == 429
+    assert response.json()["error"] == "rate_limit_exceeded"
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def _build_cost_app(**middleware_kwargs) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get("/api/v1/hotspots/{hotspot_id}")
+    async def detail(hotspot_id: str, include_accidents: bool = False):
+        return {"id": hotspot_id}
+
+    app.add_middleware(RateLimitMiddleware, **middleware_kwargs)
+    return app
+
+
+def test_resolve_route_costs():
+    """測試路由成本與額度對應"""
+    middleware = RateLimitMiddleware(
+        None,
+        route_costs=default_route_costs(),
+        budgets={EXPENSIVE_BUDGET: TokenBucketLimiter(30, 20)},
+    )
+
+    assert middleware.resolve_cost("/api/v1/health", b"") == (0.2, DEFAULT_BUDGET)
+    assert middleware.resolve_cost("/api/v1/hotspots/all", b"")[1] == DEFAULT_BUDGET
+    assert middleware.resolve_cost("/api/v1/hotspots/abc", b"") == (1.0, DEFAULT_BUDGET)
+    assert middleware.resolve_cost("/api/v1/hotspots/abc", b"include_accidents=true") == (
+        5,
+        EXPENSIVE_BUDGET,
+    )
+    assert middleware.resolve_cost("/api/v1/hotspots/abc", b"include_accidents=false") == (
+        1.0,
+        DEFAULT_BUDGET,
+    )
+
+
+def test_cheap_routes_cost_fraction_of_token():
+    """測試低成本路由可在同一額度內送出更多請求"""
+    app = _build_cost_app(
+        requests_per_minute=60, burst_size=2, route_costs=default_route_costs()
+    )
+
+    with TestClient(app) as client:
+        statuses = [client.get("/api/v1/health").status_code for _ in range(10)]
+
+    assert statuses == [200] * 10
+
+
+def test_expensive_budget_is_separate():
+    """測試昂貴操作耗盡獨立額度時不影響一般請求"""
+    app = _build_cost_app(
+        requests_per_minute=60,
+        burst_size=5,
+        route_costs=default_route_costs(),
+        budgets={EXPENSIVE_BUDGET: TokenBucketLimiter(requests_per_minute=30, burst_size=5)},
+    )
+
+    with TestClient(app) as client:
+        expensive = [
+            client.get("/api/v1/hotspots/abc", params={"include_accidents": "true"}).status_code
+            for _ in range(2)
+        ]
+        cheap = client.get("/api/v1/hotspots/abc").status_code
+
+    assert expensive == [200, 429]
+    assert cheap == 200
+
+
+def test_debit_charges_measured_cost(clock):
+    """測試依實際耗時追加扣除 token"""
+    limiter = TokenBucketLimiter(requests_per_minute=60, burst_size=10, clock=clock)
+    limiter.acquire("client")
+    limiter.debit("client", 4)
+
+    assert limiter.remaining("client") == 5
+
+
+def test_debit_debt_is_bounded(clock):
+    """測試追加扣除的欠額有上限"""
+    limiter = TokenBucketLimiter(requests_per_minute=60, burst_size=10, clock=clock)
+    limiter.debit("client", 10_000)
+
+    assert limiter.acquire("client") == pytest.approx(11.0)
@@ -0,0 +1,120 @@
+"""Unit test for 請求耗時中介層"""
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.core.logging import RequestTimingMiddleware
+from src.core.request_context import (
+    PHASE_MERGE,
+    PHASE_SERIALIZE,
+    RequestContext,
+    timed_phase,
+)
+
+
+def _build_app(**options) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/phases")
+    def phases():
+        with timed_phase(PHASE_MERGE):
+            pass
+        with timed_phase(PHASE_SERIALIZE):
+            data = {"ok": True}
+        return data
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk-{i}\n".encode()
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    app.add_middleware(RequestTimingMiddleware, **options)
+    return app
+
+
+def test_adds_response_time_header():
+    """測試回應包含耗時標頭"""
+    with TestClient(_build_app()) as client:
+        response = client.get("/ping")
+
+    assert response.status_code == 200
+    assert float(response.headers["X-Response-Time-ms"]) >= 0
+
+
+def test_streaming_response_passes_through():
+    """測試串流回應可完整傳遞"""
+    with TestClient(_build_app()) as client:
+        response = client.get("/stream")
+
+    assert response.text == "chunk-0\nchunk-1\nchunk-2\n"
+    assert "X-Response-Time-ms" in response.headers
+
+
+def test_logs_request(caplog):
+    """測試請求完成後記錄日誌"""
+    with TestClient(_build_app()) as client, caplog.at_level("INFO", logger="api.request"):
+        client.get("/ping?x=1")
+
+    assert any("/ping" in record.getMessage() for record in caplog.records)
+
+
+def _parse_server_timing(value: str) -> dict:
+    entries = {}
+    for entry in value.split(","):
+        name, duration = entry.strip().split(";dur=")
+        entries[name] = float(duration)
+    return entries
+
+
+def test_server_timing_reports_phases():
+    """測試 Server-Timing 標頭包含路由中經過的階段與總耗時"""
+    with TestClient(_build_app(timing_allow_origin="*")) as client:
+        response = client.get("/phases")
+
+    timings = _parse_server_timing(response.headers["Server-Timing"])
+    assert set(timings) == {"merge", "serialize", "total"}
+    assert timings["total"] >= timings["merge"]
+    assert response.headers["Timing-Allow-Origin"] == "*"
+
+
+def test_server_timing_can_be_disabled():
+    """測試可停用 Server-Timing 標頭"""
+    with TestClient(_build_app(server_timing=False, timing_allow_origin="*")) as client:
+        response = client.get("/ping")
+
+    assert "Server-Timing" not in response.headers
+    assert "Timing-Allow-Origin" not in response.headers
+
+
+def test_server_timing_includes_db_time():
+    """測試有查詢時輸出 db 階段"""
+    context = RequestContext()
+    context.record_query("SELECT 1", 1.5)
+    context.add_phase("orm-hydrate", 0.25)
+    context.add_phase("orm-hydrate", 0.25)
+
+    assert context.server_timing(3) == "db;dur=1.50, orm-hydrate;dur=0.50, total;dur=3.00"
+
+
+def test_timed_phase_outside_request_is_noop():
+    """測試不在請求中時計時不會出錯"""
+    with timed_phase(PHASE_MERGE):
+        value = 1
+    assert value == 1
+
+
+def test_request_id_is_generated_and_propagated():
+    """測試沿用合法的 X-Request-ID，否則產生新的"""
+    with TestClient(_build_app()) as client:
+        propagated = client.get("/ping", headers={"X-Request-ID": "trace-123"})
+        generated = client.get("/ping", headers={"X-Request-ID": "bad id\n"})
+
+    assert propagated.headers["X-Request-ID"] == "trace-123"
+    assert generated.headers["X-Request-ID"] not in ("", "bad id\n")
@@ -0,0 +1,186 @@
+"""Unit test for SQL 查詢監測與 N+1 偵測"""
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+
+from src.core.logging import RequestTimingMiddleware
+from src.core.request_context import (
+    MAX_RECORDED_STATEMENTS,
+    RequestContext,
+    get_request_context,
+    reset_request_context,
+    sql_fingerprint,
+    start_request_context,
+)
+from src.db.instrumentation import (
+    _is_read_only_select,
+    install_query_instrumentation,
+    report_request_queries,
+)
+
+
+def _instrumented_engine():
+    engine = create_engine("sqlite://")
+    install_query_instrumentation(engine)
+    return engine
+
+
+def test_records_queries_into_current_context():
+    """測試查詢會累加到目前請求的上下文"""
+    engine = _instrumented_engine()
+    context, token = start_request_context("GET", "/test")
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+    finally:
+        reset_request_context(token)
+
+    assert context.query_count == 2
+    assert context.db_time_ms >= 0
+    assert get_request_context() is None
+
+
+def test_queries_outside_request_are_ignored():
+    """測試不在請求中的查詢不會出錯"""
+    engine = _instrumented_engine()
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_failed_explain_keeps_outer_transaction_usable(caplog):
+    """測試 EXPLAIN 失敗時只回滾到 SAVEPOINT，請求的交易仍可繼續使用並提交"""
+    engine = create_engine("sqlite://")
+    install_query_instrumentation(engine, explain_slow_ms=1e-9)
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    context, token = start_request_context("GET", "/test")
+    try:
+        with engine.connect() as conn, caplog.at_level(logging.WARNING):
+            conn.execute(text("CREATE TABLE t (id INTEGER)"))
+            conn.execute(text("INSERT INTO t VALUES (1)"))
+            # SQLite 不支援 EXPLAIN (ANALYZE, BUFFERS)，模擬 EXPLAIN 失敗
+            assert conn.execute(text("SELECT id FROM t")).scalar() == 1
+            conn.execute(text("INSERT INTO t VALUES (2)"))
+            conn.commit()
+            assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 2
+    finally:
+        reset_request_context(token)
+
+    assert "EXPLAIN 失敗" in caplog.text
+    assert any(statement.startswith("ROLLBACK TO SAVEPOINT") for statement in statements)
+    assert context.query_count == 5
+
+
+def test_explain_only_read_only_selects():
+    """測試只對唯讀 SELECT 執行 EXPLAIN ANALYZE"""
+    assert _is_read_only_select("SELECT * FROM hotspots WHERE id = %(id)s")
+    assert _is_read_only_select("WITH recent AS (SELECT * FROM accidents) SELECT * FROM recent")
+    assert not _is_read_only_select("SELECT * FROM hotspots FOR UPDATE")
+    assert not _is_read_only_select("SELECT * FROM hotspots FOR NO KEY UPDATE SKIP LOCKED")
+    assert not _is_read_only_select("SELECT * FROM accidents FOR SHARE")
+    assert not _is_read_only_select(
+        "WITH moved AS (UPDATE hotspots SET analysis_run_id = 1 RETURNING id) SELECT * FROM moved"
+    )
+    assert not _is_read_only_select(
+        "WITH gone AS (DELETE FROM hotspots RETURNING id) SELECT count(*) FROM gone"
+    )
+    assert not _is_read_only_select("INSERT INTO hotspots SELECT * FROM staging")
+
+
+def test_recorded_statements_are_bounded():
+    """測試保留的語句數有上限，但查詢數仍完整計算"""
+    context = RequestContext()
+    for i in range(MAX_RECORDED_STATEMENTS + 10):
+        context.record_query(f"SELECT {i}", 1.0)
+
+    assert context.query_count == MAX_RECORDED_STATEMENTS + 10
+    assert len(context.statements) == MAX_RECORDED_STATEMENTS
+
+
+def test_report_flags_repeated_statements(caplog):
+    """測試重複語句被標示為疑似 N+1"""
+    context = RequestContext(method="GET", path="/api/v1/hotspots/all")
+    context.record_query("SELECT * FROM hotspots", 3.0)
+    for _ in range(12):
+        context.record_query("SELECT * FROM accidents WHERE id = %(id)s", 1.0)
+
+    with caplog.at_level(logging.WARNING):
+        assert report_request_queries(context, 100, 1000, 10) is True
+
+    assert "疑似 N+1（重複 12 次）" in caplog.text
+    assert "FROM accidents WHERE id" in caplog.text
+
+
+def test_sql_fingerprint_normalizes_literals_and_in_lists():
+    """測試 SQL 指紋將字面值、綁定參數與 IN 清單正規化"""
+    assert sql_fingerprint(
+        "SELECT * FROM accidents\n WHERE id IN (%(id_1_1)s, %(id_1_2)s, %(id_1_3)s)"
+    ) == "SELECT * FROM accidents WHERE id IN (?)"
+    assert sql_fingerprint(
+        "SELECT * FROM hotspots WHERE severity = 'A1' AND count > 3 AND x::numeric = :x_1"
+    ) == "SELECT * FROM hotspots WHERE severity = ? AND count > ? AND x::numeric = ?"
+
+
+def test_report_groups_statements_by_fingerprint(caplog):
+    """測試只差在參數或 IN 清單長度的語句合併計算重複次數"""
+    context = RequestContext(method="GET", path="/api/v1/hotspots/all")
+    for i in range(1, 11):
+        ids = ", ".join(f"%(id_1_{j})s" for j in range(i))
+        context.record_query(f"SELECT * FROM accidents WHERE id IN ({ids}) AND severity = {i}", 1.0)
+
+    with caplog.at_level(logging.WARNING):
+        assert report_request_queries(context, 100, 1000, 10) is True
+
+    assert "疑似 N+1（重複 10 次）: SELECT * FROM accidents WHERE id IN (?) AND severity = ?" in caplog.text
+
+
+def test_report_within_thresholds_is_silent(caplog):
+    """測試未超過門檻時不記錄"""
+    context = RequestContext(method="GET", path="/api/v1/health")
+    context.record_query("SELECT 1", 0.5)
+
+    with caplog.at_level(logging.WARNING):
+        assert report_request_queries(context, 20, 500, 10) is False
+
+    assert caplog.text == ""
+
+
+def test_report_flags_slow_requests(caplog):
+    """測試資料庫耗時超過門檻時記錄語句"""
+    context = RequestContext(method="GET", path="/api/v1/hotspots/all")
+    context.record_query("SELECT * FROM hotspots", 800.0)
+
+    with caplog.at_level(logging.WARNING):
+        assert report_request_queries(context, 20, 500, 10) is True
+
+    assert "資料庫耗時 800.00ms" in caplog.text
+
+
+def test_middleware_reports_n_plus_one(caplog):
+    """測試中介層在同步路由中統計查詢並回報 N+1"""
+    engine = _instrumented_engine()
+    app = FastAPI()
+
+    @app.get("/n-plus-one")
+    def n_plus_one():
+        with engine.connect() as conn:
+            for i in range(5):
+                conn.execute(text("SELECT :value"), {"value": i})
+        return {"ok": True}
+
+    app.add_middleware(RequestTimingMiddleware, max_queries=100, repeated_statement_threshold=5)
+
+    with caplog.at_level(logging.INFO):
+        with TestClient(app) as client:
+            response = client.get("/n-plus-one")
+
+    assert response.status_code == 200
+    assert "查詢=5 次" in caplog.text
+    assert "疑似 N+1（重複 5 次）" in caplog.text
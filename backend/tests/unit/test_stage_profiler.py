@@ -0,0 +1,66 @@
+"""Unit test for 分段量測"""
+import tracemalloc
+
+import pytest
+
+from src.core.stage_profiler import StageProfiler
+
+
+def test_records_stage_timings_and_rows():
+    """測試記錄各階段耗時與資料筆數"""
+    profiler = StageProfiler()
+    with profiler.stage("fetch_accidents") as stage:
+        stage.rows = 3
+    with profiler.stage("dbscan_fit", rows=3):
+        sum(range(10_000))
+
+    assert [stage.name for stage in profiler.stages] == ["fetch_accidents", "dbscan_fit"]
+    assert profiler.rows_for("fetch_accidents") == 3
+    assert profiler.rows_for("missing") is None
+    assert profiler.total_wall_ms >= 0
+    assert profiler.peak_memory_bytes is None
+
+
+def test_records_stage_when_exception_raised():
+    """測試階段發生例外時仍會記錄"""
+    profiler = StageProfiler()
+    with pytest.raises(ValueError):
+        with profiler.stage("db_write"):
+            raise ValueError("boom")
+
+    assert profiler.stages[0].name == "db_write"
+
+
+def test_trace_memory_records_peak_per_stage():
+    """測試 tracemalloc 依階段記錄記憶體峰值"""
+    profiler = StageProfiler(trace_memory=True)
+    with profiler.stage("big"):
+        data = bytearray(5 * 1024 * 1024)
+        del data
+    with profiler.stage("small"):
+        pass
+    profiler.finish()
+
+    big, small = profiler.stages
+    assert big.peak_memory_bytes >= 5 * 1024 * 1024
+    assert small.peak_memory_bytes < big.peak_memory_bytes
+    assert profiler.peak_memory_bytes == big.peak_memory_bytes
+    assert not tracemalloc.is_tracing()
+
+
+def test_as_dicts_is_json_ready():
+    """測試輸出可存入 JSONB 的格式"""
+    profiler = StageProfiler()
+    with profiler.stage("radius", rows=2):
+        pass
+
+    (stage,) = profiler.as_dicts()
+    assert set(stage) == {
+        "name",
+        "wall_ms",
+        "cpu_ms",
+        "peak_memory_bytes",
+        "max_rss_bytes",
+        "rows",
+    }
+    assert "radius" in profiler.format_table()
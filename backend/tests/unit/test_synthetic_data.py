@@ -0,0 +1,71 @@
+"""Unit test for 大量合成資料產生器"""
+from datetime import date
+import csv
+import io
+import json
+import uuid
+
+import numpy as np
+
+from src.scripts.generate_synthetic_data import (
+    ACCIDENT_COLUMNS,
+    INTERSECTIONS,
+    accident_csv,
+    fixed_point_strings,
+    generate_accidents,
+    hotspot_csv,
+    summarize_clusters,
+)
+
+ANALYSIS_DATE = date(2025, 10, 1)
+
+
+def _generate(count: int = 5000):
+    rng = np.random.default_rng(7)
+    accidents, anchors = generate_accidents(count, 365, ANALYSIS_DATE, rng, cluster_count=40)
+    return accidents, anchors, rng
+
+
+def test_summaries_match_per_cluster_computation():
+    """測試向量化的群集統計與逐群集計算結果一致"""
+    accidents, _, _ = _generate()
+    summary = summarize_clusters(accidents, ANALYSIS_DATE, 90, min_accidents=5)
+
+    assert len(summary.members) == len(summary.counts) > 0
+    for index, members in enumerate(summary.members):
+        assert len(members) == summary.counts[index] >= 5
+        assert len(set(accidents.cluster[members])) == 1
+        assert np.isclose(summary.center_latitude[index], accidents.latitude[members].mean())
+        assert summary.severity_counts[index].sum() == summary.counts[index]
+        assert summary.earliest[index] == accidents.occurred_at[members].min()
+        assert 50 <= summary.radius_meters[index] <= 2000
+
+    window_start = ANALYSIS_DATE.toordinal() - date(1970, 1, 1).toordinal() - 90
+    assert summary.earliest.min() >= window_start * 86400
+
+
+def test_csv_rows_are_copy_ready():
+    """測試事故與熱點 CSV 的欄位數、UUID 與 accident_ids 格式"""
+    accidents, anchors, rng = _generate(2000)
+    location_texts = [INTERSECTIONS[anchor][0] for anchor in anchors]
+
+    rows = list(
+        csv.reader(io.StringIO(accident_csv(accidents, 0, 2000, location_texts, "test", "now")))
+    )
+    assert len(rows) == 2000
+    assert all(len(row) == len(ACCIDENT_COLUMNS) for row in rows)
+    assert all(uuid.UUID(row[0]).version == 4 for row in rows)
+    # 背景事故的地點描述為空欄位（COPY 視為 NULL）
+    assert {row[4] == "" for row in rows} == {True, False}
+
+    summary = summarize_clusters(accidents, ANALYSIS_DATE, 365, min_accidents=5)
+    hotspot = next(csv.reader(io.StringIO(hotspot_csv(summary, accidents, rng, "now"))))
+    accident_ids = json.loads(hotspot[15])
+    assert len(accident_ids) == int(hotspot[5])
+    assert set(accident_ids) <= {row[0] for row in rows}
+
+
+def test_fixed_point_strings():
+    """測試座標字串固定為小數點後 7 位"""
+    values = np.array([25.0416, -0.5, 121.1234567])
+    assert fixed_point_strings(values).tolist() == ["25.0416000", "-0.5000000", "121.1234567"]
@@ -0,0 +1,230 @@
+"""ETL 熱點迴圈微基準：以合成的 MOI 格式資料量測各階段每秒處理筆數。
+
+量測 `etl_moi_a1.py` / `etl_moi_a3.py` 中逐筆執行的函式（A2 與 A1 共用相同實作）：
+
+- normalize_location_text（A3 發生地點正規化，十餘次 regex）
+- parse_occurrence_time（A3 民國年時間字串）
+- parse_occurrence_datetime（A1/A2 年/月/日/時間欄位）
+- aggregate_rows（A1/A2 依時間+地點聚合多車事故）
+- aggregate_vehicle_rows（A3 依時間+地點聚合車種）
+- prepare_payloads（A1/A2 轉為寫入資料庫的 tuple）
+
+合成資料模仿實際 MOI 資料的雜訊：「/」分隔的兩個路口、括號註記、國道里程、
+燈桿編號、「口/前/附近/對面」後綴、全形符號與多餘空白，以及部分格式錯誤的時間。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+import etl_moi_a1
+import etl_moi_a3
+
+CITIES = ("臺北市", "台北市")
+DISTRICTS = ("中正區", "大安區", "信義區", "中山區", "松山區", "萬華區", "士林區", "內湖區", "文山區", "北投區")
+ROADS = (
+    "忠孝東路", "信義路", "仁愛路", "敦化南路", "復興北路", "中山北路", "羅斯福路",
+    "基隆路", "承德路", "民生東路", "南京東路", "和平東路", "市民大道", "環河南路",
+)
+SECTIONS = ("一段", "二段", "三段", "四段", "五段", "1段", "2段", "3段")
+LANDMARKS = ("捷運站出口", "家樂福", "國小", "加油站", "公車站")
+SUFFIXES = ("前", "附近", "旁", "對面", "口")
+DIRECTIONS = ("東側", "西側", "南側", "北側")
+VEHICLES = ("自用-小客車", "機車", "營業用-計程車", "腳踏自行車", "營業用-公車", "租賃車-小客車(含客、貨兩用)")
+
+LOCATION_TEMPLATES: tuple[Callable[[random.Random], str], ...] = (
+    lambda r: f"{_area(r)}{_road(r)}{r.randint(1, 400)}號{r.choice(SUFFIXES)}",
+    lambda r: f"{_area(r)}{_road(r)}與{r.choice(ROADS)}口",
+    lambda r: f"{_area(r)}{_road(r)}口 / {_area(r)}{r.choice(ROADS)}口",
+    lambda r: f"{_area(r)}{_road(r)}{r.randint(1, 300)}巷{r.randint(1, 30)}弄{r.randint(1, 60)}號{r.choice(DIRECTIONS)}",
+    lambda r: f"{_area(r)}國道1號 {r.randint(1, 30)}公里{r.randint(0, 9)}00.0公尺處{r.choice(('南', '北'))}側向內側",
+    lambda r: f"{_area(r)}{_road(r)}（{r.choice(LANDMARKS)}）{r.choice(SUFFIXES)}",
+    lambda r: f"{_area(r)}{_road(r)}燈桿{r.randint(1, 999)}號附近",
+    lambda r: f"{_area(r)}{_road(r)}{r.randint(1, 400)}號前0.0公尺",
+    lambda r: f"{_area(r)}{_road(r)}、{r.choice(ROADS)}{r.randint(1, 200)}巷",
+    lambda r: f"  {_area(r)}{_road(r)}{r.choice(DIRECTIONS)}車道  ",
+    lambda r: f"{_area(r)}{_road(r)}{r.randint(1, 400)}號",
+)
+
+
+def _area(rng: random.Random) -> str:
+    return rng.choice(CITIES) + rng.choice(DISTRICTS)
+
+
+def _road(rng: random.Random) -> str:
+    road = rng.choice(ROADS)
+    return road + rng.choice(SECTIONS) if rng.random() < 0.6 else road
+
+
+def generate_a3_rows(count: int, rng: random.Random, duplicate_ratio: float) -> list[dict]:
+    """產生 A3 原始資料列（發生時間、發生地點、車種）。"""
+    rows: list[dict] = []
+    for index in range(count):
+        if rows and rng.random() < duplicate_ratio:
+            # 多車事故：相同時間與地點、不同車種
+            base = rng.choice(rows[-50:])
+            occurrence_time, location = base["occurrence_time"], base["location"]
+        else:
+            roll = rng.random()
+            if roll < 0.95:
+                occurrence_time = (
+                    f"114年{rng.randint(1, 12):02d}月{rng.randint(1, 28):02d}日 "
+                    f"{rng.randint(0, 23):02d}時{rng.randint(0, 59):02d}分{rng.randint(0, 59):02d}秒"
+                )
+            elif roll < 0.98:
+                occurrence_time = f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T08:30:00"
+            else:
+                occurrence_time = "時間不詳"
+            location = rng.choice(LOCATION_TEMPLATES)(rng)
+        rows.append(
+            {
+                "source_id": f"A3-{index}",
+                "occurrence_time": occurrence_time,
+                "location": location,
+                "vehicle_type": ";".join(rng.sample(VEHICLES, rng.randint(1, 2))),
+            }
+        )
+    return rows
+
+
+def generate_a1_rows(count: int, rng: random.Random, duplicate_ratio: float) -> list[dict]:
+    """產生 A1/A2 原始資料列（年/月/日/時間分欄，含經緯度）。"""
+    rows: list[dict] = []
+    for index in range(count):
+        if rows and rng.random() < duplicate_ratio:
+            row = dict(rng.choice(rows[-50:]))
+        else:
+            month, day = rng.randint(1, 12), rng.randint(1, 28)
+            hour, minute, second = rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 59)
+            time_format = rng.random()
+            if time_format < 0.7:
+                occurrence_time = f"{hour:02d}{minute:02d}{second:02d}"
+            elif time_format < 0.9:
+                occurrence_time = f"{hour}{minute:02d}{second:02d}"
+            else:
+                occurrence_time = f"{hour:02d}:{minute:02d}:{second:02d}"
+            row = {
+                "occurrence_year": "2025",
+                "occurrence_month": str(month),
+                "occurrence_date": f"2025{month:02d}{day:02d}",
+                "occurrence_time": occurrence_time,
+                "location": rng.choice(LOCATION_TEMPLATES)(rng).strip(),
+                "longitude": f"{121.5 + rng.uniform(-0.08, 0.08):.6f}",
+                "latitude": f"{25.04 + rng.uniform(-0.06, 0.06):.6f}",
+            }
+        row["source_id"] = f"A1-{index}"
+        row[etl_moi_a1.VEHICLE_COLUMN] = rng.choice(VEHICLES)
+        rows.append(row)
+    return rows
+
+
+def measure(stage: Callable[[], object], rows: int, repeat: int) -> dict:
+    """重複執行階段，回傳每秒處理筆數（取最佳與中位數）。"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stage()
+        durations.append(time.perf_counter() - start)
+    best, median = min(durations), statistics.median(durations)
+    return {
+        "rows": rows,
+        "best_seconds": round(best, 4),
+        "median_seconds": round(median, 4),
+        "rows_per_sec": round(rows / best),
+        "median_rows_per_sec": round(rows / median),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ETL 熱點迴圈微基準")
+    parser.add_argument("--rows", type=int, default=200_000, help="合成資料筆數。")
+    parser.add_argument("--repeat", type=int, default=5, help="每個階段重複次數（取最佳值）。")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.2, help="多車事故（相同時間+地點）比例。")
+    parser.add_argument("--seed", type=int, default=7, help="亂數種子。")
+    parser.add_argument("--output", default=None, help="結果 JSON 輸出路徑。")
+    parser.add_argument("--baseline", default=None, help="要比較的先前結果 JSON。")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    rng = random.Random(args.seed)
+
+    print(f"[INFO] 產生 {args.rows:,} 筆合成資料…")
+    a3_rows = generate_a3_rows(args.rows, rng, args.duplicate_ratio)
+    a1_rows = generate_a1_rows(args.rows, rng, args.duplicate_ratio)
+    a3_locations = [row["location"] for row in a3_rows]
+    a3_times = [row["occurrence_time"] for row in a3_rows]
+    a1_time_fields = [
+        (row["occurrence_year"], row["occurrence_month"], row["occurrence_date"], row["occurrence_time"])
+        for row in a1_rows
+    ]
+    # prepare_payloads 的輸入為聚合後的資料列；格式錯誤的資料列會逐筆印出警告，這裡只量測正常資料
+    aggregated_a1 = etl_moi_a1.aggregate_rows(a1_rows)
+
+    stages: dict[str, tuple[Callable[[], object], int]] = {
+        "normalize_location_text": (
+            lambda: [etl_moi_a3.normalize_location_text(value) for value in a3_locations],
+            len(a3_locations),
+        ),
+        "parse_occurrence_time": (
+            lambda: [etl_moi_a3.parse_occurrence_time(value) for value in a3_times],
+            len(a3_times),
+        ),
+        "parse_occurrence_datetime": (
+            lambda: [etl_moi_a1.parse_occurrence_datetime(*fields) for fields in a1_time_fields],
+            len(a1_time_fields),
+        ),
+        "aggregate_rows": (lambda: etl_moi_a1.aggregate_rows(a1_rows), len(a1_rows)),
+        "aggregate_vehicle_rows": (lambda: etl_moi_a3.aggregate_vehicle_rows(a3_rows), len(a3_rows)),
+        "prepare_payloads": (lambda: etl_moi_a1.prepare_payloads(aggregated_a1), len(aggregated_a1)),
+    }
+
+    results: dict[str, dict] = {}
+    for name, (stage, count) in stages.items():
+        results[name] = measure(stage, count, args.repeat)
+        print(f"[INFO] {name:<28}{results[name]['rows_per_sec']:>12,} rows/sec")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)["results"]
+        print()
+        print(f"{'stage':<28}{'baseline':>14}{'current':>14}{'change':>10}")
+        for name, result in results.items():
+            previous = baseline.get(name)
+            if not previous:
+                continue
+            change = (result["rows_per_sec"] / previous["rows_per_sec"] - 1) * 100
+            print(
+                f"{name:<28}{previous['rows_per_sec']:>14,}{result['rows_per_sec']:>14,}{change:>+9.0f}%"
+            )
+
+    if args.output:
+        report = {
+            "benchmark": "etl",
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "parameters": {
+                "rows": args.rows,
+                "repeat": args.repeat,
+                "duplicate_ratio": args.duplicate_ratio,
+                "seed": args.seed,
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, ensure_ascii=False, indent=2)
+        print(f"[INFO] 結果已寫入 {args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,39 +6,47 @@ ETL Script: 從 accidents table 生成 hotspots table
 1. 從 accidents table 讀取指定時間範圍的事故資料
 2. 使用 DBSCAN 聚類演算法識別事故熱點
 3. 計算每個熱點的統計資訊（中心點、半徑、事故數等）
-4. 將結果寫入 hotspots table
+4. 以 COPY 寫入 hotspots table，並在同一個交易中將發佈指標（hotspot_publications）切換到新版本
 
 使用範例：
   uv run python data/generate_hotspots.py --database-url "$DATABASE_URL"
   uv run python data/generate_hotspots.py --period-days 365 --min-accidents 5
+  uv run python data/generate_hotspots.py --database-url "$DATABASE_URL" --periods 30,90,180,365
 """
 
 import argparse
 import sys
 from datetime import datetime, timedelta, date, timezone
 from decimal import Decimal
-from typing import List, Dict, Tuple
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
 import uuid
 import json
 
 try:
     import psycopg2
-    from psycopg2.extras import execute_values, RealDictCursor
+    from psycopg2.extras import RealDictCursor
 except ImportError:
     print("❌ 請先安裝 psycopg2: uv add psycopg2-binary", file=sys.stderr)
     sys.exit(1)
 
-try:
-    import numpy as np
-    from sklearn.cluster import DBSCAN
-except ImportError:
-    print("❌ 請先安裝 scikit-learn: uv add scikit-learn", file=sys.stderr)
-    sys.exit(1)
+# 共用後端的分段量測工具與熱點聚類引擎
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+from src.core.stage_profiler import StageProfiler  # noqa: E402
+from src.services.hotspot_publisher import publish_hotspots  # noqa: E402
 
 try:
-    from geopy.distance import geodesic
+    import numpy as np  # noqa: E402
+    # hotspot_engine 依賴 scikit-learn
+    from src.services.hotspot_engine import (  # noqa: E402
+        cluster_coordinates,
+        cluster_windows,
+        encode_severities,
+        summarize_clusters,
+        window_sizes,
+    )
 except ImportError:
-    print("❌ 請先安裝 geopy: uv add geopy", file=sys.stderr)
+    print("❌ 請先安裝 scikit-learn: uv add scikit-learn", file=sys.stderr)
     sys.exit(1)
 
 
@@ -62,6 +70,20 @@ def parse_args():
         help="分析過去幾天的事故資料 (預設: 365)",
     )
 
+    parser.add_argument(
+        "--periods",
+        type=str,
+        default=None,
+        help="一次分析多個期間（天，逗號分隔，例如 30,90,180,365；指定時忽略 --period-days）",
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="多期間模式平行執行 DBSCAN 的 worker 行程數 (預設: 1，依序執行)",
+    )
+
     parser.add_argument(
         "--epsilon-meters",
         type=int,
@@ -79,7 +101,7 @@ def parse_args():
     parser.add_argument(
         "--clear-existing",
         action="store_true",
-        help="清除現有的 hotspots 資料",
+        help="發佈新版本後刪除同一分析期間的舊熱點",
     )
 
     parser.add_argument(
@@ -88,6 +110,12 @@ def parse_args():
         help="測試模式：不寫入資料庫",
     )
 
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="以 tracemalloc 量測各階段記憶體峰值（會拖慢執行）",
+    )
+
     return parser.parse_args()
 
 
@@ -124,80 +152,44 @@ def fetch_accidents(conn, cutoff_date: datetime) -> List[Dict]:
     return accidents
 
 
+def build_coordinates(accidents: List[Dict]) -> np.ndarray:
+    """將事故記錄轉換為 (緯度, 經度) 座標陣列"""
+    return np.array(
+        [[float(acc["latitude"]), float(acc["longitude"])] for acc in accidents]
+    )
+
+
 def perform_dbscan_clustering(
-    accidents: List[Dict], epsilon_meters: int, min_samples: int
-) -> Tuple[np.ndarray, np.ndarray]:
+    coordinates: np.ndarray, epsilon_meters: int, min_samples: int
+) -> np.ndarray:
     """
     使用 DBSCAN 演算法進行聚類分析
 
     Args:
-        accidents: 事故記錄列表
+        coordinates: 座標陣列 [[lat, lng], ...]
         epsilon_meters: 聚類半徑（公尺）
         min_samples: 最小事故數
 
     Returns:
-        (coordinates, labels) - 座標陣列和聚類標籤
+        聚類標籤
     """
     print(f"\n🔬 執行 DBSCAN 聚類分析...")
     print(f"   參數: epsilon={epsilon_meters}m, min_samples={min_samples}")
 
-    # 準備座標資料
-    coordinates = np.array(
-        [[float(acc["latitude"]), float(acc["longitude"])] for acc in accidents]
-    )
-
-    # 執行 DBSCAN（使用 haversine 距離計算地球表面距離）
-    # 將 epsilon 從公尺轉換成弧度（haversine 需要弧度單位）
-    EARTH_RADIUS_KM = 6371.0  # 地球平均半徑（公里）
-    epsilon_radians = epsilon_meters / 1000.0 / EARTH_RADIUS_KM
-
-    dbscan = DBSCAN(
-        eps=epsilon_radians,
-        min_samples=min_samples,
-        metric="haversine",
-        algorithm="ball_tree",
+    # 執行 DBSCAN（haversine 距離，epsilon 由引擎換算為弧度）
+    labels = cluster_coordinates(
+        coordinates[:, 0], coordinates[:, 1], epsilon_meters, min_samples
     )
 
-    labels = dbscan.fit_predict(np.radians(coordinates))
-
     # 統計結果
-    unique_labels = set(labels)
-    noise_points = list(labels).count(-1)
-    cluster_count = len(unique_labels) - (1 if -1 in unique_labels else 0)
+    noise_points = int((labels == -1).sum())
+    cluster_count = len(np.unique(labels[labels >= 0]))
 
     print(f"✅ 聚類完成：")
     print(f"   - 發現 {cluster_count} 個熱點")
     print(f"   - 噪音點（未歸類事故）: {noise_points} 筆")
 
-    return coordinates, labels
-
-
-def calculate_hotspot_center(
-    coordinates: List[Tuple[float, float]],
-) -> Tuple[float, float]:
-    """計算熱點中心點（使用平均值）"""
-    lats = [coord[0] for coord in coordinates]
-    lngs = [coord[1] for coord in coordinates]
-    return (sum(lats) / len(lats), sum(lngs) / len(lngs))
-
-
-def calculate_hotspot_radius(
-    coordinates: List[Tuple[float, float]], center: Tuple[float, float]
-) -> int:
-    """計算熱點影響半徑（公尺）"""
-    if not coordinates:
-        return 100  # 預設半徑
-
-    # 計算所有點到中心的距離，取最大值
-    max_distance = 0
-    for coord in coordinates:
-        distance = geodesic(center, coord).meters
-        max_distance = max(max_distance, distance)
-
-    # 加上緩衝區（20%）
-    radius = int(max_distance * 1.2)
-    # 限制在半徑範圍內（50-2000公尺）
-    return max(50, min(2000, radius))
+    return labels
 
 
 def generate_hotspot_records(
@@ -208,6 +200,8 @@ def generate_hotspot_records(
     analysis_period_days: int,
     analysis_period_start: date,
     analysis_period_end: date,
+    profiler: Optional[StageProfiler] = None,
+    stage_name: str = "cluster_stats",
 ) -> List[Dict]:
     """
     根據聚類結果生成熱點記錄
@@ -219,145 +213,268 @@ def generate_hotspot_records(
         min_samples: 最小事故數（過濾用）
         analysis_period_start: 分析期間起始日期
         analysis_period_end: 分析期間結束日期
+        profiler: 分段量測（記錄 cluster_stats 階段）
+        stage_name: 量測階段名稱（多期間模式加上期間後綴）
 
     Returns:
         熱點記錄列表
     """
     print(f"\n📈 生成熱點記錄...")
-
-    hotspots = []
-    unique_labels = set(labels)
-    if -1 in unique_labels:
-        unique_labels.remove(-1)  # 移除噪音點標籤
+    profiler = profiler or StageProfiler()
 
     analysis_date = date.today()
 
-    for label in unique_labels:
-        # 取得此聚類的所有事故
-        cluster_mask = labels == label
-        cluster_indices = np.where(cluster_mask)[0]
-        cluster_accidents = [accidents[i] for i in cluster_indices]
-
-        if len(cluster_accidents) < min_samples:
-            continue
+    # 一次計算所有聚類的中心點、半徑、各嚴重程度事故數與時間範圍
+    with profiler.stage(stage_name) as stage:
+        severities = encode_severities(acc["source_type"] for acc in accidents)
+        occurred_at = np.array([acc["occurred_at"].timestamp() for acc in accidents])
+        summaries = summarize_clusters(
+            labels, coordinates[:, 0], coordinates[:, 1], severities, occurred_at, min_samples
+        )
+        stage.rows = len(summaries)
 
-        # 計算中心點和半徑
-        cluster_coords = [
-            (float(acc["latitude"]), float(acc["longitude"]))
-            for acc in cluster_accidents
-        ]
-        center_lat, center_lng = calculate_hotspot_center(cluster_coords)
-        radius = calculate_hotspot_radius(cluster_coords, (center_lat, center_lng))
-
-        # 統計事故數量（按 source_type 分類）
-        a1_count = sum(1 for acc in cluster_accidents if acc["source_type"] == "A1")
-        a2_count = sum(1 for acc in cluster_accidents if acc["source_type"] == "A2")
-        a3_count = sum(1 for acc in cluster_accidents if acc["source_type"] == "A3")
-
-        # 時間範圍
-        occurred_times = [acc["occurred_at"] for acc in cluster_accidents]
-        earliest = min(occurred_times)
-        latest = max(occurred_times)
-
-        # 事故 ID 列表
-        accident_ids = [acc["id"] for acc in cluster_accidents]
-
-        hotspot = {
-            "id": str(uuid.uuid4()),
-            "center_latitude": Decimal(str(center_lat)).quantize(Decimal("0.0000001")),
-            "center_longitude": Decimal(str(center_lng)).quantize(Decimal("0.0000001")),
-            "radius_meters": radius,
-            "total_accidents": len(cluster_accidents),
-            "a1_count": a1_count,
-            "a2_count": a2_count,
-            "a3_count": a3_count,
-            "earliest_accident_at": earliest,
-            "latest_accident_at": latest,
-            "analysis_date": analysis_date,
-            "analysis_period_days": analysis_period_days,
-            "analysis_period_start": analysis_period_start,
-            "analysis_period_end": analysis_period_end,
-            "accident_ids": json.dumps(accident_ids),
-        }
-
-        hotspots.append(hotspot)
+    hotspots = []
+    for cluster in range(len(summaries)):
+        a1_count, a2_count, a3_count = summaries.severity_counts[cluster].tolist()
+        center_lat = float(summaries.center_latitude[cluster])
+        center_lng = float(summaries.center_longitude[cluster])
+        hotspots.append(
+            {
+                "id": str(uuid.uuid4()),
+                "center_latitude": Decimal(str(center_lat)).quantize(Decimal("0.0000001")),
+                "center_longitude": Decimal(str(center_lng)).quantize(Decimal("0.0000001")),
+                "radius_meters": int(summaries.radius_meters[cluster]),
+                "total_accidents": int(summaries.counts[cluster]),
+                "a1_count": a1_count,
+                "a2_count": a2_count,
+                "a3_count": a3_count,
+                "earliest_accident_at": accidents[summaries.earliest_index[cluster]]["occurred_at"],
+                "latest_accident_at": accidents[summaries.latest_index[cluster]]["occurred_at"],
+                "analysis_date": analysis_date,
+                "analysis_period_days": analysis_period_days,
+                "analysis_period_start": analysis_period_start,
+                "analysis_period_end": analysis_period_end,
+                "accident_ids": json.dumps(
+                    [accidents[index]["id"] for index in summaries.members(cluster)]
+                ),
+            }
+        )
 
     print(f"✅ 生成 {len(hotspots)} 筆熱點記錄")
     return hotspots
 
 
-def insert_hotspots(conn, hotspots: List[Dict], clear_existing: bool):
+def insert_hotspots(
+    conn,
+    hotspots: List[Dict],
+    run_id: uuid.UUID,
+    period_days: int,
+    analysis_date: date,
+    clear_existing: bool,
+    commit: bool = True,
+):
     """
-    將熱點記錄寫入 hotspots table
+    將熱點記錄以 COPY 寫入 hotspots table，並發佈為該分析期間的目前版本
+
+    寫入與指標切換在同一個交易中完成，查詢端不會看到空的或寫到一半的 hotspots。
+    多期間模式以 commit=False 寫入各期間，最後一次提交，所有期間同時切換。
 
     Args:
         conn: 資料庫連線
         hotspots: 熱點記錄列表
-        clear_existing: 是否清除現有資料
+        run_id: 分析版本（analysis_runs.id）
+        period_days: 分析期間天數
+        analysis_date: 分析日期
+        clear_existing: 發佈後是否刪除同一分析期間的舊版本
+        commit: 是否立即提交
     """
     print(f"\n💾 寫入熱點資料到 hotspots table...")
 
-    with conn.cursor() as cur:
-        if clear_existing:
-            print("   清除現有熱點資料...")
-            cur.execute("DELETE FROM hotspots;")
-            deleted = cur.rowcount
-            print(f"   已刪除 {deleted} 筆舊資料")
-
-        # 準備插入資料
-        insert_query = """
-            INSERT INTO hotspots (
-                id,
-                center_latitude,
-                center_longitude,
-                geom,
-                radius_meters,
-                total_accidents,
-                a1_count,
-                a2_count,
-                a3_count,
-                earliest_accident_at,
-                latest_accident_at,
-                analysis_date,
-                analysis_period_days,
-                analysis_period_start,
-                analysis_period_end,
-                accident_ids,
-                created_at,
-                updated_at
-            ) VALUES %s
-        """
-
-        # 準備資料（geom 欄位會由 trigger 自動生成，這裡傳 NULL）
-        now = datetime.now(timezone.utc)
-        values = [
-            (
-                h["id"],
-                h["center_latitude"],
-                h["center_longitude"],
-                None,  # geom 由 trigger 自動生成
-                h["radius_meters"],
-                h["total_accidents"],
-                h["a1_count"],
-                h["a2_count"],
-                h["a3_count"],
-                h["earliest_accident_at"],
-                h["latest_accident_at"],
-                h["analysis_date"],
-                h["analysis_period_days"],
-                h["analysis_period_start"],
-                h["analysis_period_end"],
-                h["accident_ids"],
-                now,
-                now,
-            )
-            for h in hotspots
-        ]
+    deleted = publish_hotspots(
+        conn, hotspots, run_id, period_days, analysis_date, replace_existing=clear_existing
+    )
+    if commit:
+        conn.commit()
 
-        execute_values(cur, insert_query, values)
+    print(f"✅ 成功寫入並發佈 {len(hotspots)} 筆熱點記錄（版本 {run_id}）")
+    if clear_existing:
+        print(f"   已刪除 {deleted} 筆舊版本熱點")
+
+
+def record_analysis_run(
+    conn,
+    run_id: uuid.UUID,
+    profiler: StageProfiler,
+    args,
+    status: str,
+    started_at: datetime,
+    hotspot_count: int,
+    error_message: Optional[str] = None,
+    period_days: Optional[int] = None,
+    accident_count: Optional[int] = None,
+):
+    """
+    將各階段量測結果寫入 analysis_runs table（需先執行 002 migration）
+
+    多期間模式每個期間各寫一筆（period_days、accident_count 為該期間的值，階段量測共用）。
+    寫入失敗只印出警告，不影響 ETL 結果。
+    """
+    if period_days is None:
+        period_days = args.period_days
+    if accident_count is None:
+        accident_count = profiler.rows_for("fetch_accidents") or 0
+    query = """
+        INSERT INTO analysis_runs (
+            id, source, status, analysis_period_days, epsilon_meters, min_samples,
+            started_at, finished_at, wall_ms, cpu_ms, peak_memory_bytes, max_rss_bytes,
+            accident_count, hotspot_count, stages, error_message
+        ) VALUES (
+            %s, 'script', %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+        )
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                query,
+                (
+                    str(run_id),
+                    status,
+                    period_days,
+                    args.epsilon_meters,
+                    args.min_accidents,
+                    started_at,
+                    datetime.now(timezone.utc),
+                    profiler.total_wall_ms,
+                    profiler.total_cpu_ms,
+                    profiler.peak_memory_bytes,
+                    profiler.max_rss_bytes,
+                    accident_count,
+                    hotspot_count,
+                    json.dumps(profiler.as_dicts()),
+                    error_message,
+                ),
+            )
         conn.commit()
+    except psycopg2.Error as e:
+        conn.rollback()
+        print(f"⚠️  無法寫入 analysis_runs: {e}", file=sys.stderr)
 
-        print(f"✅ 成功寫入 {len(hotspots)} 筆熱點記錄")
+
+def analyze_periods(
+    conn, args, periods: List[int], profiler: StageProfiler
+) -> Tuple[Dict[int, List[Dict]], Dict[int, int]]:
+    """
+    多期間模式：只讀取一次最長期間的事故，各期間取陣列前綴分別聚類（可平行）
+
+    事故依時間由新到舊排序，「過去 N 天」的事故即為陣列的前綴。
+
+    Returns:
+        ({期間天數: 熱點記錄列表}, {期間天數: 事故數})
+    """
+    now = datetime.now(timezone.utc)
+    cutoff_dates = {period_days: now - timedelta(days=period_days) for period_days in periods}
+    with profiler.stage("fetch_accidents") as stage:
+        accidents = fetch_accidents(conn, cutoff_dates[periods[-1]])
+        stage.rows = len(accidents)
+
+    if len(accidents) < args.min_accidents:
+        print(f"⚠️  事故數量不足 ({len(accidents)} < {args.min_accidents})，無法進行分析")
+        return {}, {periods[-1]: len(accidents)}
+
+    with profiler.stage("build_arrays", rows=len(accidents)):
+        coordinates = build_coordinates(accidents)
+        sizes = window_sizes(
+            [acc["occurred_at"].timestamp() for acc in accidents],
+            [cutoff_dates[period_days].timestamp() for period_days in periods],
+        )
+    accident_counts = dict(zip(periods, sizes))
+
+    print(f"\n🔬 執行 DBSCAN 聚類分析（{len(periods)} 個期間，workers={args.workers}）...")
+    with profiler.stage("dbscan_fit", rows=sum(sizes)):
+        window_labels = cluster_windows(
+            coordinates[:, 0],
+            coordinates[:, 1],
+            sizes,
+            args.epsilon_meters,
+            args.min_accidents,
+            args.workers,
+        )
+
+    analysis_period_end = date.today() - timedelta(days=1)
+    results: Dict[int, List[Dict]] = {}
+    for period_days, labels in zip(periods, window_labels):
+        size = accident_counts[period_days]
+        if size < args.min_accidents:
+            print(f"⚠️  {period_days} 天事故數量不足 ({size} < {args.min_accidents})，略過")
+            continue
+        print(f"\n📅 分析期間：過去 {period_days} 天（{size} 筆事故）")
+        results[period_days] = generate_hotspot_records(
+            accidents[:size],
+            coordinates[:size],
+            labels,
+            args.min_accidents,
+            period_days,
+            cutoff_dates[period_days].date(),
+            analysis_period_end,
+            profiler=profiler,
+            stage_name=f"cluster_stats_{period_days}d",
+        )
+    return results, accident_counts
+
+
+def run_periods(conn, args, profiler: StageProfiler, started_at: datetime):
+    """多期間模式主流程：各期間各自一個分析版本，所有期間在同一個交易中發佈"""
+    periods = sorted({int(value) for value in args.periods.split(",") if value})
+    run_ids = {period_days: uuid.uuid4() for period_days in periods}
+    results: Dict[int, List[Dict]] = {}
+    accident_counts: Dict[int, int] = {}
+
+    def record_runs(status: str, error_message: Optional[str] = None):
+        for period_days in periods:
+            record_analysis_run(
+                conn,
+                run_ids[period_days],
+                profiler,
+                args,
+                status,
+                started_at,
+                len(results.get(period_days, [])),
+                error_message=error_message,
+                period_days=period_days,
+                accident_count=accident_counts.get(period_days, 0),
+            )
+
+    try:
+        results, accident_counts = analyze_periods(conn, args, periods, profiler)
+        if not args.dry_run:
+            for period_days, hotspots in results.items():
+                with profiler.stage(f"db_write_{period_days}d", rows=len(hotspots)):
+                    insert_hotspots(
+                        conn,
+                        hotspots,
+                        run_ids[period_days],
+                        period_days,
+                        date.today(),
+                        args.clear_existing,
+                        commit=False,
+                    )
+            with profiler.stage("publish", rows=len(results)):
+                conn.commit()
+        else:
+            print("\n⚠️  測試模式：不寫入資料庫")
+
+        for period_days, hotspots in results.items():
+            print(f"\n📅 過去 {period_days} 天")
+            print_summary(hotspots)
+        print("\n⏱️  各階段耗時：")
+        print(profiler.format_table())
+        if not args.dry_run:
+            record_runs("success")
+    except Exception as e:
+        conn.rollback()
+        if not args.dry_run:
+            record_runs("error", str(e))
+        raise
 
 
 def print_summary(hotspots: List[Dict]):
@@ -396,7 +513,10 @@ def main():
     print("=" * 60)
     print("🚦 事故熱點 ETL 腳本")
     print("=" * 60)
-    print(f"分析期間: 過去 {args.period_days} 天")
+    if args.periods:
+        print(f"分析期間: {args.periods} 天（多期間模式）")
+    else:
+        print(f"分析期間: 過去 {args.period_days} 天")
     print(
         f"DBSCAN 參數: epsilon={args.epsilon_meters}m, min_samples={args.min_accidents}"
     )
@@ -411,10 +531,34 @@ def main():
         print(f"❌ 資料庫連線失敗: {e}", file=sys.stderr)
         sys.exit(1)
 
+    profiler = StageProfiler(trace_memory=args.trace_memory)
+    started_at = datetime.now(timezone.utc)
+    run_id = uuid.uuid4()
+    hotspots: List[Dict] = []
+
+    if args.periods:
+        try:
+            run_periods(conn, args, profiler, started_at)
+        except Exception as e:
+            print(f"\n❌ 錯誤: {e}", file=sys.stderr)
+            import traceback
+
+            traceback.print_exc()
+            sys.exit(1)
+        finally:
+            profiler.finish()
+            conn.close()
+        print("\n" + "=" * 60)
+        print("✨ ETL 完成！")
+        print("=" * 60)
+        return
+
     try:
         # 1. 讀取事故資料
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=args.period_days)
-        accidents = fetch_accidents(conn, cutoff_date)
+        with profiler.stage("fetch_accidents") as stage:
+            accidents = fetch_accidents(conn, cutoff_date)
+            stage.rows = len(accidents)
 
         if len(accidents) < args.min_accidents:
             print(
@@ -423,9 +567,12 @@ def main():
             return
 
         # 2. 執行聚類分析
-        coordinates, labels = perform_dbscan_clustering(
-            accidents, args.epsilon_meters, args.min_accidents
-        )
+        with profiler.stage("build_arrays", rows=len(accidents)):
+            coordinates = build_coordinates(accidents)
+        with profiler.stage("dbscan_fit", rows=len(accidents)):
+            labels = perform_dbscan_clustering(
+                coordinates, args.epsilon_meters, args.min_accidents
+            )
 
         # 3. 生成熱點記錄
         analysis_period_start = cutoff_date.date()
@@ -439,16 +586,29 @@ def main():
             args.period_days,
             analysis_period_start,
             analysis_period_end,
+            profiler=profiler,
         )
 
         # 4. 寫入資料庫
         if not args.dry_run:
-            insert_hotspots(conn, hotspots, args.clear_existing)
+            with profiler.stage("db_write", rows=len(hotspots)):
+                insert_hotspots(
+                    conn,
+                    hotspots,
+                    run_id,
+                    args.period_days,
+                    date.today(),
+                    args.clear_existing,
+                )
         else:
             print("\n⚠️  測試模式：不寫入資料庫")
 
         # 5. 印出摘要
         print_summary(hotspots)
+        print("\n⏱️  各階段耗時：")
+        print(profiler.format_table())
+        if not args.dry_run:
+            record_analysis_run(conn, run_id, profiler, args, "success", started_at, len(hotspots))
 
         print("\n" + "=" * 60)
         print("✨ ETL 完成！")
@@ -460,9 +620,14 @@ def main():
         import traceback
 
         traceback.print_exc()
+        if not args.dry_run:
+            record_analysis_run(
+                conn, run_id, profiler, args, "error", started_at, len(hotspots), error_message=str(e)
+            )
         sys.exit(1)
 
     finally:
+        profiler.finish()
         conn.close()
 
 